@@ -25,8 +25,28 @@ setup(name='yahoo_fantasy_bot',
       ],
       install_requires=['yahoo_fantasy_api>=2.4.1', 'baseball_scraper>=0.4.9',
                         'docopt', 'yahoo_oauth', 'nhl_scraper>=0.0.3',
-                        'baseball_id>=0.1.0', 'progressbar', 'jinja2'],
-      python_requires='>=3',
+                        'baseball_id>=0.1.0', 'progressbar', 'jinja2',
+                        'scipy',
+                        'importlib_metadata; python_version < "3.8"'],
+      python_requires='>=3.7',
       include_package_data=True,
       zip_safe=True,
-      scripts=['scripts/ybot', 'scripts/ybot_setup'])
+      scripts=['scripts/ybot', 'scripts/ybot_setup', 'scripts/ybot_tune'],
+      entry_points={
+          'yahoo_fantasy_bot.scorers': [
+              'mlb = yahoo_fantasy_bot.mlb:Scorer',
+              'nhl = yahoo_fantasy_bot.nhl:Scorer',
+              'points = yahoo_fantasy_bot.points:Scorer'],
+          'yahoo_fantasy_bot.accumulators': [
+              'mlb = yahoo_fantasy_bot.mlb:StatAccumulator',
+              'nhl = yahoo_fantasy_bot.nhl:StatAccumulator',
+              'points = yahoo_fantasy_bot.points:StatAccumulator'],
+          'yahoo_fantasy_bot.displays': [
+              'mlb = yahoo_fantasy_bot.mlb:PlayerPrinter',
+              'nhl = yahoo_fantasy_bot.nhl:PlayerPrinter',
+              'points = yahoo_fantasy_bot.points:PlayerPrinter'],
+          'yahoo_fantasy_bot.optimizers': [
+              'genetic_algorithm = yahoo_fantasy_bot.lineup_optimizer:'
+              'optimize_with_genetic_algorithm',
+              'assignment = yahoo_fantasy_bot.lineup_optimizer:'
+              'optimize_with_assignment']})
@@ -2,7 +2,7 @@
 
 from yahoo_oauth import OAuth2
 import yahoo_fantasy_api as yfa
-from yahoo_fantasy_bot import roster, utils
+from yahoo_fantasy_bot import roster, utils, points, settings, plugins
 import logging
 import pickle
 import os
@@ -11,11 +11,14 @@ import datetime
 import pandas as pd
 import numpy as np
 import importlib
+import hashlib
 import copy
 import collections
 
-LeagueStatics = collections.namedtuple("LeagueStatics",
-                                       "pos ir_spots bn_spots settings cats ir_name")
+LeagueStatics = collections.namedtuple(
+    "LeagueStatics",
+    "pos ir_spots bn_spots settings cats ir_name stat_weights",
+    defaults=(None,))
 
 
 class ScoreComparer:
@@ -33,9 +36,18 @@ class ScoreComparer:
         self.cfg = cfg
         self.scorer = scorer
         self.opp_sum = None
-        self.stdev_cap = int(cfg['Scorer']['stdevCap'])
+        self.stdev_cap = settings.load(cfg).scorer.stdev_cap
         self.stdevs = self._compute_agg(lg_lineups, 'std')
 
+    def __getstate__(self):
+        # The cfg and logger are only needed during construction.  Leave
+        # them out so that a comparer can be saved for replay by ybot_tune.
+        return (self.scorer, self.opp_sum, self.stdev_cap, self.stdevs)
+
+    def __setstate__(self, state):
+        self.logger = logging.getLogger()
+        (self.scorer, self.opp_sum, self.stdev_cap, self.stdevs) = state
+
     def set_opponent(self, opp_sum):
         """
         Set the stat category totals for the opponent
@@ -85,7 +97,7 @@ class ScoreComparer:
             if type(lineup) is pd.DataFrame:
                 df = pd.DataFrame(data=lineup, columns=lineup.columns)
             else:
-                df = pd.DataFrame(data=lineup, columns=lineup[0].index)
+                df = roster.players_to_frame(lineup)
             # Lineup could be empty if all players were moved to the bench
             if len(df.index) > 0:
                 score_sum = self.scorer.summarize(df)
@@ -104,7 +116,7 @@ class ManagerBot:
     """
     def __init__(self, cfg, reset_cache, ignore_status):
         self.logger = logging.getLogger()
-        self.cfg = cfg
+        self.cfg = settings.load(cfg)
         self.sc = OAuth2(None, None, from_file=cfg['Connection']['oauthFile'])
         self.lg = yfa.League(self.sc, cfg['League']['id'])
         self.tm = self.lg.to_team(self.lg.team_key())
@@ -113,10 +125,13 @@ class ManagerBot:
         if reset_cache:
             self.tm_cache.remove()
             self.lg_cache.remove()
+            utils.ComponentCache(self.cfg, 'prediction').remove()
         self.load_league_statics()
+        self.load_point_weights()
         self.pred_bldr = None
         self.my_team_bldr = self._construct_roster_builder()
         self.ppool = None
+        self.plyr_index = None
         Scorer = self._get_scorer_class()
         self.scorer = Scorer(self.cfg)
         Display = self._get_display_class()
@@ -127,8 +142,11 @@ class ManagerBot:
         self.opp_sum = None
         self.opp_team_name = None
         self.ignore_status = ignore_status
+        self.preflight_skipped = set()
+        self.team_rosters = {}
 
         self.init_prediction_builder()
+        self.preflight()
         self.score_comparer = ScoreComparer(self.cfg, self.scorer,
                                             self.fetch_league_lineups())
         self.fetch_player_pool()
@@ -146,40 +164,40 @@ class ManagerBot:
         # IR.  We first pick from locked players.  If we are avoiding player
         # churn, we will pick players from the original roster that weren't
         # started.  As a fall back, we will then pick the highest ownership %.
-        processed_names = [e['name'] for e in self.lineup] + \
-            [e['name'] for e in self.injury_reserve]
+        processed_names = set([e['name'] for e in self.lineup] +
+                              [e['name'] for e in self.injury_reserve])
 
         for plyr_name in self._get_locked_players_list():
             if plyr_name not in processed_names:
-                plyr_from_pool = self.ppool[self.ppool['name'] == plyr_name]
-                if len(plyr_from_pool.index) == 0:
+                plyr_from_pool = self.plyr_index.get_by_name(plyr_name)
+                if plyr_from_pool is None:
                     continue
-                bench.append(plyr_from_pool.iloc(0)[0])
+                bench.append(plyr_from_pool)
                 # Ensure we don't pick this player again when we go through the pool
-                processed_names.append(plyr_name)
+                processed_names.add(plyr_name)
                 if len(bench) == self.lg_statics.bn_spots:
                     self.bench = bench
                     return
 
-        if self.cfg['LineupOptimizer']['benchSelection'] == 'avoidChurn':
+        if self.cfg.lineup_optimizer.bench_selection == 'avoidChurn':
             # Sort the original roster by pct owned, so that we favour them first.
             self.orig_roster.sort(key=lambda p: p['percent_owned'], reverse=True)
             for p in self.orig_roster:
                 if p['name'] in processed_names:
                     continue
-                plyr_from_pool = self.ppool[self.ppool['name'] == p['name']]
-                if len(plyr_from_pool.index) == 0:
+                plyr_from_pool = self.plyr_index.get_by_name(p['name'])
+                if plyr_from_pool is None:
                     continue
-                bench.append(plyr_from_pool.iloc(0)[0])
-                processed_names.append(p['name'])
+                bench.append(plyr_from_pool)
+                processed_names.add(p['name'])
                 if len(bench) == self.lg_statics.bn_spots:
                     self.bench = bench
                     return
 
-        top_owners = self.ppool.sort_values(by=["percent_owned"],
-                                            ascending=False)
-        for plyr in top_owners.iterrows():
-            p = plyr[1]
+        top_owners = np.argsort(-self.ppool['percent_owned'].to_numpy(),
+                                kind='stable')
+        for row in top_owners:
+            p = self.plyr_index.pool.player(row)
             if p['name'] not in processed_names:
                 self.logger.info("Adding {} to bench ({}%)...".format(
                     p['name'], p['percent_owned']))
@@ -217,8 +235,7 @@ class ManagerBot:
             rm_plyr = ir.pop()
             # This could expand the bench past the number of allowed players.
             # We will trim this down the correct number later.
-            plyr_from_pool = self.ppool[self.ppool['player_id'] == rm_plyr['player_id']]
-            self.bench.append(plyr_from_pool.iloc(0)[0])
+            self.bench.append(self._get_pool_player(rm_plyr))
         self.injury_reserve = ir
 
     def move_non_available_players(self):
@@ -251,8 +268,7 @@ class ManagerBot:
         for plyr in roster:
             assert(plyr['selected_position'] != 'IR')  # Need to account for IR
             if plyr['selected_position'] == 'IL' and 'IL' not in plyr['eligible_positions']:
-                plyr_from_pool = self.ppool[self.ppool['player_id'] == plyr['player_id']]
-                self.bench.append(plyr_from_pool.iloc(0)[0])
+                self.bench.append(self._get_pool_player(plyr))
                 for idx, lp in enumerate(self.lineup):
                     if lp['player_id'] == plyr['player_id']:
                         self.logger.info(
@@ -304,21 +320,91 @@ class ManagerBot:
                                  bn_spots=bn_spots,
                                  settings=self.lg.settings(),
                                  cats=self.lg.stat_categories(),
-                                 ir_name=ir_name)
+                                 ir_name=ir_name,
+                                 stat_weights=points.fetch_stat_weights(
+                                     self.lg))
         self.lg_statics = self.lg_cache.load_statics(loader)
 
+    def load_point_weights(self):
+        """Fill in the point weights for a points league.
+
+        If the config doesn't already specify the pointWeights, they are taken
+        from the league settings.  This is a no-op for category leagues.
+        """
+        if 'pointWeights' in self.cfg['Scorer'] or \
+                not self.lg_statics.stat_weights:
+            return
+        self.cfg['Scorer']['pointWeights'] = \
+            points.format_stat_weights(self.lg_statics.stat_weights)
+
     def init_prediction_builder(self):
         """Will load and return the prediction builder"""
+        module = self._get_prediction_module()
+
         def loader():
-            module = self._get_prediction_module()
             func = getattr(module,
                            self.cfg['Prediction']['builderClassLoader'])
             return func(self.lg, self.cfg)
 
+        if getattr(module, 'CACHES_OWN_COMPONENTS', False):
+            # The builder caches each of its parts with their own expiry
+            self.pred_bldr = loader()
+            return
         expiry = datetime.timedelta(
-            minutes=int(self.cfg['Cache']['predictionBuilderExpiry']))
+            minutes=self.cfg.cache.prediction_builder_expiry)
         self.pred_bldr = self.tm_cache.load_prediction_builder(expiry, loader)
 
+    def preflight(self):
+        """Check that every rostered player in the league can be predicted
+
+        The players are resolved by the prediction builder in one batch
+        before any lineups are predicted.  All of the players that can't be
+        resolved are reported together.  The run is aborted if any of them
+        are on our team.  Otherwise, the preflight option in the Prediction
+        section picks whether we abort (abort) or leave those players out of
+        the other teams' lineups (skip).  Builders without a preflight()
+        method are not checked.
+        """
+        if self.cfg.prediction.preflight == 'off' or \
+                not hasattr(self.pred_bldr, 'preflight'):
+            return
+        my_key = self.lg.team_key()
+        owners = {}
+        plyrs = []
+        # Our bench is checked too, so take our team's full roster
+        rosters = [(my_key, self._get_orig_roster())]
+        for tm_key in self.lg.teams().keys():
+            rosters.append((tm_key, self._get_roster_for_team(tm_key)))
+        for tm_key, tm_roster in rosters:
+            for plyr in tm_roster:
+                if plyr['player_id'] not in owners:
+                    owners[plyr['player_id']] = set()
+                    plyrs.append(plyr)
+                owners[plyr['player_id']].add(tm_key)
+        unresolved = self.pred_bldr.preflight(plyrs)
+        self.logger.info("Preflight resolved {} of {} players".format(
+            len(plyrs) - len(unresolved), len(plyrs)))
+        if len(unresolved) == 0:
+            return
+
+        report = ["{} players could not be resolved:".format(len(unresolved))]
+        for e in unresolved:
+            plyr = e['player']
+            report.append("  {} (id: {}, team: {}): {} [tried: {}]".format(
+                plyr['name'], plyr['player_id'],
+                ",".join(sorted(owners[plyr['player_id']])), e['reason'],
+                ", ".join(e['tried'])))
+        report = "\n".join(report)
+        if self.cfg.prediction.preflight == 'abort' or \
+                any(my_key in owners[e['player']['player_id']]
+                    for e in unresolved):
+            raise RuntimeError(report)
+        self.logger.warning(report)
+        self.logger.warning("Leaving these players out of the other teams' "
+                            "lineups")
+        self.preflight_skipped = set(e['player']['player_id']
+                                     for e in unresolved)
+
     def fetch_cur_lineup(self):
         """Fetch the current lineup as set in Yahoo!"""
         all_mine = self._get_orig_roster()
@@ -333,9 +419,14 @@ class ManagerBot:
     def fetch_player_pool(self):
         """Build the roster pool of players"""
         if self.ppool is None:
-            plyr_pool = self.fetch_free_agents() + self.fetch_cur_lineup()
+            # Our own players are kept regardless of the filters as the bench
+            # and locked players are picked from them.
+            plyr_pool = self._filter_free_agents(self.fetch_free_agents()) + \
+                self.fetch_cur_lineup()
             self.ppool = self._call_predict(plyr_pool, fail_on_missing=False)
             self._filter_excluded_players()
+            self.plyr_index = roster.PlayerIndex(
+                roster.PlayerPool(self.ppool))
 
     def fetch_free_agents(self):
         def loader():
@@ -348,7 +439,7 @@ class ManagerBot:
             return fa
 
         expiry = datetime.timedelta(
-            minutes=int(self.cfg['Cache']['freeAgentExpiry']))
+            minutes=self.cfg.cache.free_agent_expiry)
         return self.tm_cache.load_free_agents(expiry, loader)
 
     def fetch_league_lineups(self):
@@ -356,8 +447,7 @@ class ManagerBot:
             self.logger.info("Fetching lineups for each team")
             lineups = []
             for tm_key in self.lg.teams().keys():
-                tm = self.lg.to_team(tm_key)
-                tm_roster = self._get_roster_for_team(tm)
+                tm_roster = self._get_roster_for_team(tm_key)
                 lineups.append(self._call_predict(tm_roster, fail_on_missing=True))
             self.logger.info("All lineups fetched.")
             return lineups
@@ -387,7 +477,7 @@ class ManagerBot:
             print("Not a valid team: {}:".format(opp_team_key))
             return(None, None)
 
-        tm_roster = self._get_roster_for_team(self.lg.to_team(opp_team_key))
+        tm_roster = self._get_roster_for_team(opp_team_key)
         opp_df = self._call_predict(tm_roster, fail_on_missing=True)
         opp_sum = self.scorer.summarize(opp_df)
         return (team_name, opp_sum)
@@ -417,12 +507,8 @@ class ManagerBot:
                 else:
                     unavail_bench.append(p)
             if len(avail_bench) > 0:
-                optimizer_func = self._get_lineup_optimizer_function()
-                bench_df = pd.DataFrame(data=avail_bench,
-                                        columns=avail_bench[0].index)
-                new_lineup = optimizer_func(self.cfg, self.score_comparer,
-                                            self.my_team_bldr, bench_df,
-                                            self.lineup)
+                bench_df = roster.players_to_frame(avail_bench)
+                new_lineup = self._optimize(bench_df, self.lineup)
                 if new_lineup:
                     self._set_new_lineup_and_bench(new_lineup.get_roster(), unavail_bench)
 
@@ -438,23 +524,19 @@ class ManagerBot:
                 return plyr['status'] == '' or not plyr['status'].startswith('IL')
             return plyr['status'] == ''
 
-        ppool = pd.DataFrame(
-            data=[e for e in self.bench if is_included(e)], columns=self.bench[0].index)
-        ldf = pd.DataFrame(
-            data=[e for e in self.lineup if is_included(e)], columns=self.lineup[0].index)
+        ppool = roster.players_to_frame(
+            [e for e in self.bench if is_included(e)])
+        ldf = roster.players_to_frame(
+            [e for e in self.lineup if is_included(e)])
         ppool = pd.concat([ppool, ldf], ignore_index=True, sort=False)
-        optimizer_func = self._get_lineup_optimizer_function()
-        new_lineup = optimizer_func(self.cfg, self.score_comparer,
-                                    self.my_team_bldr, ppool, [])
+        new_lineup = self._optimize(ppool, [])
         if new_lineup:
             self._set_new_lineup_and_bench(new_lineup.get_roster(), [])
 
     def fill_empty_spots(self):
         if len(self.lineup) < self.my_team_bldr.max_players():
-            optimizer_func = self._get_lineup_optimizer_function()
-            new_lineup = optimizer_func(self.cfg, self.score_comparer,
-                                        self.my_team_bldr,
-                                        self._get_filtered_pool(), self.lineup)
+            new_lineup = self._optimize(self._get_filtered_pool(),
+                                        self.lineup)
             if new_lineup:
                 self.lineup = new_lineup.get_roster()
 
@@ -467,20 +549,21 @@ class ManagerBot:
         all_ids = [e['player_id'] for e in yahoo_roster]
 
         # We need percent owned for all players returned in the Yahoo! roster
-        for po_plyr in self.lg.percent_owned(all_ids):
-            for r_plyr in yahoo_roster:
-                if po_plyr['player_id'] == r_plyr['player_id']:
-                    r_plyr['percent_owned'] = po_plyr['percent_owned']
-                    break
-
-        bench_ids = [e['player_id'] for e in yahoo_roster
-                     if e['selected_position'] == 'BN']
-        ir_ids = [e['player_id'] for e in yahoo_roster
-                  if (e['selected_position'] == self.lg_statics.ir_name)]
+        pct_owned = {e['player_id']: e['percent_owned']
+                     for e in self.lg.percent_owned(all_ids)}
+        for r_plyr in yahoo_roster:
+            if r_plyr['player_id'] in pct_owned:
+                r_plyr['percent_owned'] = pct_owned[r_plyr['player_id']]
+
+        bench_ids = set([e['player_id'] for e in yahoo_roster
+                         if e['selected_position'] == 'BN'])
+        ir_ids = set([e['player_id'] for e in yahoo_roster
+                      if (e['selected_position'] == self.lg_statics.ir_name)])
         lineup = []
         bench = []
         ir = []
-        for plyr in self.pred_bldr.select_players(yahoo_roster):
+        for plyr in roster.to_players(
+                self.pred_bldr.select_players(yahoo_roster)):
             if plyr['player_id'] in bench_ids:
                 bench.append(plyr)
             elif plyr['player_id'] in ir_ids:
@@ -499,15 +582,43 @@ class ManagerBot:
         :return: Player pool
         :rtype: DataFrame
         """
-        avail_plyrs = self.ppool[self.ppool['percent_owned'] >= int(self.cfg['LineupOptimizer']['minPctOwned'])]
+        avail_plyrs = self.ppool[self.ppool['percent_owned'] >= self.cfg.lineup_optimizer.min_pct_owned]
         return avail_plyrs[avail_plyrs['status'] == '']
 
+    def _filter_free_agents(self, free_agents):
+        """Drop the free agents that the bot will never consider
+
+        This applies the minimum percent owned filter and
+        _filter_excluded_players() to the free agents from Yahoo!, so that
+        they aren't predicted needlessly.  A free agent is kept if Yahoo!
+        didn't give the field that a filter is on.  Players with a status
+        are kept since pick_bench() can choose them, as are players in the
+        lock file.
+
+        :param free_agents: Free agents as returned by Yahoo!
+        :type free_agents: list(dict)
+        :return: Free agents that can be picked up
+        :rtype: list(dict)
+        """
+        min_pct_owned = self.cfg.lineup_optimizer.min_pct_owned
+        excluded = set(self._get_exclude_players_list())
+        locked = set(self._get_locked_players_list())
+        avail = [p for p in free_agents if p['name'] in locked or
+                 (p.get('percent_owned', min_pct_owned) >= min_pct_owned and
+                  p['name'] not in excluded)]
+        self.logger.info(
+            "Free agent pool size (before filtering) = {}".format(
+                len(free_agents)))
+        self.logger.info(
+            "Free agent pool size (after filtering) = {}".format(len(avail)))
+        return avail
+
     def _get_locked_players_list(self):
-        locked_file = self.cfg['LineupOptimizer']['lockPlayerFile']
+        locked_file = self.cfg.lineup_optimizer.lock_player_file
         return self._get_player_list(locked_file)
 
     def _get_exclude_players_list(self):
-        exclude_file = self.cfg['LineupOptimizer']['excludePlayerFile']
+        exclude_file = self.cfg.lineup_optimizer.exclude_player_file
         return self._get_player_list(exclude_file)
 
     def _filter_excluded_players(self):
@@ -532,11 +643,9 @@ class ManagerBot:
 
         :return: True if a new lineup was selected
         """
-        optimizer_func = self._get_lineup_optimizer_function()
-
         locked_plyrs = []
         locked_from_file = self._get_locked_players_list()
-        thres = int(self.cfg['LineupOptimizer']['lockPlayersAbovePctOwn'])
+        thres = self.cfg.lineup_optimizer.lock_players_above_pct_own
         for plyr in self.lineup:
             if plyr['percent_owned'] >= thres or plyr['name'] in locked_from_file:
                 clone_plyr = copy.deepcopy(plyr)
@@ -544,13 +653,107 @@ class ManagerBot:
                 locked_plyrs.append(clone_plyr)
                 self.logger.info("{} is added to locked list ({}% owned)".format(plyr['name'], plyr['percent_owned']))
 
-        best_lineup = optimizer_func(self.cfg, self.score_comparer,
-                                     self.my_team_bldr,
-                                     self._get_filtered_pool(), locked_plyrs)
+        best_lineup = self._optimize(self._get_filtered_pool(), locked_plyrs)
         if best_lineup:
-            self.lineup = copy.deepcopy(best_lineup.get_roster())
+            self.lineup = list(best_lineup.get_roster())
         return best_lineup is not None
 
+    def _optimize(self, avail_plyrs, locked_plyrs):
+        """Run the lineup optimizer, reusing the result for the same inputs
+
+        The inputs are fingerprinted and the lineup that was found is saved
+        in the team cache.  If the optimizer was already run with the same
+        inputs, the saved lineup is returned without running it again.
+
+        :param avail_plyrs: Pool of players that can be included in the lineup
+        :type avail_plyrs: DataFrame
+        :param locked_plyrs: Players that must exist in the lineup
+        :type locked_plyrs: list
+        :return: The lineup found by the optimizer or None
+        :rtype: roster.Container or None
+        """
+        memoize = self.cfg.lineup_optimizer.memoize
+        if memoize:
+            fingerprint = self._optimizer_fingerprint(avail_plyrs,
+                                                      locked_plyrs)
+            result = self.tm_cache.load_optimized_lineup(fingerprint)
+            if result is not None:
+                lineup = self._lineup_from_cache(result, avail_plyrs,
+                                                 locked_plyrs)
+                if lineup is not None or result['lineup'] is None:
+                    self.logger.info(
+                        "Optimizer cache hit for {}".format(fingerprint))
+                    return lineup
+
+        optimizer_func = self._get_lineup_optimizer_function()
+        lineup = optimizer_func(self.cfg, self.score_comparer,
+                                self.my_team_bldr, avail_plyrs, locked_plyrs)
+        if memoize:
+            if lineup is None:
+                result = {'lineup': None}
+            else:
+                result = {'lineup': [(p['player_id'], p['selected_position'])
+                                     for p in lineup.get_roster()]}
+            self.tm_cache.save_optimized_lineup(fingerprint, result)
+        return lineup
+
+    def _optimizer_fingerprint(self, avail_plyrs, locked_plyrs):
+        """Compute a fingerprint of everything the optimizer depends on
+
+        This covers the players and their projections, the locked players,
+        the opponent, the standard deviations used for scoring, the roster
+        positions and the optimizer and scorer settings.
+
+        :return: Hex digest of the inputs
+        :rtype: str
+        """
+        h = hashlib.sha1()
+        df = avail_plyrs
+        if 'player_id' in df.columns:
+            df = df.sort_values('player_id', kind='stable')
+        for col in sorted(df.columns, key=str):
+            if pd.api.types.is_numeric_dtype(df[col]):
+                vals = df[col].astype('float64')
+            else:
+                vals = df[col].astype(str)
+            h.update(str(col).encode())
+            h.update(pd.util.hash_pandas_object(
+                vals, index=False).to_numpy().tobytes())
+        h.update(repr(sorted((p['player_id'], str(p['selected_position']))
+                             for p in locked_plyrs)).encode())
+        h.update(repr(sorted(pd.Series(
+            self.score_comparer.opp_sum, dtype='float64').items())).encode())
+        h.update(self.score_comparer.stdevs.to_csv().encode())
+        h.update(repr(self.my_team_bldr.positions).encode())
+        for section in ['LineupOptimizer', 'Scorer']:
+            h.update(repr(sorted(self.cfg[section].items())).encode())
+        return h.hexdigest()
+
+    def _lineup_from_cache(self, result, avail_plyrs, locked_plyrs):
+        """Rebuild a lineup saved by _optimize
+
+        :return: The lineup or None if a saved player is no longer available
+            or there are no available players to rebuild it from
+        :rtype: roster.Container or None
+        """
+        if result['lineup'] is None or len(avail_plyrs.index) == 0:
+            return None
+        plyrs = {p['player_id']: p for p in locked_plyrs}
+        pool = roster.PlayerPool(avail_plyrs)
+        id_col = pool.col_index['player_id']
+        for row in range(len(pool)):
+            plyr_id = pool.values[row, id_col]
+            if plyr_id not in plyrs:
+                plyrs[plyr_id] = pool.player(row)
+        lineup = roster.Container(self.cfg)
+        for plyr_id, pos in result['lineup']:
+            if plyr_id not in plyrs:
+                return None
+            plyr = copy.copy(plyrs[plyr_id])
+            plyr['selected_position'] = pos
+            lineup.add_player(plyr)
+        return lineup
+
     def apply_roster_moves(self, dry_run, prompt):
         """Make roster changes with Yahoo!
 
@@ -565,6 +768,7 @@ class ManagerBot:
 
         # Change the free agent cache to remove the players we added
         if not dry_run:
+            self.team_rosters.pop(self.lg.team_key(), None)
             adds = roster_chg.get_adds_completed()
             self.invalidate_free_agents(adds)
 
@@ -661,26 +865,18 @@ class ManagerBot:
             package=self.cfg['Prediction']['builderPackage'])
 
     def _get_scorer_class(self):
-        module = importlib.import_module(
-            self.cfg['Scorer']['module'],
-            package=self.cfg['Scorer']['package'])
-        return getattr(module, self.cfg['Scorer']['class'])
+        return plugins.resolve(self.cfg, 'Scorer')
 
     def _get_display_class(self):
-        module = importlib.import_module(
-            self.cfg['Display']['module'],
-            package=self.cfg['Display']['package'])
-        return getattr(module, self.cfg['Display']['class'])
+        return plugins.resolve(self.cfg, 'Display')
 
     def _get_lineup_optimizer_function(self):
         """Return the function used to optimize a lineup.
 
         The config file is used to determine the appropriate function.
         """
-        module = importlib.import_module(
-            self.cfg['LineupOptimizer']['module'],
-            package=self.cfg['LineupOptimizer']['package'])
-        return getattr(module, self.cfg['LineupOptimizer']['function'])
+        return plugins.resolve(self.cfg, 'LineupOptimizer',
+                               attr_key='function')
 
     def _construct_roster_builder(self):
         pos_list = []
@@ -690,27 +886,65 @@ class ManagerBot:
         return roster.Builder(pos_list)
 
     def _get_orig_roster(self):
-        return self.lg.to_team(self.lg.team_key()).roster(
-            day=self.lg.edit_date())
+        return self._fetch_roster(self.lg.team_key())
 
     def _call_predict(self, plyrs, fail_on_missing):
             return self.pred_bldr.predict(plyrs,
                                           fail_on_missing=fail_on_missing)
 
-    def _get_roster_for_team(self, team):
+    def _get_pool_player(self, plyr):
+        """Return the player from the pool that has the same ID as plyr
+
+        :param plyr: Player from Yahoo!
+        :type plyr: dict
+        :return: Player from the pool
+        :rtype: roster.Player
+        """
+        plyr_from_pool = self.plyr_index.get_by_id(plyr['player_id'])
+        if plyr_from_pool is None:
+            raise LookupError(
+                "Could not find {} (id: {}) in the player pool".format(
+                    plyr['name'], plyr['player_id']))
+        return plyr_from_pool
+
+    def _get_roster_for_team(self, team_key):
         """Get all the players that are active for a given team
 
-        :param team: Team to get roster for
-        :type team: yahoo_fantasy_api.Team
+        Each team's roster is only fetched from Yahoo! once per run.
+
+        :param team_key: Key of the team to get the roster for
+        :type team_key: str
         :return: Roster of players
         :rtype: list
         """
-        week = self.lg.current_week() + 1
-        if week > self.lg.end_week():
-            raise RuntimeError("Season over no more weeks to predict")
-        full_roster = team.roster(week)
-        return [e for e in full_roster
-                if e["selected_position"] not in ["IR", "BN", "IL"]]
+        return [e for e in self._fetch_roster(team_key)
+                if e["selected_position"] not in ["IR", "BN", "IL"] and
+                e["player_id"] not in self.preflight_skipped]
+
+    def _fetch_roster(self, team_key):
+        """Get the full roster of a team
+
+        Each team's roster is only fetched from Yahoo! once per run.  Our own
+        roster is fetched as of the edit date, every other team's as of next
+        week.  The callers get copies of the players so that they can change
+        them without touching the cached roster.
+
+        :param team_key: Key of the team to get the roster for
+        :type team_key: str
+        :return: Roster of players, including the bench and the IL
+        :rtype: list
+        """
+        if team_key not in self.team_rosters:
+            tm = self.lg.to_team(team_key)
+            if team_key == self.lg.team_key():
+                self.team_rosters[team_key] = tm.roster(
+                    day=self.lg.edit_date())
+            else:
+                week = self.lg.current_week() + 1
+                if week > self.lg.end_week():
+                    raise RuntimeError("Season over no more weeks to predict")
+                self.team_rosters[team_key] = tm.roster(week)
+        return [dict(e) for e in self.team_rosters[team_key]]
 
 
 class RosterChanger:
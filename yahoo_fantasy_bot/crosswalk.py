@@ -0,0 +1,193 @@
+#!/usr/bin/python
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import pandas as pd
+from yahoo_fantasy_bot import utils
+try:
+    import importlib.metadata as importlib_metadata
+except ImportError:
+    # Python 3.7 needs the backport
+    import importlib_metadata
+
+
+logger = logging.getLogger()
+
+
+def id_key(yahoo_id):
+    """Normalize a Yahoo! ID so that IDs read as floats compare with ints
+
+    :param yahoo_id: Yahoo! ID of a player
+    :return: The ID as a string
+    :rtype: str
+    """
+    if isinstance(yahoo_id, float) and yahoo_id.is_integer():
+        return str(int(yahoo_id))
+    return str(yahoo_id)
+
+
+def baseball_id_version():
+    """Return the version of the installed baseball_id package"""
+    try:
+        return importlib_metadata.version('baseball_id')
+    except importlib_metadata.PackageNotFoundError:
+        return None
+
+
+def lookup_fingerprint(df):
+    """Compute a fingerprint of the contents of the baseball_id database
+
+    :param df: The database as loaded by baseball_id
+    :type df: DataFrame
+    :return: Hex digest of the database
+    :rtype: str
+    """
+    h = hashlib.sha1()
+    h.update(repr(list(df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class Crosswalk:
+    """Persistent table of how Yahoo! players map to the baseball_id database
+
+    Each entry records the rows of the ID lookup that a Yahoo! player resolved
+    to and how they were found: 'yahoo_id' if found by ID,
+    'name_missing_yahoo_id' if found by the name of an entry that has no
+    Yahoo! ID and 'name' if found by a plain name lookup.  The entries are
+    indexed by Yahoo! ID and normalized name.
+
+    All of the entries are dropped when the version of the baseball_id package
+    or the contents of its database change.
+
+    :param fn: File to keep the crosswalk in
+    :type fn: str
+    :param version: Version of the baseball_id package
+    :type version: str
+    """
+    def __init__(self, fn, version=None):
+        self.fn = fn
+        self.version = version
+        self.db_fingerprint = None
+        self.entries = {}
+        self.columns = None
+        self.dirty = False
+        self.db_checked = False
+        if os.path.exists(fn):
+            with open(fn, "rb") as f:
+                data = pickle.load(f)
+            if data.get('version') != version:
+                logger.info(
+                    "baseball_id version changed from {} to {}.  Dropping "
+                    "the crosswalk".format(data.get('version'), version))
+                self.dirty = True
+            else:
+                self.db_fingerprint = data['db_fingerprint']
+                self.entries = data['entries']
+                self.columns = data['columns']
+        self.name_index = {}
+        for key, entry in self.entries.items():
+            self._index_name(key, entry['name'])
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, yahoo_id, name):
+        """Find the entry for a Yahoo! player
+
+        :param yahoo_id: Yahoo! ID of the player
+        :param name: Name of the player in Yahoo!.  The entry is ignored if
+            the player was resolved under a different name.
+        :type name: str
+        :return: The entry or None if the player hasn't been resolved
+        :rtype: dict or None
+        """
+        entry = self.entries.get(id_key(yahoo_id))
+        if entry is None or entry['name'] != name:
+            return None
+        return entry
+
+    def find_by_name(self, name):
+        """Find the entries of every Yahoo! player with a given name
+
+        :param name: Player name.  It is matched after removing accents.
+        :type name: str
+        :return: Map of Yahoo! ID to entry
+        :rtype: dict
+        """
+        return {key: self.entries[key]
+                for key in self.name_index.get(utils.normalized(name), [])}
+
+    def add(self, yahoo_id, name, method, rows):
+        """Record how a Yahoo! player was resolved
+
+        :param yahoo_id: Yahoo! ID of the player
+        :param name: Name of the player in Yahoo!
+        :type name: str
+        :param method: How the player was resolved
+        :type method: str
+        :param rows: The rows of the ID lookup that the player resolved to
+        :type rows: DataFrame
+        """
+        key = id_key(yahoo_id)
+        old = self.entries.get(key)
+        if old is not None:
+            self.name_index[utils.normalized(old['name'])].discard(key)
+        if self.columns is None:
+            self.columns = list(rows.columns)
+        self.entries[key] = {'name': name, 'method': method,
+                             'rows': rows.to_dict('records')}
+        self._index_name(key, name)
+        self.dirty = True
+
+    def rows_frame(self, rows):
+        """Build a DataFrame from the rows of one or more entries
+
+        :param rows: Rows as saved in the entries
+        :type rows: list(dict)
+        :rtype: DataFrame
+        """
+        return pd.DataFrame(rows, columns=self.columns)
+
+    def check_lookup(self, df):
+        """Drop the entries if the baseball_id database has changed
+
+        This must be called the first time the crosswalk is used, before any
+        of the entries are read.  Later calls do nothing.
+
+        :param df: The database as loaded by baseball_id
+        :type df: DataFrame
+        """
+        if self.db_checked:
+            return
+        self.db_checked = True
+        fingerprint = lookup_fingerprint(df)
+        if self.db_fingerprint is not None and \
+                self.db_fingerprint != fingerprint:
+            logger.info("baseball_id database changed.  Dropping the "
+                        "crosswalk.")
+            self.entries = {}
+            self.name_index = {}
+        self.db_fingerprint = fingerprint
+        self.dirty = True
+
+    def save(self):
+        """Write the crosswalk to disk if it has changed"""
+        if not self.dirty:
+            return
+        data = {'version': self.version,
+                'db_fingerprint': self.db_fingerprint,
+                'columns': self.columns,
+                'entries': self.entries}
+        dir_name = os.path.dirname(self.fn) or '.'
+        os.makedirs(dir_name, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=dir_name, delete=False) as f:
+            pickle.dump(data, f)
+        os.replace(f.name, self.fn)
+        self.dirty = False
+
+    def _index_name(self, key, name):
+        self.name_index.setdefault(utils.normalized(name), set()).add(key)
@@ -1,13 +1,16 @@
 #!/bin/python
 
+import configparser
 import copy
 import logging
+import pickle
 import numpy as np
 import pandas as pd
 from progressbar import ProgressBar, Percentage, Bar
 import math
 import random
-from yahoo_fantasy_bot import roster
+from scipy.optimize import linear_sum_assignment
+from yahoo_fantasy_bot import roster, settings
 
 
 def optimize_with_genetic_algorithm(cfg, score_comparer, roster_bldr,
@@ -17,11 +20,114 @@ def optimize_with_genetic_algorithm(cfg, score_comparer, roster_bldr,
 
     See GeneticAlgorithm.__init__ for parameter type descriptions.
     """
+    opt_settings = settings.load(cfg).lineup_optimizer
+    if opt_settings.record_file:
+        save_optimizer_inputs(opt_settings.record_file, cfg, score_comparer,
+                              roster_bldr, avail_plyrs, locked_plyrs)
     algo = GeneticAlgorithm(cfg, score_comparer, roster_bldr, avail_plyrs,
                             locked_plyrs)
-    generations = int(cfg['LineupOptimizer']['generations']) \
-        if 'generations' in cfg['LineupOptimizer'] else 100
-    return algo.run(generations)
+    return algo.run(opt_settings.generations)
+
+
+def save_optimizer_inputs(fn, cfg, score_comparer, roster_bldr, avail_plyrs,
+                          locked_plyrs):
+    """
+    Save the inputs of a lineup optimization so that it can be replayed
+
+    The saved file is used by the ybot_tune script to tune the parameters of
+    the genetic algorithm.  See GeneticAlgorithm.__init__ for parameter type
+    descriptions.
+
+    :param fn: Name of the file to save the inputs to
+    :type fn: str
+    """
+    inputs = {'cfg': {s: dict(cfg[s]) for s in cfg.sections()},
+              'score_comparer': score_comparer,
+              'positions': roster_bldr.positions,
+              'avail_plyrs': avail_plyrs,
+              'locked_plyrs': locked_plyrs}
+    with open(fn, "wb") as f:
+        pickle.dump(inputs, f)
+
+
+def load_optimizer_inputs(fn):
+    """
+    Load the inputs of a lineup optimization saved by save_optimizer_inputs
+
+    :param fn: Name of the file the inputs were saved to
+    :type fn: str
+    :return: The cfg, score_comparer, roster_bldr, avail_plyrs and
+    locked_plyrs arguments of the original optimization
+    :rtype: tuple
+    """
+    with open(fn, "rb") as f:
+        inputs = pickle.load(f)
+    cfg = configparser.RawConfigParser(
+        converters={'list': lambda x: [i.strip() for i in x.split(',')]})
+    cfg.read_dict(inputs['cfg'])
+    return (cfg, inputs['score_comparer'],
+            roster.Builder(inputs['positions']), inputs['avail_plyrs'],
+            inputs['locked_plyrs'])
+
+
+def optimize_with_assignment(cfg, score_comparer, roster_bldr, avail_plyrs,
+                             locked_plyrs):
+    """
+    Optimize the lineup by solving an assignment of players to positions
+
+    This is only valid when the score of a lineup is the sum of independent
+    player values, such as with points.Scorer.  In that case the best lineup
+    is the assignment of players to roster positions with the highest total
+    value, which can be solved exactly rather than searched for.
+
+    See GeneticAlgorithm.__init__ for parameter type descriptions.
+
+    :return: The best lineup.  Or None if the locked players could not all be
+    fit in a lineup.
+    :rtype: roster.Container or None
+    """
+    logger = logging.getLogger()
+    scorer = score_comparer.scorer
+    if not hasattr(scorer, 'player_values'):
+        raise RuntimeError(
+            "The assignment optimizer requires a scorer that values each "
+            "player independently (e.g. points.Scorer)")
+    id_col = cfg['Prediction']['player_id_column_name']
+    locked_ids = [e[id_col] for e in locked_plyrs]
+    avail = avail_plyrs[~avail_plyrs[id_col].isin(locked_ids)]
+    avail = avail.drop_duplicates(subset=id_col)
+    plyrs = list(locked_plyrs) + roster.PlayerPool(avail).players()
+    if len(plyrs) == 0:
+        return None
+    ppool = roster.players_to_frame(plyrs)
+    positions = roster_bldr.positions
+
+    values = scorer.player_values(ppool)
+    eligible = np.array([[pos in p['eligible_positions'] for pos in positions]
+                         for p in plyrs])
+    # Costs are layered so that a locked player always beats any combination
+    # of unlocked players and an ineligible slot is only ever used when the
+    # slot cannot be filled at all.
+    lock_bonus = np.abs(values).sum() + 1
+    ineligible_cost = lock_bonus * (len(positions) + 1)
+    cost = np.tile(-values.reshape(-1, 1), (1, len(positions)))
+    cost[:len(locked_plyrs)] -= lock_bonus
+    cost[~eligible] = ineligible_cost
+    rows, cols = linear_sum_assignment(cost)
+
+    lineup = roster.Container(cfg)
+    for r, c in zip(rows, cols):
+        if not eligible[r, c]:
+            continue
+        plyr = copy.copy(plyrs[r])
+        plyr['selected_position'] = positions[c]
+        lineup.add_player(plyr)
+    lineup_ids = [p[id_col] for p in lineup.get_roster()]
+    if any(i not in lineup_ids for i in locked_ids):
+        logger.warn("Locked players cannot fit into a single lineup.  "
+                    "Exiting lineup optimizer")
+        return None
+    return lineup
 
 
 class GeneticAlgorithm:
@@ -62,23 +168,30 @@ class GeneticAlgorithm:
     def __init__(self, cfg, score_comparer, roster_bldr, avail_plyrs,
                  locked_plyrs):
         self.cfg = cfg
+        self.settings = settings.load(cfg).lineup_optimizer
         self.player_id_col = cfg['Prediction']['player_id_column_name']
         self.logger = logging.getLogger()
         self.score_comparer = score_comparer
         self.roster_bldr = roster_bldr
         self.ppool = avail_plyrs
+        self.plyr_pool = roster.PlayerPool(avail_plyrs)
         self.population = []
         self.locked_ids = [e[self.player_id_col] for e in locked_plyrs]
         self.seed_lineup = self._generate_seed_lineup(locked_plyrs)
         self.last_lineup_id = 0
         self.pbar = None
 
-    def run(self, generations):
+    def run(self, generations, show_progress=True, on_generation=None):
         """
         Optimize a lineup by running the genetic algorithm
 
         :param generations: The number of generations to run the algorithm for
         :type generations: int
+        :param show_progress: Set to False to suppress the progress bar
+        :type show_progress: bool
+        :param on_generation: Optional callback invoked after each generation
+        with the generation number and the current population
+        :type on_generation: function
         :return: The best lineup we generated.  Or None if no lineup was
         generated
         :rtype: list or None
@@ -87,19 +200,24 @@ class GeneticAlgorithm:
             self.logger.warn(
                 'Could not generate a seed lineup. Exiting lineup optimizer')
             return None
-        self._init_progress_bar(generations)
+        if show_progress:
+            self._init_progress_bar(generations)
         self._init_population()
         if len(self.population) == 0:
             self.logger.warn(
                 'Could not generate any population. Exiting lineup optimizer')
             return None
         for generation in range(generations):
-            self._update_progress(generation)
+            if show_progress:
+                self._update_progress(generation)
             self._mate()
             self._mutate()
+            if on_generation is not None:
+                on_generation(generation, self.population)
         self.logger.info(
             "Ended with population size of {}".format(len(self.population)))
-        print("")   # Go to line after progress bar
+        if show_progress:
+            print("")   # Go to line after progress bar
         return self._compute_best_lineup()
 
     def _gen_lineup_id(self):
@@ -153,20 +271,159 @@ class GeneticAlgorithm:
             self._log_lineup("Initial Population " + str(i), lineup)
 
     def _init_population(self):
-        max_lineups = int(self.cfg['LineupOptimizer']['initialPopulationSize'])
-        self.population = []
+        """
+        Build the initial population in a single pass
 
-        selector = self._gen_player_selector(gen_type='pct_own')
-        self._generate_lineups(max_lineups, selector)
+        Lineups are drawn directly from the list of players eligible for each
+        open slot in the seed lineup.  The first lineup favours the players
+        with the highest percent owned.  The rest are random.  The whole
+        batch is scored at once.
+        """
+        max_lineups = self.settings.initial_population_size
+        self.population = []
+        slots, cands = self._open_slot_candidates()
 
-        selector = self._gen_player_selector(gen_type='random')
-        for _ in range(max_lineups*2):
-            if len(self.population) >= max_lineups:
+        drawn = []
+        seen_sids = set()
+        for attempt in range(max_lineups * 2):
+            if len(drawn) >= max_lineups:
                 break
-            self._generate_lineups(max_lineups, selector)
-
+            rows = self._draw_lineup(slots, cands, random_order=attempt > 0)
+            if rows is None:
+                continue
+            lineup = self.seed_lineup.fork()
+            for pos, row in zip(slots, rows):
+                plyr = self.plyr_pool.player(row)
+                plyr['selected_position'] = pos
+                lineup.add_player(plyr)
+            sids = self._to_sids(lineup)
+            if tuple(sids) in seen_sids:
+                continue
+            seen_sids.add(tuple(sids))
+            drawn.append((lineup, rows, sids))
+
+        for (lineup, _, sids), score in zip(drawn, self._score_batch(drawn)):
+            self.population.append({'players': lineup,
+                                    'score': score,
+                                    'id': self._gen_lineup_id(),
+                                    'sids': sids})
         self._log_population()
 
+    def _open_slot_candidates(self):
+        """
+        Find the slots the seed lineup leaves open and who can fill them
+
+        :return: List of the positions of each open slot, and for each slot
+        the rows in self.plyr_pool that are eligible for it.  The rows are
+        ordered by percent owned, highest first.
+        :rtype: tuple
+        """
+        slots = []
+        for pos, cnt in self.roster_bldr.pos_count.items():
+            open_cnt = cnt - self.seed_lineup.get_num_players_at_pos(pos)
+            slots += [pos] * open_cnt
+
+        pool = self.plyr_pool
+        ids = pool.frame[self.player_id_col].to_numpy()
+        keep = ~pd.Series(ids).isin(self.locked_ids).to_numpy() & \
+            ~pd.Series(ids).duplicated().to_numpy()
+        if 'percent_owned' in pool.col_index:
+            pct = pool.frame['percent_owned'].to_numpy(dtype=np.float64)
+            order = np.argsort(-pct, kind='stable')
+        else:
+            order = np.arange(len(pool))
+        cands = {}
+        elig_col = pool.col_index['eligible_positions']
+        for row in order:
+            if not keep[row]:
+                continue
+            for pos in pool.values[row, elig_col]:
+                cands.setdefault(pos, []).append(row)
+        return slots, [cands.get(pos, []) for pos in slots]
+
+    def _draw_lineup(self, slots, cands, random_order):
+        """
+        Draw one lineup by filling each open slot from its candidates
+
+        Each slot takes a player from its eligibility list.  If every
+        eligible player is already taken, an augmenting path is searched so
+        that players shift to other slots they are eligible for.
+
+        :param slots: Positions of the open slots
+        :param cands: Rows eligible for each slot
+        :param random_order: If True, slots are filled in random order and
+        each slot starts at a random player.  Otherwise the slots are filled
+        in order, taking the highest owned player first.
+        :return: Row picked for each slot or None if the slots can't be filled
+        :rtype: list or None
+        """
+        slot_order = list(range(len(slots)))
+        if random_order:
+            random.shuffle(slot_order)
+            starts = [random.randrange(len(c)) if len(c) > 0 else 0
+                      for c in cands]
+        else:
+            starts = [0] * len(slots)
+        slot_row = [None] * len(slots)
+        row_slot = {}
+        for slot in slot_order:
+            if not self._match_slot(slot, cands, starts, slot_row, row_slot,
+                                    set()):
+                return None
+        return slot_row
+
+    def _match_slot(self, slot, cands, starts, slot_row, row_slot, visited):
+        """
+        Find a player for a slot with an augmenting path search
+
+        :return: True if the slot was filled
+        """
+        slot_cands = cands[slot]
+        n = len(slot_cands)
+        for k in range(n):
+            row = slot_cands[(starts[slot] + k) % n]
+            if row in visited:
+                continue
+            visited.add(row)
+            if row not in row_slot or \
+                    self._match_slot(row_slot[row], cands, starts, slot_row,
+                                     row_slot, visited):
+                row_slot[row] = slot
+                slot_row[slot] = row
+                return True
+        return False
+
+    def _score_batch(self, drawn):
+        """
+        Score a batch of lineups
+
+        If the scorer can summarize many rosters at once, all of the lineups
+        are summarized with one call.  Otherwise each lineup is summarized by
+        its stat accumulator.
+
+        :param drawn: List of (lineup, rows, sids) tuples
+        :return: Score of each lineup
+        :rtype: list
+        """
+        scorer = self.score_comparer.scorer
+        if len(drawn) == 0 or not hasattr(scorer, 'summarize_batch'):
+            return [self.score_comparer.compute_score(
+                lineup.compute_stat_summary()) for lineup, _, _ in drawn]
+        # The locked players may not have the weekly columns that the pool
+        # has.  The scorer computes those values from their projections, the
+        # same as the stat accumulator does for later generations.
+        seed_df = roster.players_to_frame(self.seed_lineup.get_roster())
+        df = pd.concat([seed_df, self.plyr_pool.frame], ignore_index=True,
+                       sort=False)
+        offset = len(seed_df.index)
+        membership = np.zeros((len(drawn), len(df.index)))
+        membership[:, :offset] = 1
+        for i, (_, rows, _) in enumerate(drawn):
+            membership[i, np.asarray(rows) + offset] = 1
+        summaries = scorer.summarize_batch(df, membership)
+        return [self.score_comparer.compute_score(summary)
+                for _, summary in summaries.iterrows()]
+
     def _generate_seed_lineup(self, locked_plyrs):
         """
         Generate an initial lineup of all of the locked players
@@ -187,92 +444,6 @@ class GeneticAlgorithm:
                 return None
         return lineup
 
-    def _gen_player_selector(self, gen_type='pct_own'):
-        """
-        Generate a player selector for a given generation type
-
-        :param gen_type: Specify how to sort the player selector.  Acceptable
-            values are 'pct_own' and 'random'.  'pct_own' will pick lineups
-            with preference to the players who have the highest percent owned.
-            'random' will generate totally random lineups.
-        :return: built PlayerSelector
-        """
-        self.logger.info(f"Setting up player selection of {len(self.ppool.index)} players")
-        selector = roster.PlayerSelector(self.ppool)
-        if gen_type == 'pct_own':
-            selector.set_descending_categories([])
-            selector.rank(['percent_owned'])
-        else:
-            assert(gen_type == 'random')
-            selector.shuffle()
-        return selector
-
-    def _add_completed_lineup(self, lineup):
-        assert(len(lineup.get_roster()) == self.roster_bldr.max_players())
-        sids = self._to_sids(lineup)
-        if self._is_dup_sids(sids):
-            return
-        stat_sum = lineup.compute_stat_summary()
-        score = self.score_comparer.compute_score(stat_sum)
-        self.population.append({'players': lineup,
-                                'score': score,
-                                'id': self._gen_lineup_id(),
-                                'sids': sids})
-
-    def _fit_plyr_to_lineup(self, plyr, lineup):
-        """
-        Tries to fit the player to the lineup.
-
-        If the lineup becomes full, then it will be add to the population.
-
-        :param plyr: Player attempt to add
-        :param lineup: Current lineup
-        :return: True if player was added
-        """
-        fit = False
-        try:
-            plyr['selected_position'] = np.nan
-            lineup = self.roster_bldr.fit_if_space(lineup, plyr)
-            fit = True
-
-            if len(lineup.get_roster()) == self.roster_bldr.max_players():
-                self._add_completed_lineup(lineup)
-        except LookupError:
-            pass   # Try fitting in the next rcont
-        return fit
-
-    def _generate_lineups(self, max_lineups, selector):
-        """
-        Create lineups for initial population
-
-        New lineups will be added to self.population.
-
-        :param max_lineups: The maximum number of lineups to have in
-        :param selector: PlayerSelector to use to pick players to fill lineups
-            self.population
-        """
-        assert(len(self.population) < max_lineups)
-        lineups = []
-        for plyr in selector.select():
-            fit = False
-            if len(self.population) == max_lineups:
-                self.logger.info(f"Stopping lineup generation, reached {max_lineups} lineups")
-                return
-            if plyr[self.player_id_col] in self.locked_ids:
-                continue
-            for lineup in lineups:
-                if len(lineup.get_roster()) == self.roster_bldr.max_players():
-                    continue
-                fit = self._fit_plyr_to_lineup(plyr, lineup)
-                if fit:
-                    break
-
-            if not fit:
-                lineup = copy.deepcopy(self.seed_lineup)
-                lineups.append(lineup)
-                self._fit_plyr_to_lineup(plyr, lineup)
-        self.logger.info(f"Finished lineup generation, reached {len(self.population)} complete lineups and {len(lineups)} total lineups")
-
     def _remove_from_pop(self, lineup):
         for i, p in enumerate(self.population):
             if lineup['id'] == p['id']:
@@ -320,7 +491,7 @@ class GeneticAlgorithm:
 
         :return: List of lineups.  Return None if not enough lineups exists.
         """
-        k = int(self.cfg['LineupOptimizer']['tournamentParticipants'])
+        k = self.settings.tournament_participants
         if k > len(self.population):
             pw = math.floor(math.log(len(self.population), 2))
             k = 2**pw
@@ -355,8 +526,8 @@ class GeneticAlgorithm:
         assert(mates[0]['sids'] != mates[1]['sids'])
         ppool = self._create_player_pool(mates)
         offspring = [mates[0], mates[1]]
-        for _ in range(int(self.cfg['LineupOptimizer']['numOffspring'])):
-            plyrs = self._complete_lineup(ppool, self.seed_lineup)
+        for _ in range(self.settings.num_offspring):
+            plyrs = self._complete_lineup(ppool, self.seed_lineup.fork())
             stat_sum = plyrs.compute_stat_summary()
             score = self.score_comparer.compute_score(stat_sum)
             offspring.append({'players': plyrs, 'score': score,
@@ -382,7 +553,8 @@ class GeneticAlgorithm:
         The player pool is suitable for use with the PlayerSelector
 
         :param lineups: Set of lineups to create a pool out of
-        :return: DataFrame of all of the unique players in the lineups
+        :return: All of the unique players in the lineups
+        :rtype: list(roster.Player)
         """
         plyrs = []
         player_ids = []
@@ -392,7 +564,7 @@ class GeneticAlgorithm:
                 if plyr['player_id'] not in player_ids:
                     plyrs.append(plyr)
                     player_ids.append(plyr['player_id'])
-        return pd.DataFrame(plyrs)
+        return plyrs
 
     def _complete_lineup(self, ppool, rcont):
         """
@@ -401,6 +573,7 @@ class GeneticAlgorithm:
         The players are selected at random.
 
         :param ppool: Player pool to pull from
+        :type ppool: roster.PlayerPool or list(roster.Player)
         :param rcont: Lineup to fill.  Can be empty.
         :type rcont: roster.Container
         :return: Roster that contains the players in the lineup
@@ -430,7 +603,7 @@ class GeneticAlgorithm:
 
         Mutation simply means swapping out the player with a random player.
         """
-        mutate_pct = int(self.cfg['LineupOptimizer']['mutationPct'])
+        mutate_pct = self.settings.mutation_pct
         add_lineups = []
         rem_lineups = []
         for lineup in self.population:
@@ -439,7 +612,7 @@ class GeneticAlgorithm:
                 continue
 
             self._log_lineup("(Pre) Mutated lineup", lineup)
-            self._complete_lineup(self.ppool, new_plyrs)
+            self._complete_lineup(self.plyr_pool, new_plyrs)
             assert(len(new_plyrs.get_roster()) == self.roster_bldr.max_players())
             sids = self._to_sids(new_plyrs)
             if self._is_dup_sids(sids):
@@ -461,8 +634,8 @@ class GeneticAlgorithm:
         """
         Copy and modify the list of players with mutated players removed
 
-        This does a deep copy of the plyrs so that we retain the original
-        lineup in case the mutation does not improve things.
+        This forks the lineup so that we retain the original lineup in case
+        the mutation does not improve things.
 
         :param plyrs: List of players to consider for mutation
         :return: Players with mutated players removed.  Return None if no
@@ -481,7 +654,7 @@ class GeneticAlgorithm:
                 mutates.append(i)
         if len(mutates) == 0:
             return None
-        new_rcont = copy.deepcopy(rcont)
+        new_rcont = rcont.fork()
         mutates.reverse()   # Delete at the end of rcont first
         for i in mutates:
             new_rcont.del_player(i)
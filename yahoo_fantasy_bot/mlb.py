@@ -2,73 +2,145 @@
 
 from baseball_scraper import baseball_reference, espn, fangraphs
 from baseball_id import Lookup
-from yahoo_fantasy_bot import utils, source
+from yahoo_fantasy_bot import utils, source, settings, crosswalk, points
 import pandas as pd
 import numpy as np
+import concurrent.futures
+import copy
 import datetime
+import hashlib
+import io
 import logging
+import os
+import pickle
 
 
 logger = logging.getLogger()
 
 
+# Lets the bot know that the builder caches its own components, so the
+# builder itself isn't pickled
+CACHES_OWN_COMPONENTS = True
+
+
 class Builder:
     """Class that constructs prediction datasets for hitters and pitchers.
 
     The datasets it generates are fully populated with projected stats.  The
     projection stats are scraped from fangraphs.com.
 
+    The builder is made up of components that are each cached on their own,
+    with their own expiry: the projections, the week dates, the probable
+    starters and the team schedules.  Each component is only loaded, or
+    rebuilt if it is stale, when it is first used.
+
     :param lg: Yahoo! league
     :type lg: yahoo_fantasy_api.league.League
     :param cfg: config details
     :type cfg: ConfigParser
-    :param csv_details: Details about projections, stored in csv format
-    :type csv_details: dict
-    :param ts: Scraper to use to pull team data from baseball_reference.com
+    :param csv_details: Details about projections, stored in csv format.  This
+        can be a function that returns the details, so that they are only
+        fetched when the projections need to be rebuilt.
+    :type csv_details: dict or function
+    :param ts: Scraper to use to pull team data from baseball_reference.com.
+        The team schedules are scraped concurrently, each with a new instance
+        of this scraper's class.
     :type ts: baseball_reference.TeamScraper
-    :param es: Scraper to use to pull probable starters from espn
+    :param es: Scraper to use to pull probable starters from espn.  Pass None
+        to create one for the week that the lineup is being set for.
     :type es: espn.ProbableStartersScraper
     :param tss: Scraper to use to pull team list data from baseball_reference
     :type tss: baseball_reference.TeamSummaryScraper
     """
 
     def __init__(self, lg, cfg, csv_details, ts, es, tss):
-        hitters = source.read_csv(csv_details['hitters'])
-        pitchers = source.read_csv(csv_details['pitchers'])
-        self.ppool = pd.concat([hitters, pitchers], sort=True)
         self.id_lookup = Lookup
-        self.use_weekly_schedule = \
-            cfg['Scorer'].getboolean('useWeeklySchedule')
+        self.lg = lg
+        self.cfg = settings.load(cfg)
+        self.use_weekly_schedule = self.cfg.scorer.use_weekly_schedule
+        self.scorer = Scorer(cfg)
+        self.point_stats = points.weighted_stats(cfg)
         self.source = cfg['Prediction']['source']
+        self.csv_details = csv_details
         self.ts = ts
         self.es = es
         self.tss = tss
         self.join_col_csv = cfg['Prediction']['join_column_csv']
         self.join_col_id_lookup = cfg['Prediction']['join_column_id_lookup']
-        if lg.settings()['weekly_deadline'] != '1':
-            raise RuntimeError("This bot only supports weekly lineups.")
-        # In the preseason the edit date will be the next day.  Only once the
-        # season starts does the edit date advance to the start of the next
-        # week.
-        if lg.current_week() == 1:
-            self.wk_start_date, self.wk_end_date = lg.week_date_range(1)
-        else:
-            self.wk_start_date = lg.edit_date()
-            assert(self.wk_start_date.weekday() == 0)
-            self.wk_end_date = self.wk_start_date + datetime.timedelta(days=6)
-        self.season_end_date = datetime.date(self.wk_end_date.year, 12, 31)
-
-    def __getstate__(self):
-        return (self.ppool, self.ts, self.es, self.tss, self.join_col_csv,
-                self.join_col_id_lookup, self.wk_start_date,
-                self.wk_end_date, self.season_end_date,
-                self.use_weekly_schedule, self.source)
-
-    def __setstate__(self, state):
-        self.id_lookup = Lookup
-        (self.ppool, self.ts, self.es, self.tss, self.join_col_csv,
-         self.join_col_id_lookup, self.wk_start_date, self.wk_end_date,
-         self.season_end_date, self.use_weekly_schedule, self.source) = state
+        self.cache = utils.ComponentCache(self.cfg, 'prediction')
+        self.crosswalk = crosswalk.Crosswalk(
+            os.path.join(self.cfg.cache.dir, 'crosswalk.pkl'),
+            crosswalk.baseball_id_version())
+        self.schedule_fn = os.path.join(self.cfg.cache.dir,
+                                        'team_schedule.pkl')
+        self.schedule = None
+        self.week = None
+        self.starts = None
+        self._ppool = None
+        self.memo = utils.PredictionMemo()
+
+    @property
+    def ppool(self):
+        """Projections for all players, loaded when first used"""
+        if getattr(self, '_ppool', None) is None:
+            self._ppool = self._load_component(
+                'projections', self.cfg.cache.prediction_builder_expiry,
+                self._load_projections)
+            self._index_ppool()
+        return self._ppool
+
+    @ppool.setter
+    def ppool(self, df):
+        self._ppool = df
+        self._index_ppool()
+
+    @property
+    def wk_start_date(self):
+        return self._week()['wk_start_date']
+
+    @property
+    def wk_end_date(self):
+        return self._week()['wk_end_date']
+
+    @property
+    def season_end_date(self):
+        return self._week()['season_end_date']
+
+    def _load_component(self, name, expiry, loader):
+        """Return a component of the builder from its cache
+
+        :param name: Name of the component
+        :type name: str
+        :param expiry: Minutes before the cached component is rebuilt
+        :type expiry: int
+        :param loader: Function that builds the component
+        :return: The component
+        """
+        if getattr(self, 'cache', None) is None:
+            return loader()
+        return self.cache.load(name, datetime.timedelta(minutes=expiry),
+                               loader)
+
+    def _load_projections(self):
+        csv_details = self.csv_details() if callable(self.csv_details) \
+            else self.csv_details
+        store = source.projection_store(self.cfg)
+        join_cols = ['player_id', 'playerid', self.join_col_csv]
+        stat_cols = self.scorer.all_cats + self.scorer.scored_stats() + \
+            self.point_stats + ['G']
+        cols = source.projection_columns(join_cols, stat_cols)
+        hitters = source.read_csv(csv_details['hitters'], store, cols)
+        pitchers = source.read_csv(csv_details['pitchers'], store, cols)
+        return source.compact_projections(
+            pd.concat([hitters, pitchers], sort=True), join_cols, stat_cols,
+            'mlb')
+
+    def _week(self):
+        if self.week is None:
+            self.week = self._load_component(
+                'week', self.cfg.cache.week_metadata_expiry,
+                lambda: week_metadata(self.lg))
+        return self.week
 
     def set_id_lookup(self, lk):
         self.id_lookup = lk
@@ -78,27 +150,41 @@ class Builder:
 
         :param plyrs: List of dicts that contain the player name and their
             Yahoo! ID.  These are all of the players we will return.
-        :return: List of players from the player pool
+        :return: Players from the player pool, in the order of plyrs.  The
+            fields in plyrs take precedence over the projections.
+        :rtype: DataFrame
         """
+        if len(plyrs) == 0:
+            return pd.DataFrame()
+        ppool = self.ppool
+        plyr_df = pd.DataFrame(plyrs)
         if self.source.startswith("yahoo"):
-            for plyr in plyrs:
-                stats = self.ppool[self.ppool['player_id'] == plyr['player_id']].to_dict('records')[0]
-                dict = {**stats, **plyr}
-                yield pd.Series(dict)
+            pos = source.lookup_projections(self.ppool_indexes, 'player_id',
+                                            plyr_df['player_id'].to_list())
+            for plyr, p in zip(plyrs, pos):
+                if p < 0:
+                    raise ValueError(f"Could not find any prediction for {plyr['name']} (id: {plyr['player_id']})")
+            frames = [ppool.iloc[pos], plyr_df]
         else:
             assert(self.source == 'csv')
-            for plyr in plyrs:
-                meta = self._lookup_plyr(plyr, True).to_dict('records')[0]
-                if meta[self.join_col_id_lookup] is np.nan:
+            (cands, matches) = self._resolve_ids(plyrs, True)
+            meta = cands.iloc[[m[0] for m in matches]]
+            ids = meta[self.join_col_id_lookup].to_list()
+            pos = source.lookup_projections(self.ppool_indexes,
+                                            self.join_col_csv, ids)
+            for plyr, plyr_id, p in zip(plyrs, ids, pos):
+                if pd.isnull(plyr_id):
                     raise ValueError("{} does not have a value for {}".format(plyr['name'], self.join_col_id_lookup))
-                stats = self.ppool[
-                    self.ppool[self.join_col_csv] == meta[self.join_col_id_lookup]
-                ]
-                if len(stats) == 0:
-                    raise ValueError(f"Could not find any prediction for {plyr['name']} (id: {meta[self.join_col_id_lookup]})")
-                stats = stats.to_dict('records')[0]
-                dict = {**meta, **stats, **plyr}
-                yield pd.Series(dict)
+                if p < 0:
+                    raise ValueError(f"Could not find any prediction for {plyr['name']} (id: {plyr_id})")
+            frames = [meta, ppool.iloc[pos], plyr_df]
+        df = pd.concat([f.reset_index(drop=True) for f in frames], axis=1)
+        # Same as merging the dicts in order: the last frame with a column wins
+        return df.loc[:, ~df.columns.duplicated(keep='last')]
+
+    def _index_ppool(self):
+        self.ppool_indexes = source.index_projections(
+            self._ppool, ['player_id', self.join_col_csv])
 
     def predict(self, plyrs, fail_on_missing=True, team_has='abbrev'):
         """Build a dataset of hitting and pitching predictions for the week
@@ -121,6 +207,27 @@ class Builder:
         :return: Dataset of predictions
         :rtype: DataFrame
         """
+        # Each player is only predicted once per run.  The fields taken from
+        # Yahoo! can change between calls, so they are refreshed from plyrs.
+        plyrs = [plyr for roster_type in ['B', 'P'] for plyr in plyrs
+                 if plyr['position_type'] == roster_type and
+                 not _is_benched(plyr)]
+        new_plyrs = self.memo.unseen(plyrs, fail_on_missing)
+        if len(new_plyrs) > 0:
+            self.memo.add(new_plyrs, self._predict(new_plyrs, fail_on_missing,
+                                                   team_has),
+                          fail_on_missing)
+        res = self.memo.lookup(plyrs)
+        if res is None:
+            return pd.DataFrame().assign(selected_position=np.nan)
+        by_id = {plyr['player_id']: plyr for plyr in plyrs}
+        attrs = _yahoo_attrs([by_id[pid] for pid in res['player_id']],
+                             res.index)
+        if 'percent_owned' not in attrs and 'percent_owned' in res.columns:
+            res = res.drop(columns=['percent_owned'])
+        return res.assign(**attrs)
+
+    def _predict(self, plyrs, fail_on_missing, team_has):
         res = pd.DataFrame()
         for roster_type in ['B', 'P']:
             lk = self._find_roster(roster_type, plyrs, fail_on_missing)
@@ -169,7 +276,29 @@ class Builder:
         # It is currently set to NaN since other modules fill that in.
         res = res.assign(selected_position=np.nan)
 
-        return res
+        return self._materialize_weekly_stats(res)
+
+    def _materialize_weekly_stats(self, df):
+        """Add a column with the weekly-effective value of each scored stat
+
+        The scorer and stat accumulator read these columns rather than
+        applying the weekly schedule each time a player is evaluated.  In a
+        points league, every stat that is worth points gets a column too.
+
+        :param df: Predictions for the players
+        :type df: DataFrame
+        :return: Predictions with a utils.weekly_stat_column() for each stat
+        :rtype: DataFrame
+        """
+        if len(df.index) == 0:
+            return df
+        stats = self.scorer.scored_stats()
+        stats += [s for s in self.point_stats
+                  if s in df.columns and s not in stats]
+        vals = self.scorer.stat_values(df, stats)
+        wk_cols = {utils.weekly_stat_column(stat): vals[:, i]
+                   for i, stat in enumerate(stats)}
+        return df.assign(**wk_cols)
 
     def _lookup_teams(self, teams, team_has):
         if team_has == 'just_name':
@@ -204,102 +333,400 @@ class Builder:
         return a
 
     def _lookup_plyr(self, plyr, fail_on_missing):
-        one_lk = self.id_lookup.from_yahoo_ids([str(plyr['player_id'])])
-        # Do a lookup of names if the ID lookup didn't work.  We do two of
-        # them.  The first one is to filter on any name that has a missing
-        # yahoo_id.  This is better then just a plain name lookup because
-        # it has a better chance of being unique.  A missing ID typically
-        # happens for rookies.
-        if len(one_lk.index) == 0:
-            one_lk = self.id_lookup.from_names(
-                [plyr['name']], filter_missing='yahoo_id')
-            # Fallback to a pure-name lookup.  There have been instances
-            # with hitter/pitchers where they have two IDs: one for
-            # pitchers and one for hitters.  The id_lookup only keeps
-            # track of one of those IDs.  We will strip off the '(Batter)'
-            # from their name.
-            if len(one_lk.index) == 0:
-                paren = plyr['name'].find('(')
-                if paren > 0:
-                    name = plyr['name'][0:paren-1].strip()
-                else:
-                    name = plyr['name']
-                    # Get rid of any accents
-                    name = utils.normalized(name)
-                one_lk = self.id_lookup.from_names([name])
-
-            if len(one_lk.index) != 1:
-                if fail_on_missing:
-                    raise ValueError("Was not able to lookup player: {}".
-                                     format(plyr))
-        if len(one_lk.index) > 0 and fail_on_missing and \
-            pd.isnull(one_lk.to_dict('records')[0]['yahoo_id']):
-            raise ValueError(f"The player {plyr['name']} was in the baseball_id db but didn't have a Yahoo ID")
-        return one_lk
+        (cands, matches) = self._resolve_ids([plyr], fail_on_missing)
+        return cands.iloc[matches[0]]
+
+    def preflight(self, plyrs):
+        """Check that players can be resolved to a projection
+
+        All of the players are resolved in one batch, the same way that
+        predict() and select_players() resolve them, without failing on the
+        first player that can't be found.
+
+        :param plyrs: Yahoo! players to check
+        :type plyrs: list(dict)
+        :return: A dict for each player that can't be resolved.  It has the
+            player, the reason and the list of strategies that were tried to
+            find the player in the ID lookup.
+        :rtype: list(dict)
+        """
+        plyrs = [plyr for plyr in plyrs if plyr['position_type'] in ['B', 'P']]
+        if len(plyrs) == 0:
+            return []
+        (cands, matches, methods) = self._match_ids(plyrs)
+        # Loading the projections builds the indexes that they are checked in
+        self.ppool
+        unresolved = []
+        for plyr, match, method in zip(plyrs, matches, methods):
+            reason = _id_problem(plyr, cands, match, method)
+            if reason is None:
+                reason = self._projection_problem(plyr, cands.iloc[match[0]])
+            if reason is not None:
+                tried = RESOLVE_STRATEGIES[
+                    :RESOLVE_STRATEGIES.index(method) + 1]
+                unresolved.append({'player': plyr, 'reason': reason,
+                                   'tried': tried})
+        return unresolved
+
+    def _projection_problem(self, plyr, meta):
+        """Return why a player that is in the ID lookup has no projection
+
+        :param plyr: Yahoo! player
+        :type plyr: dict
+        :param meta: Row of the ID lookup for the player
+        :type meta: Series
+        :return: The reason or None if the player has a projection
+        :rtype: str or None
+        """
+        if self.source.startswith("yahoo"):
+            plyr_id = plyr['player_id']
+            col = 'player_id'
+        else:
+            plyr_id = meta[self.join_col_id_lookup]
+            col = self.join_col_csv
+            if pd.isnull(plyr_id):
+                return "{} does not have a value for {}".format(
+                    plyr['name'], self.join_col_id_lookup)
+        if source.lookup_projections(self.ppool_indexes, col,
+                                     [plyr_id])[0] < 0:
+            return f"Could not find any prediction for {plyr['name']} (id: {plyr_id})"
+        return None
+
+    def _resolve_ids(self, plyrs, fail_on_missing):
+        """Find the players in the ID lookup
+
+        :param plyrs: Players to lookup
+        :type plyrs: list
+        :param fail_on_missing: True if we are to fail for a player that
+            can't be found.  The players are checked in order, so the error is
+            for the first player that fails.
+        :type fail_on_missing: bool
+        :return: DataFrame of candidate rows from the ID lookup, and for each
+            player the positions of its matches in that DataFrame
+        :rtype: (DataFrame, list(list(int)))
+        """
+        (cands, matches, methods) = self._match_ids(plyrs)
+        if fail_on_missing:
+            for plyr, match, method in zip(plyrs, matches, methods):
+                reason = _id_problem(plyr, cands, match, method)
+                if reason is not None:
+                    raise ValueError(reason)
+        return (cands, matches)
+
+    def _match_ids(self, plyrs):
+        """Find the players in the ID lookup
+
+        The crosswalk is consulted first.  The rest of the players are looked
+        up by their Yahoo! ID in one call.  Two name lookups are done for the
+        players that aren't found by ID.  The first is on names that are
+        missing a yahoo_id.  This is better than a plain name lookup because
+        it has a better chance of being unique.  A missing ID typically
+        happens for rookies.  The second is a plain name lookup.  There have
+        been instances with hitter/pitchers where they have two IDs: one for
+        pitchers and one for hitters.  The id_lookup only keeps track of one
+        of those IDs.  We strip off the '(Batter)' from their name.  Each
+        fallback is a single call for all of the players that are still
+        missing.  Before the name lookups, the crosswalk is searched for
+        another Yahoo! player of the same name that was resolved by name.
+        The players that were looked up are added to the crosswalk.
+
+        :param plyrs: Players to lookup
+        :type plyrs: list
+        :return: DataFrame of candidate rows from the ID lookup, and for each
+            player the positions of its matches in that DataFrame and the
+            RESOLVE_STRATEGIES entry that found them (or was tried last)
+        :rtype: (DataFrame, list(list(int)), list(str))
+        """
+        frames = []
+        matches = [None] * len(plyrs)
+        methods = [None] * len(plyrs)
+        offset = 0
+
+        xwalk = getattr(self, 'crosswalk', None)
+        if xwalk is not None:
+            if not xwalk.db_checked:
+                # Load the ID lookup the first time the crosswalk is used, so
+                # that it is checked against the database before any of its
+                # entries are used.
+                self.id_lookup.from_yahoo_ids([])
+                xwalk.check_lookup(self.id_lookup.df)
+            rows = []
+            for i, plyr in enumerate(plyrs):
+                entry = xwalk.get(plyr['player_id'], plyr['name'])
+                if entry is not None:
+                    matches[i] = list(range(len(rows),
+                                            len(rows) + len(entry['rows'])))
+                    methods[i] = entry['method']
+                    rows += entry['rows']
+            if len(rows) > 0:
+                frames.append(xwalk.rows_frame(rows))
+                offset = len(rows)
+
+        todo = [i for i, m in enumerate(matches) if m is None]
+        if len(todo) > 0:
+            id_df = self.id_lookup.from_yahoo_ids(
+                [str(plyrs[i]['player_id']) for i in todo])
+            by_id = {}
+            for pos, yahoo_id in enumerate(id_df['yahoo_id']):
+                by_id.setdefault(crosswalk.id_key(yahoo_id), []).append(pos)
+            for i in todo:
+                matches[i] = [offset + pos for pos in by_id.get(
+                    crosswalk.id_key(plyrs[i]['player_id']), [])]
+                methods[i] = 'yahoo_id'
+            frames.append(id_df)
+            offset += len(id_df.index)
+
+            missing = [i for i in todo if len(matches[i]) == 0]
+            if xwalk is not None and len(missing) > 0:
+                # Another Yahoo! player with the same name may have been
+                # resolved by name already.  The name lookups would find the
+                # same rows for this player.
+                rows = []
+                for i in missing:
+                    entry = _entry_by_name(xwalk, plyrs[i]['name'])
+                    if entry is not None:
+                        matches[i] = list(range(offset + len(rows),
+                                                offset + len(rows) +
+                                                len(entry['rows'])))
+                        methods[i] = entry['method']
+                        rows += entry['rows']
+                if len(rows) > 0:
+                    frames.append(xwalk.rows_frame(rows))
+                    offset += len(rows)
+                missing = [i for i in missing if len(matches[i]) == 0]
+            if len(missing) > 0:
+                name_df = self.id_lookup.from_names(
+                    [plyrs[i]['name'] for i in missing],
+                    filter_missing='yahoo_id')
+                by_name = _positions_by_name(name_df)
+                for i in missing:
+                    matches[i] = [offset + pos for pos in
+                                  by_name.get(plyrs[i]['name'], [])]
+                    methods[i] = 'name_missing_yahoo_id'
+                frames.append(name_df)
+                offset += len(name_df.index)
+
+                missing = [i for i in missing if len(matches[i]) == 0]
+                if len(missing) > 0:
+                    names = {}
+                    for i in missing:
+                        name = plyrs[i]['name']
+                        paren = name.find('(')
+                        if paren > 0:
+                            name = name[0:paren-1].strip()
+                        else:
+                            # Get rid of any accents
+                            name = utils.normalized(name)
+                        names[i] = name
+                    name_df = self.id_lookup.from_names(list(names.values()))
+                    by_name = _positions_by_name(name_df)
+                    for i in missing:
+                        matches[i] = [offset + pos for pos in
+                                      by_name.get(names[i], [])]
+                        methods[i] = 'name'
+                    frames.append(name_df)
+
+        cands = pd.concat(frames) if len(frames) > 1 else frames[0]
+        if xwalk is not None and len(todo) > 0:
+            # Players that weren't found are looked up again next time, since
+            # they may have been added to the database.
+            for i in todo:
+                if len(matches[i]) > 0:
+                    xwalk.add(plyrs[i]['player_id'], plyrs[i]['name'],
+                              methods[i], cands.iloc[matches[i]])
+            xwalk.save()
+        return (cands, matches, methods)
 
     def _find_roster(self, position_type, roster, fail_on_missing=True):
-        lk = None
-        for plyr in roster:
-            if plyr['position_type'] != position_type or \
-                    ('selected_position' in plyr and
-                     plyr['selected_position'] in ['BN', 'IL', 'DL']):
-                continue
+        plyrs = [plyr for plyr in roster
+                 if plyr['position_type'] == position_type and
+                 not _is_benched(plyr)]
+        if len(plyrs) == 0:
+            return None
+        (cands, matches) = self._resolve_ids(plyrs, fail_on_missing)
+        found = [i for i, m in enumerate(matches) if len(m) == 1]
+        if len(found) == 0:
+            return None
+
+        lk = cands.iloc[[matches[i][0] for i in found]]
+        return lk.assign(**_yahoo_attrs([plyrs[i] for i in found], lk.index))
 
-            one_lk = self._lookup_plyr(plyr, fail_on_missing)
-            if len(one_lk.index) != 1:
-                continue
+    def _num_games_for_teams(self, abrevs, week):
+        """Return the number of games each team plays
+
+        :param abrevs: Team abbreviations.  A team of None plays no games.
+        :type abrevs: list(str)
+        :param week: True to count the games in the upcoming week.  False to
+            count the games for the rest of the season.
+        :type week: bool
+        :return: Number of games for each team
+        :rtype: numpy.ndarray
+        """
+        end_date = self.wk_end_date if week else self.season_end_date
+        return self._team_schedule().games(abrevs, self.wk_start_date,
+                                           end_date)
 
-            ep_series = pd.Series([plyr["eligible_positions"]], dtype="object",
-                                  index=one_lk.index)
-            one_lk = one_lk.assign(eligible_positions=ep_series)
-            yahoo_series = pd.Series([plyr['player_id']], index=one_lk.index)
-            one_lk = one_lk.assign(player_id=yahoo_series)
-            status_series = pd.Series([plyr['status']], index=one_lk.index)
-            one_lk = one_lk.assign(status=status_series)
-            name_series = pd.Series([plyr['name']], index=one_lk.index)
-            one_lk = one_lk.assign(name=name_series)
-            pt_series = pd.Series([plyr['position_type']], index=one_lk.index)
-            one_lk = one_lk.assign(position_type=pt_series)
-            if 'percent_owned' in plyr:
-                pct_series = pd.Series([plyr['percent_owned']],
-                                       index=one_lk.index)
-                one_lk = one_lk.assign(percent_owned=pct_series)
+    def _team_schedule(self):
+        if getattr(self, 'schedule', None) is None:
+            self.schedule = TeamSchedule(self.wk_start_date,
+                                         self.season_end_date,
+                                         type(self.ts), self.schedule_fn)
+        return self.schedule
 
-            if lk is None:
-                lk = one_lk
-            else:
-                lk = pd.concat([lk, one_lk])
-        return lk
+    def _num_gs(self, espn_ids):
+        """Return the number of probable starts for each pitcher
 
-    def _num_games_for_team(self, abrev, week):
-        if abrev is None:
-            return 0
-        if week:
-            self.ts.set_date_range(self.wk_start_date, self.wk_end_date)
-        else:
-            self.ts.set_date_range(self.wk_start_date, self.season_end_date)
-        df = self.ts.scrape(abrev)
-        return len(df.index)
+        :param espn_ids: ESPN IDs of the players
+        :type espn_ids: list
+        :return: Number of starts for each player
+        :rtype: numpy.ndarray
+        """
+        starts = self._starts_by_espn_id()
+        return pd.Series(espn_ids, dtype='object').map(starts).fillna(
+            0).to_numpy(dtype=np.int64)
 
-    def _num_games_for_teams(self, abrevs, week):
-        games = []
-        for abrev in abrevs:
-            games.append(self._num_games_for_team(abrev, week))
-        return games
+    def _starts_by_espn_id(self):
+        """Return the number of probable starts indexed by ESPN ID
 
-    def _num_gs(self, espn_ids):
-        df = self.es.scrape()
-        num_GS = []
-        for espn_id in espn_ids:
-            if len(df.index) > 0:
-                gs = len(df[df.espn_id == espn_id].index)
-            else:
-                gs = 0
-            num_GS.append(gs)
-        return num_GS
+        The counts are computed once per scrape of the probable starters and
+        are cached for the probableStartersExpiry setting.
+
+        :rtype: Series
+        """
+        if self.starts is None:
+            self.starts = self._load_component(
+                'probable_starters', self.cfg.cache.probable_starters_expiry,
+                self._scrape_starts)
+        return self.starts
+
+    def _scrape_starts(self):
+        es = self.es
+        if es is None:
+            es = espn.ProbableStartersScraper(
+                self._week()['starters_start_date'],
+                self._week()['starters_end_date'])
+        df = es.scrape()
+        if len(df.index) > 0:
+            return df['espn_id'].value_counts()
+        return pd.Series(dtype='int64')
+
+
+# The ways a Yahoo! player is searched for in the ID lookup, in order
+RESOLVE_STRATEGIES = ['yahoo_id', 'name_missing_yahoo_id', 'name']
+
+
+def _id_problem(plyr, cands, match, method):
+    """Return why a player wasn't properly found in the ID lookup
+
+    :param plyr: Yahoo! player
+    :type plyr: dict
+    :param cands: Candidate rows from the ID lookup
+    :type cands: DataFrame
+    :param match: Positions in cands that matched the player
+    :type match: list(int)
+    :param method: Strategy that found the player
+    :type method: str
+    :return: The reason or None if the player was found
+    :rtype: str or None
+    """
+    if method != 'yahoo_id' and len(match) != 1:
+        return "Was not able to lookup player: {}".format(plyr)
+    if len(match) > 0 and pd.isnull(cands['yahoo_id'].iloc[match[0]]):
+        return f"The player {plyr['name']} was in the baseball_id db but didn't have a Yahoo ID"
+    return None
 
 
-def init_prediction_builder(lg, cfg):
+def _is_benched(plyr):
+    return 'selected_position' in plyr and \
+        plyr['selected_position'] in ['BN', 'IL', 'DL']
+
+
+def _yahoo_attrs(plyrs, index):
+    """Return the columns of the predictions that are taken from Yahoo!
+
+    :param plyrs: Yahoo! player for each row of the predictions
+    :type plyrs: list(dict)
+    :param index: Index of the predictions
+    :return: Map of column name to values
+    :rtype: dict
+    """
+    attrs = {
+        'eligible_positions': pd.Series(
+            [plyr['eligible_positions'] for plyr in plyrs],
+            dtype="object", index=index),
+        'player_id': [plyr['player_id'] for plyr in plyrs],
+        'status': [plyr['status'] for plyr in plyrs],
+        'name': [plyr['name'] for plyr in plyrs],
+        'position_type': [plyr['position_type'] for plyr in plyrs]}
+    if any('percent_owned' in plyr for plyr in plyrs):
+        attrs['percent_owned'] = [
+            plyr['percent_owned'] if 'percent_owned' in plyr else np.nan
+            for plyr in plyrs]
+    return attrs
+
+
+# Columns of the ID lookup that baseball_id matches names against
+LOOKUP_NAME_COLUMNS = ['mlb_name', 'bref_name', 'cbs_name', 'espn_name',
+                       'fg_name', 'retro_name', 'yahoo_name', 'ottoneu_name',
+                       'rotowire_name']
+
+
+def _entry_by_name(xwalk, name):
+    """Find a crosswalk entry that was resolved by a lookup on this name
+
+    :return: The entry or None if no player with that name was resolved by
+        name
+    :rtype: dict or None
+    """
+    for entry in xwalk.find_by_name(name).values():
+        if entry['name'] == name and entry['method'] != 'yahoo_id':
+            return entry
+    return None
+
+
+def _positions_by_name(df):
+    """Map each name in the ID lookup rows to the positions that have it
+
+    :return: Map of name to the sorted positions in df of the rows that
+        match that name in any of the name columns
+    :rtype: dict
+    """
+    by_name = {}
+    for col in LOOKUP_NAME_COLUMNS:
+        if col not in df.columns:
+            continue
+        for pos, name in enumerate(df[col]):
+            if isinstance(name, str):
+                by_name.setdefault(name, set()).add(pos)
+    return {name: sorted(pos) for name, pos in by_name.items()}
+
+
+def week_metadata(lg):
+    """Find the dates of the week that the lineup is being set for
+
+    :param lg: Yahoo! league
+    :type lg: yahoo_fantasy_api.league.League
+    :return: Map with the start and end date of the week (wk_start_date and
+        wk_end_date), the end of the season (season_end_date) and the date
+        range to get the probable starters for (starters_start_date and
+        starters_end_date)
+    :rtype: dict
+    """
+    if lg.settings()['weekly_deadline'] != '1':
+        raise RuntimeError("This bot only supports weekly lineups.")
+    week = {}
+    # In the preseason the edit date will be the next day.  Only once the
+    # season starts does the edit date advance to the start of the next
+    # week.
+    if lg.current_week() == 1:
+        week['wk_start_date'], week['wk_end_date'] = lg.week_date_range(1)
+    else:
+        week['wk_start_date'] = lg.edit_date()
+        assert(week['wk_start_date'].weekday() == 0)
+        week['wk_end_date'] = week['wk_start_date'] + \
+            datetime.timedelta(days=6)
+    week['season_end_date'] = datetime.date(week['wk_end_date'].year, 12, 31)
+
     # Build for week one if we are still in the preseason
     dates_for_next_week = True
     if lg.current_week() == 1:
@@ -308,8 +735,12 @@ def init_prediction_builder(lg, cfg):
             dates_for_next_week = False
     if dates_for_next_week:
         (start_date, end_date) = lg.week_date_range(lg.current_week() + 1)
-    es = espn.ProbableStartersScraper(start_date, end_date)
+    week['starters_start_date'] = start_date
+    week['starters_end_date'] = end_date
+    return week
+
 
+def init_prediction_builder(lg, cfg):
     if 'source' not in cfg['Prediction']:
         raise RuntimeError(
             "Missing 'source' config attribute in 'Prediction' section")
@@ -324,27 +755,156 @@ def init_prediction_builder(lg, cfg):
 
     ts = baseball_reference.TeamScraper()
     tss = baseball_reference.TeamSummaryScraper()
-    return Builder(lg, cfg, cv.fetch_csv_details(), ts, es, tss)
+    return Builder(lg, cfg, cv.fetch_csv_details, ts, None, tss)
+
+
+class TeamSchedule:
+    """Number of games each MLB team plays on each day
+
+    The schedules are kept as a matrix with a row for each team and a column
+    for each day, so that the games over any date range can be counted for
+    many teams at once.  A team's schedule is scraped the first time it is
+    asked for.  The scrapes for all of the new teams in a request run
+    concurrently.  The matrix is saved to disk and reused until the end of
+    the day.
+
+    :param start_date: First day of the schedule
+    :type start_date: datetime.date
+    :param end_date: Last day of the schedule.  It must be in the same season
+        as start_date.
+    :type end_date: datetime.date
+    :param scraper_class: Class used to scrape a team's schedule.  An instance
+        is created for each team so the scrapes don't share any state.
+    :type scraper_class: baseball_reference.TeamScraper
+    :param fn: File to save the matrix in.  Pass None to keep it in memory.
+    :type fn: str
+    """
+    # Maximum number of schedules that are scraped at the same time
+    MAX_WORKERS = 8
+
+    def __init__(self, start_date, end_date, scraper_class, fn=None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.scraper_class = scraper_class
+        self.fn = fn
+        self.teams = {}
+        self.counts = np.zeros((0, (end_date - start_date).days + 1),
+                               dtype=np.int16)
+        self.cum_counts = None
+        self._load()
+
+    def __getstate__(self):
+        return (self.start_date, self.end_date, self.scraper_class, self.fn,
+                self.teams, self.counts)
+
+    def __setstate__(self, state):
+        (self.start_date, self.end_date, self.scraper_class, self.fn,
+         self.teams, self.counts) = state
+        self.cum_counts = None
+
+    def games(self, abrevs, start_date, end_date):
+        """Count the games each team plays in a date range
+
+        :param abrevs: Team abbreviations.  A team of None plays no games.
+        :type abrevs: list(str)
+        :param start_date: First day to count (inclusive)
+        :type start_date: datetime.date
+        :param end_date: Last day to count (inclusive)
+        :type end_date: datetime.date
+        :return: Number of games for each team
+        :rtype: numpy.ndarray
+        """
+        assert(self.start_date <= start_date <= end_date <= self.end_date)
+        self._fetch(set(abrevs) - set(self.teams) - set([None]))
+        if self.cum_counts is None:
+            # Running total of games with an extra row, with no games, that
+            # teams of None are mapped to.
+            (n_teams, n_days) = self.counts.shape
+            self.cum_counts = np.zeros((n_teams + 1, n_days + 1),
+                                       dtype=np.int32)
+            np.cumsum(self.counts, axis=1, out=self.cum_counts[:-1, 1:])
+        rows = np.array([self.teams[a] if a is not None else len(self.teams)
+                         for a in abrevs], dtype=np.intp)
+        first = (start_date - self.start_date).days
+        last = (end_date - self.start_date).days + 1
+        return self.cum_counts[rows, last] - self.cum_counts[rows, first]
+
+    def _fetch(self, abrevs):
+        if len(abrevs) == 0:
+            return
+        abrevs = sorted(abrevs)
+        logger.info("Scraping the schedule for {} teams".format(len(abrevs)))
+        workers = min(self.MAX_WORKERS, len(abrevs))
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            counts = list(executor.map(self._scrape, abrevs))
+        for abrev in abrevs:
+            self.teams[abrev] = len(self.teams)
+        self.counts = np.vstack([self.counts] + counts)
+        self.cum_counts = None
+        self._save()
+
+    def _scrape(self, abrev):
+        ts = self.scraper_class()
+        ts.set_date_range(self.start_date, self.end_date)
+        df = ts.scrape(abrev)
+        days = (pd.to_datetime(df['Date']) -
+                pd.Timestamp(self.start_date)).dt.days.to_numpy()
+        return np.bincount(days, minlength=self.counts.shape[1]).astype(
+            self.counts.dtype)[np.newaxis, :]
+
+    def _load(self):
+        if self.fn is None or not os.path.exists(self.fn):
+            return
+        with open(self.fn, "rb") as f:
+            data = pickle.load(f)
+        if data['built'] == datetime.date.today() and \
+                data['start_date'] == self.start_date and \
+                data['end_date'] == self.end_date:
+            self.teams = data['teams']
+            self.counts = data['counts']
+
+    def _save(self):
+        if self.fn is None:
+            return
+        os.makedirs(os.path.dirname(self.fn) or '.', exist_ok=True)
+        with open(self.fn, "wb") as f:
+            pickle.dump({'built': datetime.date.today(),
+                         'start_date': self.start_date,
+                         'end_date': self.end_date,
+                         'teams': self.teams,
+                         'counts': self.counts}, f)
 
 
 class GenericCsvScraper:
-    def __init__(self, batter_proj_file, pitcher_proj_file):
-        self.batter_cache = pd.read_csv(batter_proj_file,
-                                        encoding='iso-8859-1',
-                                        header=1,
-                                        skipfooter=1,
-                                        engine='python')
-        self.pitcher_cache = pd.read_csv(pitcher_proj_file,
-                                         encoding='iso-8859-1',
-                                         header=1,
-                                         skipfooter=1,
-                                         engine='python')
+    """Scraper for projections in a generic csv format
+
+    Each file has a title line before the header and a footer line after the
+    data.  The files are parsed with the C engine once the footer has been
+    stripped.  The parsed frames are saved in cache_dir and reused until the
+    file is modified.
+
+    :param batter_proj_file: csv file with the hitter projections
+    :type batter_proj_file: str
+    :param pitcher_proj_file: csv file with the pitcher projections
+    :type pitcher_proj_file: str
+    :param cache_dir: Directory to save the parsed files in.  Pass None to
+        parse the files each time.
+    :type cache_dir: str
+    """
+    def __init__(self, batter_proj_file, pitcher_proj_file, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.batter_cache = self._load(batter_proj_file)
+        self.pitcher_cache = self._load(pitcher_proj_file)
+        self.batter_ids = pd.Index(self.batter_cache['MLBAM ID'])
+        self.pitcher_ids = pd.Index(self.pitcher_cache['MLBAM ID'])
 
     def scrape(self, mlb_ids, scrape_as):
         """Scrape the csv file and return those match mlb_ids"""
         cache = self._get_cache(scrape_as)
-        df = cache[cache['MLBAM ID'].isin(mlb_ids)]
-        df['Name'] = df['Firstname'] + " " + df['Lastname']
+        ids = self._get_ids(scrape_as)
+        pos = ids.get_indexer_for(pd.unique(np.asarray(mlb_ids)))
+        df = cache.iloc[np.sort(pos[pos >= 0])]
+        df = df.assign(Name=df['Firstname'] + " " + df['Lastname'])
         df = df.rename(columns={"Tm": "Team"})
         if scrape_as == fangraphs.ScrapeType.PITCHER:
             df = df.rename(columns={"Sv": "SV", "Hld": "HLD", "K": "SO"})
@@ -356,6 +916,55 @@ class GenericCsvScraper:
         else:
             return self.pitcher_cache
 
+    def _get_ids(self, scrape_as):
+        if scrape_as == fangraphs.ScrapeType.HITTER:
+            return self.batter_ids
+        else:
+            return self.pitcher_ids
+
+    def _load(self, fn):
+        """Return the parsed contents of a projection file
+
+        :param fn: csv file to read
+        :type fn: str
+        :rtype: DataFrame
+        """
+        if self.cache_dir is None:
+            return _parse_generic_csv(fn)
+        stat = os.stat(fn)
+        key = (os.path.abspath(fn), stat.st_mtime_ns, stat.st_size)
+        cache_fn = os.path.join(
+            self.cache_dir, "{}.pkl".format(
+                hashlib.sha1(key[0].encode()).hexdigest()))
+        if os.path.exists(cache_fn):
+            with open(cache_fn, "rb") as f:
+                cached = pickle.load(f)
+            if cached['key'] == key:
+                return cached['df']
+        df = _parse_generic_csv(fn)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(cache_fn, "wb") as f:
+            pickle.dump({'key': key, 'df': df}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        return df
+
+
+def _parse_generic_csv(fn):
+    """Parse a projection file in the generic csv format
+
+    This is the same as reading it with skipfooter=1, but it doesn't need the
+    python engine.  The last non-blank line is the footer.
+
+    :param fn: csv file to read
+    :type fn: str
+    :rtype: DataFrame
+    """
+    with open(fn, "rb") as f:
+        data = f.read().rstrip(b"\r\n\t ")
+    end = data.rfind(b"\n")
+    data = data[:end + 1] if end >= 0 else b""
+    return pd.read_csv(io.BytesIO(data), encoding='iso-8859-1', header=1)
+
 
 class Categories:
     def __init__(self, cfg):
@@ -513,7 +1122,7 @@ class Scorer(Categories):
     def __init__(self, cfg):
         super().__init__(cfg)
         self.use_weekly_schedule = \
-            cfg['Scorer'].getboolean('useWeeklySchedule')
+            settings.load(cfg).scorer.use_weekly_schedule
 
     def summarize(self, df):
         """Summarize the dataframe into individual stat categories
@@ -523,11 +1132,69 @@ class Scorer(Categories):
         :return: Summarized predictions
         :rtype: Series
         """
-        res = self._sum_hit_prediction(df)
-        res = pd.concat([res, self._sum_pit_prediction(df)])
-        return res
+        membership = np.ones((1, len(df.index)))
+        return self.summarize_batch(df, membership).iloc[0].rename(None)
+
+    def summarize_batch(self, df, membership):
+        """Summarize many rosters at once
+
+        Each roster is a subset of the players in df.  The sums for all of
+        the rosters are computed together as a single matrix product.
+
+        :param df: Predictions for all of the players that appear in any of
+            the rosters.
+        :type df: DataFrame
+        :param membership: Matrix with a row for each roster and a column for
+            each player in df.  A non-zero entry means the player is part of
+            that roster.
+        :type membership: numpy.ndarray
+        :return: Summarized predictions with a row for each roster
+        :rtype: DataFrame
+        """
+        membership = np.atleast_2d(np.asarray(membership, dtype=np.float64))
+        assert(membership.shape[1] == len(df.index))
+        ptype = df['position_type'].to_numpy()
+        hit_sum = self._sum_stats(df, membership * (ptype == 'B'),
+                                  self.hit_count_cats + self.int_hit_cats)
+        pit_sum = self._sum_stats(df, membership * (ptype == 'P'),
+                                  self.pit_count_cats + self.int_pit_cats)
+
+        res = {}
+        for stat in self.hit_count_cats:
+            res[stat] = hit_sum[stat]
+        # Handle ratio stats
+        if 'AVG' in self.hit_ratio_cats:
+            res['AVG'] = self._ratio(hit_sum['H'], hit_sum['AB'])
+        if 'OBP' in self.hit_ratio_cats:
+            res['OBP'] = self._ratio(hit_sum['H'] + hit_sum['BB'],
+                                     hit_sum['AB'] + hit_sum['BB'])
+        for stat in self.pit_count_cats:
+            res[stat] = pit_sum[stat]
+        if 'WHIP' in self.pit_ratio_cats:
+            res['WHIP'] = self._ratio(pit_sum['BB'] + pit_sum['H'],
+                                      pit_sum['IP'])
+        if 'ERA' in self.pit_ratio_cats:
+            res['ERA'] = self._ratio(pit_sum['ER'] * 9, pit_sum['IP'])
+        return pd.DataFrame(res, columns=list(res.keys()), dtype='float64')
+
+    def scored_stats(self):
+        """Return all of the stats that are summed to score a roster
+
+        :return: Counting stats and the stats needed to derive ratio stats
+        :rtype: list(str)
+        """
+        stats = []
+        for stat in self.hit_count_cats + self.int_hit_cats + \
+                self.pit_count_cats + self.int_pit_cats:
+            if stat not in stats:
+                stats.append(stat)
+        return stats
 
     def sum_stat_for_player(self, plyr, stat):
+        # Use the value materialized by Builder.predict if it is available
+        wk_col = utils.weekly_stat_column(stat)
+        if wk_col in plyr and not pd.isnull(plyr[wk_col]):
+            return plyr[wk_col]
         # Account for number of known starts (if applicable).
         # Otherwise, just revert to an average over the remaining games
         # on the team's schedule.
@@ -543,51 +1210,68 @@ class Scorer(Categories):
         else:
             return plyr[stat]
 
-    def _sum_stat(self, df, stat):
-        val = 0
-        for plyr in df.iterrows():
-            val += self.sum_stat_for_player(plyr[1], stat)
-        return val
-
-    def _sum_hit_prediction(self, df):
-        hit_df = df[df['position_type'] == 'B']
-
-        sum = pd.Series(dtype='float64')
-        for stat in self.hit_count_cats:
-            sum[stat] = self._sum_stat(hit_df, stat)
-
-        temp_sum = pd.Series(dtype='float64')
-        for stat in self.int_hit_cats:
-            temp_sum[stat] = self._sum_stat(hit_df, stat)
-
-        # Handle ratio stats
-        if 'AVG' in self.hit_ratio_cats:
-            sum['AVG'] = temp_sum['H'] / temp_sum['AB'] if temp_sum['AB'] > 0 else 0
-        if 'OBP' in self.hit_ratio_cats:
-            sum['OBP'] = (temp_sum['H'] + temp_sum['BB']) / (temp_sum['AB'] + temp_sum['BB']) \
-                if temp_sum['AB'] + temp_sum['BB'] > 0 else 0
+    def stat_values(self, df, stats):
+        """Compute the weekly-effective value of stats from the projections
 
-        return sum
+        This is the column-wise version of sum_stat_for_player.
 
-    def _sum_pit_prediction(self, df):
-        pit_df = df[df['position_type'] == 'P']
-
-        sum = pd.Series(dtype='float64')
-        for stat in self.pit_count_cats:
-            sum[stat] = self._sum_stat(pit_df, stat)
-
-        temp_sum = pd.Series(dtype='float64')
-        for stat in self.int_pit_cats:
-            temp_sum[stat] = self._sum_stat(pit_df, stat)
+        :param df: Player predictions
+        :type df: DataFrame
+        :param stats: Stat columns to compute values for
+        :type stats: list(str)
+        :return: Matrix with a row for each player and a column for each stat
+        :rtype: numpy.ndarray
+        """
+        vals = df[stats].to_numpy(dtype=np.float64)
+        if not self.use_weekly_schedule:
+            return np.where(np.isnan(vals), 0.0, vals)
+
+        def col(name):
+            return df[name].to_numpy(dtype=np.float64)[:, np.newaxis]
+        wk_gs = col('WK_GS')
+        sea_g = col('SEASON_G')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            by_starts = vals / col('G') * wk_gs
+            by_games = vals / sea_g * col('WK_G')
+        return np.where(wk_gs > 0, by_starts,
+                        np.where(sea_g > 0, by_games, 0.0))
+
+    def weekly_values(self, df, stats):
+        """Return the weekly-effective value of stats for each player
+
+        Rows without the values materialized by Builder.predict are computed
+        with stat_values().  See utils.weekly_stat_values().
+
+        :param df: Player predictions
+        :type df: DataFrame
+        :param stats: Stats to return values for
+        :type stats: list(str)
+        :return: Matrix with a row for each player and a column for each stat
+        :rtype: numpy.ndarray
+        """
+        return utils.weekly_stat_values(df, stats, self.stat_values)
 
-        # Handle ratio stats
-        if 'WHIP' in self.pit_ratio_cats:
-            sum['WHIP'] = (temp_sum['BB'] + temp_sum['H']) / temp_sum['IP'] \
-                if temp_sum['IP'] > 0 else 0
-        if 'ERA' in self.pit_ratio_cats:
-            sum['ERA'] = temp_sum['ER'] * 9 / temp_sum['IP'] if temp_sum['IP'] > 0 else 0
+    def _sum_stats(self, df, membership, stats):
+        """Sum a set of stats for each roster in the membership matrix
 
-        return sum
+        :return: Map of stat name to an array with the sum for each roster
+        :rtype: dict
+        """
+        vals = self.weekly_values(df, stats)
+        # A missing value only taints the rosters that include that player.
+        # Replace it with zero before the product so that it doesn't leak into
+        # the other rosters, then put it back for the affected ones.
+        nans = np.isnan(vals)
+        sums = membership @ np.where(nans, 0.0, vals)
+        if nans.any():
+            sums[((membership != 0) @ nans) > 0] = np.nan
+        return {stat: sums[:, i] for i, stat in enumerate(stats)}
+
+    @staticmethod
+    def _ratio(num, den):
+        res = np.zeros(len(num))
+        np.divide(num, den, out=res, where=den > 0)
+        return res
 
     def is_counting_stat(self, stat):
         return stat in ['R', 'HR', 'RBI', 'SB', 'W', 'SO', 'SV', 'HLD', 'K']
@@ -612,6 +1296,17 @@ class StatAccumulator(Categories):
         for stat in self.int_pit_cats:
             self.pit_temp_count_sum[stat] = 0.0
 
+    def fork(self):
+        """Return a copy of the accumulator that shares the scorer
+
+        :rtype: StatAccumulator
+        """
+        acc = copy.copy(self)
+        acc.sum = self.sum.copy()
+        acc.hit_temp_count_sum = self.hit_temp_count_sum.copy()
+        acc.pit_temp_count_sum = self.pit_temp_count_sum.copy()
+        return acc
+
     def add_player(self, plyr):
         self._accum_stats(+1, plyr)
 
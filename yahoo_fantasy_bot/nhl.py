@@ -5,11 +5,13 @@ import numpy as np
 from nhl_scraper import nhl
 import logging
 import datetime
-from yahoo_fantasy_bot import source
+from yahoo_fantasy_bot import roster, source, utils, settings, points
 
 
 logger = logging.getLogger()
 
+RATIO_STATS = ['SV%']
+
 
 class Builder:
     """Class that constructs prediction datasets for hockey players.
@@ -25,9 +27,21 @@ class Builder:
         predicted stats
     """
     def __init__(self, lg, cfg, csv_details):
-        skaters = source.read_csv(csv_details['skaters'])
-        goalies = source.read_csv(csv_details['goalies'])
+        cats = cfg['League'].getlist('predictedStatCategories')
+        self.point_stats = points.weighted_stats(cfg)
+        stats = scored_stat_columns(cats)
+        stats += [s for s in self.point_stats if s not in stats]
+        cols = source.projection_columns(['player_id'], cats + stats)
+        store = source.projection_store(cfg)
+        skaters = source.read_csv(csv_details['skaters'], store, cols)
+        goalies = source.read_csv(csv_details['goalies'], store, cols)
         self.ppool = pd.concat([skaters, goalies], sort=True)
+        self._coerce_stats(stats)
+        self.ppool = source.compact_projections(
+            self.ppool, ['player_id'], cats + stats, 'nhl')
+        self.ppool_indexes = source.index_projections(self.ppool,
+                                                      ['player_id'])
+        self.scorer = Scorer(cfg)
         self.nhl_scraper = nhl.Scraper()
         wk_start_date = lg.edit_date()
         assert(wk_start_date.weekday() == 0)
@@ -41,10 +55,24 @@ class Builder:
 
         :param plyrs: List of dicts that contain the player name and their
             Yahoo! ID.  These are all of the players we will return.
-        :return: List of players from the player pool
+        :return: Players from the player pool, in the order of plyrs.
+            Players without a projection are left out.
+        :rtype: DataFrame
         """
-        yahoo_ids = [e['player_id'] for e in plyrs]
-        return self.ppool[self.ppool['player_id'].isin(yahoo_ids)]
+        pos = source.lookup_projections(self.ppool_indexes, 'player_id',
+                                        [e['player_id'] for e in plyrs])
+        return self.ppool.iloc[pos[pos >= 0]]
+
+    def __getstate__(self):
+        # The indexes are rebuilt when unpickled rather than saved
+        state = self.__dict__.copy()
+        del state['ppool_indexes']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.ppool_indexes = source.index_projections(self.ppool,
+                                                      ['player_id'])
 
     def predict(self, plyrs, fail_on_missing=True, **kwargs):
         """Build a dataset of hockey predictions for the week
@@ -84,7 +112,42 @@ class Builder:
         df['team_id'] = team_ids
         df['WK_G'] = wk_g
 
-        return df
+        return self._materialize_weekly_stats(df)
+
+    def _materialize_weekly_stats(self, df):
+        """Add a column with the weekly-effective value of each scored stat
+
+        The scorer reads these columns rather than applying the weekly
+        schedule each time a roster is evaluated.  In a points league, every
+        stat that is worth points gets a column too.
+
+        :param df: Predictions for the players
+        :type df: DataFrame
+        :return: Predictions with a utils.weekly_stat_column() for each stat
+        :rtype: DataFrame
+        """
+        stats = scored_stat_columns(self.scorer.cats)
+        stats += [s for s in self.point_stats
+                  if s in df.columns and s not in stats]
+        vals = self.scorer.stat_values(df, stats)
+        wk_cols = {utils.weekly_stat_column(stat): vals[:, i]
+                   for i, stat in enumerate(stats)}
+        return df.assign(**wk_cols)
+
+    def _coerce_stats(self, stats):
+        """Convert the projected stats used for scoring to float64
+
+        This is done once when the projections are loaded so that scoring
+        doesn't have to parse each value.  Any value that isn't numeric is
+        treated as a missing value.
+
+        :param stats: Stats that are summed to score a roster
+        :type stats: list(str)
+        """
+        for stat in stats:
+            if stat in self.ppool.columns:
+                self.ppool[stat] = pd.to_numeric(
+                    self.ppool[stat], errors='coerce').astype('float64')
 
     def _find_players_schedule(self, plyr_name):
         """Find a players schedule for the upcoming week
@@ -102,6 +165,21 @@ class Builder:
             return(np.nan, 0)
 
 
+def scored_stat_columns(cats):
+    """Return the projected stat columns that are summed to score a roster
+
+    :param cats: Stat categories we are predicting
+    :type cats: list(str)
+    :return: The counting stats followed by any stat needed to derive the
+        ratio stats
+    :rtype: list(str)
+    """
+    cols = [e for e in cats if e not in RATIO_STATS]
+    if 'SV%' in cats:
+        cols += [e for e in ['GA', 'SV'] if e not in cols]
+    return cols
+
+
 def init_prediction_builder(lg, cfg):
     if 'source' not in cfg['Prediction']:
         raise RuntimeError(
@@ -207,33 +285,26 @@ class PlayerPrinter:
 class Scorer:
     """Class that scores rosters that it is given"""
     def __init__(self, cfg):
-        self.cfg = cfg
-        self.cats = self.cfg['League'].getlist('predictedStatCategories')
-        self.use_weekly_sched = cfg['Scorer'].getboolean('useWeeklySchedule')
+        self.cats = cfg['League'].getlist('predictedStatCategories')
+        self.use_weekly_sched = settings.load(cfg).scorer.use_weekly_schedule
 
     def summarize(self, df):
         """Summarize the dataframe into individual stat categories
 
+        The stat columns are expected to be numeric.  nhl.Builder coerces
+        them when it loads the projections.
+
         :param df: Roster predictions to summarize
         :type df: DataFrame
         :return: Summarized predictions
-        :rtype: Series
+        :rtype: dict
         """
-        stat_cols = [e for e in self.cats
-                     if self.is_counting_stat(e)]
-        if 'SV%' in self.cats:
-            temp_stat_cols = ['GA', 'SV']
-            stat_cols += temp_stat_cols
-
-        res = dict.fromkeys(stat_cols, 0)
-        for plyr in df.iterrows():
-            p = plyr[1]
-            for stat in stat_cols:
-                if self.is_numeric(p[stat]):
-                    if self.use_weekly_sched:
-                        res[stat] += float(p[stat]) / 82 * p['WK_G']
-                    else:
-                        res[stat] += float(p[stat])
+        stat_cols = scored_stat_columns(self.cats)
+        if len(df.index) == 0:
+            totals = np.zeros(len(stat_cols))
+        else:
+            totals = self.weekly_values(df, stat_cols).sum(axis=0)
+        res = {stat: float(v) for stat, v in zip(stat_cols, totals)}
 
         # Handle ratio stats
         if 'SV%' in self.cats:
@@ -243,26 +314,47 @@ class Scorer:
                 res['SV%'] = None
 
         # Drop the temporary values used to calculate the ratio stats
-        for stat in temp_stat_cols:
-            del res[stat]
+        for stat in stat_cols:
+            if stat not in self.cats:
+                del res[stat]
 
         return res
 
-    def is_numeric(self, v):
-        '''Helper to check if v is a numeric type we can use in math'''
-        if type(v) is float:
-            return not np.isnan(v)
-        elif type(v) is str:
-            try:
-                float(v)
-                return True
-            except ValueError:
-                return False
-        else:
-            assert(False), "Unknown type: " + str(type(v))
+    def weekly_values(self, df, stats):
+        """Return the weekly-effective value of stats for each player
+
+        Rows without the values materialized by Builder.predict are computed
+        with stat_values().  See utils.weekly_stat_values().
+
+        :param df: Player predictions
+        :type df: DataFrame
+        :param stats: Stat columns to return values for
+        :type stats: list(str)
+        :return: Matrix with a row for each player and a column for each stat
+        :rtype: numpy.ndarray
+        """
+        return utils.weekly_stat_values(df, stats, self.stat_values)
+
+    def stat_values(self, df, stats):
+        """Compute the weekly-effective value of stats from the projections
+
+        :param df: Player predictions
+        :type df: DataFrame
+        :param stats: Stat columns to compute values for
+        :type stats: list(str)
+        :return: Matrix with a row for each player and a column for each stat.
+            Missing stats have a value of zero.
+        :rtype: numpy.ndarray
+        """
+        vals = df[stats].to_numpy(dtype=np.float64)
+        missing = np.isnan(vals)
+        if self.use_weekly_sched:
+            wk_g = df['WK_G'].to_numpy(dtype=np.float64)
+            vals = vals / 82 * wk_g[:, np.newaxis]
+        return np.where(missing, 0.0, vals)
 
     def is_counting_stat(self, stat):
-        return stat not in ['SV%']
+        return stat not in RATIO_STATS
 
     def is_highest_better(self, stat):
         return True
@@ -273,19 +365,23 @@ class StatAccumulator:
     def __init__(self, cfg):
         self.scorer = Scorer(cfg)
 
+    def fork(self):
+        # The summary is computed from the roster, so there is no state to copy
+        return self
+
     def add_player(self, plyr):
         pass
 
     def remove_player(self, plyr):
         pass
 
-    def get_summary(self, roster):
+    def get_summary(self, plyrs):
         """Return a summary of the stats for players in the roster
 
-        :param roster: List of players we want go get stats for
-        :type roster: list
+        :param plyrs: List of players we want go get stats for
+        :type plyrs: list
         :return: Summary of key stats for the players
         :rtype: pandas.Series
         """
-        df = pd.DataFrame(data=roster)
+        df = roster.players_to_frame(plyrs)
         return self.scorer.summarize(df)
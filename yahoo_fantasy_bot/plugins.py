@@ -0,0 +1,84 @@
+#!/usr/bin/python
+
+import importlib
+try:
+    import importlib.metadata as importlib_metadata
+except ImportError:
+    # Python 3.7 needs the backport
+    import importlib_metadata
+
+
+# The entry point group that each config section can be registered under.
+# Third-party packages register their own components in these groups in their
+# setup.py.
+ENTRY_POINT_GROUPS = {
+    'Scorer': 'yahoo_fantasy_bot.scorers',
+    'ScoreAccumulator': 'yahoo_fantasy_bot.accumulators',
+    'Display': 'yahoo_fantasy_bot.displays',
+    'LineupOptimizer': 'yahoo_fantasy_bot.optimizers',
+}
+
+# Components that were resolved by the current process
+_resolved = {}
+
+
+def resolve(cfg, section, attr_key='class'):
+    """Return the component configured in a section of the config file
+
+    The section either names an entry point with the entryPoint option, or
+    locates the component with the package, module and <attr_key> options.
+    Each component is only resolved once per process.
+
+    :param cfg: Config file
+    :type cfg: configparser.RawConfigParser or settings.Settings
+    :param section: Name of the section that configures the component
+    :type section: str
+    :param attr_key: Option that names the class or function in the module
+    :type attr_key: str
+    :return: The class or function
+    """
+    sect = cfg[section]
+    if 'entryPoint' in sect:
+        key = (section, sect['entryPoint'])
+    else:
+        key = (section, sect['package'], sect['module'], sect[attr_key])
+    if key not in _resolved:
+        if len(key) == 2:
+            _resolved[key] = load_entry_point(section, key[1])
+        else:
+            module = importlib.import_module(key[2], package=key[1])
+            _resolved[key] = getattr(module, key[3])
+    return _resolved[key]
+
+
+def load_entry_point(section, name):
+    """Load a component that was registered as a setuptools entry point
+
+    :param section: Name of the config section of the component
+    :type section: str
+    :param name: Name of the entry point
+    :type name: str
+    :return: The class or function
+    """
+    names = set()
+    for ep in _entry_points(section):
+        if ep.name == name:
+            return ep.load()
+        names.add(ep.name)
+    raise RuntimeError(
+        "No entry point named {} in group {}.  Available: {}".format(
+            name, ENTRY_POINT_GROUPS[section],
+            ", ".join(sorted(names)) or "none"))
+
+
+def _entry_points(section):
+    if section not in ENTRY_POINT_GROUPS:
+        raise RuntimeError(
+            "Entry points are not supported for section {}".format(section))
+    group = ENTRY_POINT_GROUPS[section]
+    eps = importlib_metadata.entry_points()
+    # Python 3.10+ (and the backport) return an object that is searched with
+    # select().  Python 3.8 and 3.9 return a dict keyed by group.
+    if hasattr(eps, 'select'):
+        return eps.select(group=group)
+    return eps.get(group, [])
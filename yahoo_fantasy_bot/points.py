@@ -0,0 +1,276 @@
+#!/usr/bin/python
+
+import copy
+import logging
+import numpy as np
+import pandas as pd
+from yahoo_fantasy_bot import utils
+
+
+logger = logging.getLogger()
+
+
+def fetch_stat_weights(lg):
+    """Fetch the points awarded for each stat in a Yahoo! points league
+
+    :param lg: Yahoo! league
+    :type lg: yahoo_fantasy_api.league.League
+    :return: Map of (position_type, stat) to the points for one unit of that
+        stat.  This is empty for leagues that are not points leagues.
+    :rtype: dict
+    """
+    raw = lg.yhandler.get_settings_raw(lg.league_id)
+    settings = raw['fantasy_content']['league'][1]['settings'][0]
+    if 'stat_modifiers' not in settings:
+        return {}
+    cats = {}
+    for e in settings['stat_categories']['stats']:
+        stat = e['stat']
+        cats[int(stat['stat_id'])] = (stat['position_type'],
+                                      stat['display_name'])
+    weights = {}
+    for e in settings['stat_modifiers']['stats']:
+        stat_id = int(e['stat']['stat_id'])
+        if stat_id in cats:
+            weights[cats[stat_id]] = float(e['stat']['value'])
+    return weights
+
+
+def format_stat_weights(weights):
+    """Format stat weights so that they can be stored in the config
+
+    :param weights: Map of (position_type, stat) to points
+    :type weights: dict
+    :return: String in the format used by the pointWeights config parameter
+    :rtype: str
+    """
+    return ",".join(["{}:{}={}".format(pt, stat, w)
+                     for (pt, stat), w in weights.items()])
+
+
+def weighted_stats(cfg):
+    """Return every stat that is worth points in the config
+
+    :param cfg: Config file
+    :type cfg: configparser.RawConfigParser or settings.Settings
+    :return: Stats in the pointWeights parameter.  This is empty for leagues
+        that are not points leagues.
+    :rtype: list(str)
+    """
+    if 'Scorer' not in cfg or 'pointWeights' not in cfg['Scorer']:
+        return []
+    stats = []
+    for weights in parse_stat_weights(cfg['Scorer']['pointWeights']).values():
+        for stat in weights:
+            if stat not in stats:
+                stats.append(stat)
+    return stats
+
+
+def parse_stat_weights(s):
+    """Parse the pointWeights config parameter
+
+    :param s: Comma separated list of <position_type>:<stat>=<points>
+        (e.g. B:HR=4,P:W=5)
+    :type s: str
+    :return: Map of position type to a map of stat to points
+    :rtype: dict
+    """
+    weights = {}
+    for e in s.split(','):
+        e = e.strip()
+        if e == '':
+            continue
+        try:
+            key, w = e.split('=')
+            pt, stat = key.split(':')
+            weights.setdefault(pt.strip(), {})[stat.strip()] = float(w)
+        except ValueError:
+            raise RuntimeError("Invalid pointWeights entry: {}".format(e))
+    return weights
+
+
+class Scorer:
+    """Class that scores rosters in a points league
+
+    Each stat is worth a fixed number of points, so a player's value is the
+    dot product of its predicted stats with the point weights.  The weights
+    are taken from the pointWeights parameter in the Scorer section.
+    """
+    def __init__(self, cfg):
+        if 'pointWeights' not in cfg['Scorer']:
+            raise RuntimeError(
+                "Missing 'pointWeights' config attribute in 'Scorer' section")
+        self.weights = parse_stat_weights(cfg['Scorer']['pointWeights'])
+        self.warned_stats = set()
+
+    def summarize(self, df):
+        """Summarize the dataframe into the total points
+
+        :param df: Roster predictions to summarize
+        :type df: DataFrame
+        :return: Summarized predictions
+        :rtype: Series
+        """
+        return pd.Series({'PTS': self.player_values(df).sum()},
+                         dtype='float64')
+
+    def summarize_batch(self, df, membership):
+        """Summarize many rosters at once
+
+        :param df: Predictions for all of the players that appear in any of
+            the rosters.
+        :type df: DataFrame
+        :param membership: Matrix with a row for each roster and a column for
+            each player in df.  A non-zero entry means the player is part of
+            that roster.
+        :type membership: numpy.ndarray
+        :return: Total points with a row for each roster
+        :rtype: DataFrame
+        """
+        membership = np.atleast_2d(np.asarray(membership, dtype=np.float64))
+        assert(membership.shape[1] == len(df.index))
+        return pd.DataFrame({'PTS': membership @ self.player_values(df)},
+                            dtype='float64')
+
+    def player_values(self, df):
+        """Compute the points each player is predicted to get
+
+        :param df: Player predictions
+        :type df: DataFrame
+        :return: Points for each row in df
+        :rtype: numpy.ndarray
+        """
+        vals = np.zeros(len(df.index))
+        if len(df.index) == 0:
+            return vals
+        ptype = df['position_type'].to_numpy()
+        for pt, weights in self.weights.items():
+            mask = ptype == pt
+            if not mask.any():
+                continue
+            stats = [s for s in weights if self._has_stat(df, s)]
+            w = np.array([weights[s] for s in stats])
+            vals[mask] = self._stat_matrix(df, stats)[mask] @ w
+        return vals
+
+    def player_value(self, plyr):
+        """Compute the points for a single player
+
+        :param plyr: Player prediction
+        :type plyr: Series
+        :return: Points for the player
+        :rtype: float
+        """
+        weights = {stat: w for stat, w in
+                   self.weights.get(plyr['position_type'], {}).items()
+                   if stat in plyr or utils.weekly_stat_column(stat) in plyr}
+        wk_cols = [utils.weekly_stat_column(stat) for stat in weights]
+        use_wk = all([c in plyr for c in wk_cols]) and \
+            not all([pd.isnull(plyr[c]) for c in wk_cols])
+        val = 0.0
+        for stat, w in weights.items():
+            v = plyr[utils.weekly_stat_column(stat)] if use_wk \
+                else plyr.get(stat, np.nan)
+            if not pd.isnull(v):
+                val += w * v
+        return val
+
+    def is_counting_stat(self, stat):
+        return True
+
+    def is_highest_better(self, stat):
+        return True
+
+    def _has_stat(self, df, stat):
+        if stat in df.columns or \
+                utils.weekly_stat_column(stat) in df.columns:
+            return True
+        if stat not in self.warned_stats:
+            logger.warning(
+                "No prediction for {}.  It won't be scored.".format(stat))
+            self.warned_stats.add(stat)
+        return False
+
+    def _stat_matrix(self, df, stats):
+        """Return the weekly-effective value of the stats for all players
+
+        The weekly columns are only used if the builder materialized them
+        for every stat, so that weekly and season values are never added
+        together.  Rows without any weekly values, such as the players that
+        come from the builder's select_players, use their projections.
+        Missing values are treated as zero points.
+        """
+        vals = np.full((len(df.index), len(stats)), np.nan)
+        for i, s in enumerate(stats):
+            if s in df.columns:
+                vals[:, i] = df[s].to_numpy(dtype=np.float64)
+        wk_cols = [utils.weekly_stat_column(s) for s in stats]
+        if len(stats) > 0 and all([c in df.columns for c in wk_cols]):
+            wk = df[wk_cols].to_numpy(dtype=np.float64)
+            predicted = ~np.isnan(wk).all(axis=1)
+            vals[predicted] = wk[predicted]
+        return np.where(np.isnan(vals), 0.0, vals)
+
+
+class StatAccumulator:
+    """Class that keeps a running total of points for a bunch of players"""
+    def __init__(self, cfg):
+        self.scorer = Scorer(cfg)
+        self.total = 0.0
+
+    def fork(self):
+        """Return a copy of the accumulator that shares the scorer
+
+        :rtype: StatAccumulator
+        """
+        return copy.copy(self)
+
+    def add_player(self, plyr):
+        self.total += self.scorer.player_value(plyr)
+
+    def remove_player(self, plyr):
+        self.total -= self.scorer.player_value(plyr)
+
+    def get_summary(self, roster):
+        """Return a summary of the points for players in the roster
+
+        :param roster: List of players we want go get stats for
+        :type roster: list
+        :return: Summary of the points for the players
+        :rtype: pandas.Series
+        """
+        return pd.Series({'PTS': self.total}, dtype='float64')
+
+
+class PlayerPrinter:
+    def __init__(self, cfg):
+        self.scorer = Scorer(cfg)
+
+    def printRoster(self, lineup, bench, injury_reserve):
+        """Print out the roster to standard out
+
+        :param lineup: Roster to print out
+        :type lineup: List
+        :param bench: Players on the bench
+        :type bench: List
+        :param injury_reserve: Players on the injury reserve
+        :type injury_reserve: List
+        """
+        print("{:4}: {:20}   {}".format('', '', 'PTS'))
+        total = 0.0
+        for plyr in lineup:
+            pts = self.scorer.player_value(plyr)
+            total += pts
+            print("{:4}: {:20}   {:.1f}".format(plyr['selected_position'],
+                                                plyr['name'], pts))
+        print("{:4}  {:20}   {:.1f}".format('', 'Total', total))
+        print("")
+        print("Bench")
+        for plyr in bench:
+            print(plyr['name'])
+        print("")
+        print("Injury Reserve")
+        for plyr in injury_reserve:
+            print(plyr['name'])
+        print("")
@@ -1,22 +1,282 @@
 #!/usr/bin/python
 
 import copy
-import importlib
 import logging
 import numpy as np
 import pandas as pd
 
-from yahoo_fantasy_bot import utils
+from yahoo_fantasy_bot import utils, plugins
+
+
+class PlayerPool:
+    """Class that holds the predicted stats for a set of players
+
+    The stats are stored once in a shared array.  Each Player refers to a row
+    in it rather than carrying its own copy.
+
+    :param df: Player predictions
+    :type df: DataFrame
+    """
+    def __init__(self, df):
+        self.frame = df.reset_index(drop=True)
+        self.columns = list(self.frame.columns)
+        self.col_index = {c: i for i, c in enumerate(self.columns)}
+        self.values = self.frame.to_numpy(dtype=object)
+
+    def __len__(self):
+        return len(self.values)
+
+    def player(self, row):
+        """Return the Player for the given row in the pool
+
+        :param row: Positional row number in the pool
+        :type row: int
+        :rtype: Player
+        """
+        return Player(self, row)
+
+    def players(self):
+        """Return a Player for each row in the pool
+
+        :rtype: list(Player)
+        """
+        return [Player(self, row) for row in range(len(self.values))]
+
+
+class Player:
+    """A single player in a PlayerPool
+
+    Players can be indexed like a pandas.Series (e.g. plyr['name']).  The
+    selected_position, and any other field that gets assigned, is kept with
+    the player so that the shared pool is never modified.
+
+    :param pool: Pool that holds the stats of the player
+    :type pool: PlayerPool
+    :param row: Row of the player in the pool
+    :type row: int
+    """
+    __slots__ = ('pool', 'row', 'selected_position', 'overrides')
+
+    def __init__(self, pool, row):
+        self.pool = pool
+        self.row = row
+        self.overrides = None
+        if 'selected_position' in pool.col_index:
+            self.selected_position = \
+                pool.values[row, pool.col_index['selected_position']]
+        else:
+            self.selected_position = np.nan
+
+    def __getitem__(self, key):
+        if key == 'selected_position':
+            return self.selected_position
+        if self.overrides is not None and key in self.overrides:
+            return self.overrides[key]
+        return self.pool.values[self.row, self.pool.col_index[key]]
+
+    def __setitem__(self, key, value):
+        if key == 'selected_position':
+            self.selected_position = value
+        else:
+            if self.overrides is None:
+                self.overrides = {}
+            self.overrides[key] = value
+
+    def __getattr__(self, name):
+        # Only called for names that aren't slots, so that fields can also be
+        # accessed as attributes like with a pandas.Series.
+        if name in Player.__slots__:
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __contains__(self, key):
+        return key == 'selected_position' or key in self.pool.col_index or \
+            (self.overrides is not None and key in self.overrides)
+
+    def __copy__(self):
+        plyr = Player.__new__(Player)
+        plyr.pool = self.pool
+        plyr.row = self.row
+        plyr.selected_position = self.selected_position
+        plyr.overrides = None if self.overrides is None \
+            else dict(self.overrides)
+        return plyr
+
+    def __deepcopy__(self, memo):
+        # The pool is shared and never modified, so a copy of the player
+        # record is all that is needed.
+        return self.__copy__()
+
+    def __getstate__(self):
+        return (self.pool, self.row, self.selected_position, self.overrides)
+
+    def __setstate__(self, state):
+        (self.pool, self.row, self.selected_position, self.overrides) = state
+
+    def __repr__(self):
+        return "Player({}, {})".format(self.get('name'),
+                                       self.selected_position)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        keys = list(self.pool.columns)
+        if 'selected_position' not in self.pool.col_index:
+            keys.append('selected_position')
+        if self.overrides is not None:
+            keys += [k for k in self.overrides if k not in self.pool.col_index]
+        return keys
+
+    def to_dict(self):
+        return {k: self[k] for k in self.keys()}
+
+    def to_series(self):
+        return pd.Series(self.to_dict(), dtype='object')
+
+
+class PlayerIndex:
+    """Hash maps over a PlayerPool for constant time player lookups
+
+    Players are indexed by player_id, by normalized name and by eligible
+    position.  When more than one player has the same ID or name, the first
+    one in the pool is returned.
+
+    :param pool: Pool of players to index
+    :type pool: PlayerPool
+    """
+    def __init__(self, pool):
+        self.pool = pool
+        self.by_id = {}
+        self.by_name = {}
+        self.by_pos = {}
+        cols = pool.col_index
+        for row in range(len(pool)):
+            vals = pool.values[row]
+            if 'player_id' in cols:
+                self.by_id.setdefault(vals[cols['player_id']], row)
+            if 'name' in cols:
+                self.by_name.setdefault(
+                    utils.normalized(vals[cols['name']]), row)
+            if 'eligible_positions' in cols:
+                for pos in vals[cols['eligible_positions']]:
+                    self.by_pos.setdefault(pos, []).append(row)
+
+    def get_by_id(self, player_id):
+        """Return the player with the given ID or None if not in the pool
+
+        :rtype: Player
+        """
+        row = self.by_id.get(player_id)
+        return None if row is None else self.pool.player(row)
+
+    def get_by_name(self, name):
+        """Return the player with the given name or None if not in the pool
+
+        Accents are ignored when comparing names.
+
+        :rtype: Player
+        """
+        row = self.by_name.get(utils.normalized(name))
+        return None if row is None else self.pool.player(row)
+
+    def get_by_position(self, pos):
+        """Return all of the players eligible to play at a position
+
+        :rtype: list(Player)
+        """
+        return [self.pool.player(row) for row in self.by_pos.get(pos, [])]
+
+
+def to_players(plyrs):
+    """Convert prediction rows into Player objects that share one pool
+
+    :param plyrs: Player predictions
+    :type plyrs: DataFrame or list(pandas.Series)
+    :rtype: list(Player)
+    """
+    if not isinstance(plyrs, pd.DataFrame):
+        plyrs = pd.DataFrame([p for p in plyrs])
+    return PlayerPool(plyrs).players()
+
+
+def players_to_frame(plyrs):
+    """Convert a list of players into a DataFrame
+
+    :param plyrs: Players to convert
+    :type plyrs: list(Player) or list(pandas.Series)
+    :rtype: DataFrame
+    """
+    if len(plyrs) == 0:
+        return pd.DataFrame()
+    pool = plyrs[0].pool if isinstance(plyrs[0], Player) else None
+    if pool is None or \
+            any(not isinstance(p, Player) or p.pool is not pool
+                for p in plyrs):
+        return pd.DataFrame([p.to_dict()
+                             if isinstance(p, (Player, pd.Series)) else p
+                             for p in plyrs])
+    df = pool.frame.iloc[[p.row for p in plyrs]].reset_index(drop=True)
+    df['selected_position'] = [p.selected_position for p in plyrs]
+    for i, p in enumerate(plyrs):
+        if p.overrides is not None:
+            for k, v in p.overrides.items():
+                if k not in df.columns:
+                    df[k] = None
+                df.at[i, k] = v
+    return df
 
 
 class Container:
-    """Class that holds a roster of players"""
-    def __init__(self, cfg):
+    """Class that holds a roster of players
+
+    A container can be cloned cheaply with fork().  The clone shares the
+    roster, position counts, players and stat accumulator with the original
+    until one of them is changed.  Only the structures that are changed get
+    copied.
+
+    :param cfg: Config used to find the ScoreAccumulator class.  If omitted,
+        stats are not accumulated for the roster.
+    """
+    def __init__(self, cfg=None):
         self.roster = []
         self.pos_count = {}
         self.plyr_by_pos = {}
-        StatAccumulator = self._get_scoreaccumulator_class(cfg)
-        self.stat_accumulator = StatAccumulator(cfg)
+        if cfg is None:
+            self.stat_accumulator = None
+        else:
+            StatAccumulator = plugins.resolve(cfg, 'ScoreAccumulator')
+            self.stat_accumulator = StatAccumulator(cfg)
+        # Names of the structures that are shared with a forked container
+        self.shared = set()
+        # Set when the players in the roster are shared with a forked
+        # container.  owned_plyrs tracks the player IDs we have since copied.
+        self.plyrs_shared = False
+        self.owned_plyrs = set()
+
+    def fork(self):
+        """Return a clone of this container
+
+        This is O(1).  The two containers share all of their state until one
+        of them is modified.
+
+        :return: The clone
+        :rtype: Container
+        """
+        child = Container.__new__(Container)
+        child.roster = self.roster
+        child.pos_count = self.pos_count
+        child.plyr_by_pos = self.plyr_by_pos
+        child.stat_accumulator = self.stat_accumulator
+        for cont in [self, child]:
+            cont.shared = {'roster', 'pos_count', 'plyr_by_pos',
+                           'stat_accumulator'}
+            cont.plyrs_shared = True
+            cont.owned_plyrs = set()
+        return child
 
     def get_roster(self):
         return self.roster
@@ -28,8 +288,10 @@ class Container:
         :type offset: int
         """
         assert(offset >= 0 and offset < len(self.roster))
+        self._own_all()
         del_plyr = self.roster[offset]
-        self.stat_accumulator.remove_player(del_plyr)
+        if self.stat_accumulator is not None:
+            self.stat_accumulator.remove_player(del_plyr)
         pos = del_plyr['selected_position']
         self.pos_count[pos] -= 1
         self._del_from_plyr_by_pos(del_plyr)
@@ -43,8 +305,12 @@ class Container:
         :param player: Fully setup player object to add.
         :type player: dict
         """
+        self._own_all()
+        if self.plyrs_shared:
+            self.owned_plyrs.add(player['player_id'])
         self.roster.append(player)
-        self.stat_accumulator.add_player(player)
+        if self.stat_accumulator is not None:
+            self.stat_accumulator.add_player(player)
         pos = player['selected_position']
         self._incr_pos_count(pos)
         if pos not in self.plyr_by_pos:
@@ -81,6 +347,9 @@ class Container:
 
         old_pos = plyr['selected_position']
         assert(old_pos in self.pos_count)
+        self._own('pos_count')
+        self._own('plyr_by_pos')
+        plyr = self._own_player(plyr)
         self.pos_count[old_pos] -= 1
         self._del_from_plyr_by_pos(plyr)
         plyr['selected_position'] = pos
@@ -120,6 +389,45 @@ class Container:
         """
         return self.stat_accumulator.get_summary(self.roster)
 
+    def _own(self, name):
+        """Make a private copy of a structure that is shared after a fork"""
+        if name not in self.shared:
+            return
+        if name == 'roster':
+            self.roster = list(self.roster)
+        elif name == 'pos_count':
+            self.pos_count = dict(self.pos_count)
+        elif name == 'plyr_by_pos':
+            self.plyr_by_pos = {pos: list(plyrs)
+                                for pos, plyrs in self.plyr_by_pos.items()}
+        elif name == 'stat_accumulator' and self.stat_accumulator is not None:
+            if hasattr(self.stat_accumulator, 'fork'):
+                self.stat_accumulator = self.stat_accumulator.fork()
+            else:
+                self.stat_accumulator = copy.deepcopy(self.stat_accumulator)
+        self.shared.discard(name)
+
+    def _own_all(self):
+        for name in list(self.shared):
+            self._own(name)
+
+    def _own_player(self, plyr):
+        """Return a private copy of a player that is shared after a fork
+
+        The copy replaces the shared player in the roster.  The caller must
+        have already taken ownership of plyr_by_pos.
+        """
+        if not self.plyrs_shared or plyr['player_id'] in self.owned_plyrs:
+            return plyr
+        self._own('roster')
+        new_plyr = copy.copy(plyr)
+        for i, p in enumerate(self.roster):
+            if p is plyr:
+                self.roster[i] = new_plyr
+                break
+        self.owned_plyrs.add(plyr['player_id'])
+        return new_plyr
+
     def _incr_pos_count(self, pos):
         if pos in self.pos_count:
             self.pos_count[pos] += 1
@@ -134,12 +442,6 @@ class Container:
                 del self.plyr_by_pos[old_pos][i]
                 break
 
-    def _get_scoreaccumulator_class(self, cfg):
-        module = importlib.import_module(
-            cfg['ScoreAccumulator']['module'],
-            package=cfg['ScoreAccumulator']['package'])
-        return getattr(module, cfg['ScoreAccumulator']['class'])
-
 
 class Builder:
     """Class that generates roster permuations suitable for evaluation"""
@@ -272,40 +574,82 @@ class PlayerSelector:
     that can make up a roster.  The players select are players that are tops
     in the stats categories.
 
+    The pool is never reordered.  Ranking and shuffling only compute an order
+    over the rows of the pool, and select() walks the rows in that order.
+
     :param player_pool: Pool of players that we will pick from
-    :type player_pool: Container
+    :type player_pool: DataFrame, PlayerPool or list(Player)
     """
     def __init__(self, player_pool):
-        self.ppool = player_pool
+        self.pool = None
+        self.plyrs = None
+        if isinstance(player_pool, pd.DataFrame):
+            self.ppool = player_pool
+        elif isinstance(player_pool, PlayerPool):
+            self.ppool = player_pool.frame
+            self.pool = player_pool
+        else:
+            self.ppool = None
+            self.plyrs = list(player_pool)
+        self.ranks = None
+        self.order = None
         self.rank_stats_descending = ["ERA", "WHIP", "percent_owned"]
 
     def rank(self, stat_categories):
         """Rank players in the player pool according to the stat categories
 
+        If the pool was given as a DataFrame, the rank is also saved in its
+        'rank' column.  A PlayerPool is shared, so it is never modified.
+
         :param stat_categories: List of the stat categories that the fantasy
                league uses.
         :type stat_categories: list(str)
         """
-        self.ppool['rank'] = 0
+        if self.ppool is None:
+            self.ppool = players_to_frame(self.plyrs)
+        ranks = np.zeros(len(self.ppool.index))
         for stat in stat_categories:
-            self.ppool['rank'] += self.ppool[stat].rank(
-                    ascending=self._is_stat_ascending(stat))
+            ranks += self.ppool[stat].rank(
+                    ascending=self._is_stat_ascending(stat)).to_numpy()
+        self.ranks = ranks
+        if self.pool is None and self.plyrs is None:
+            self.ppool['rank'] = ranks
 
     def shuffle(self):
         """
         Shuffle the player pool in order to produce a random roster
         """
-        self.ppool = self.ppool.sample(frac=1).reset_index(drop=True)
+        self.order = np.random.permutation(self._num_players())
 
     def select(self):
         """Iterate over players in the pool according to the rank
 
-        This is to be called after rank().  It will return the players starting
-        with the top ranked player.
+        Players are returned starting with the top ranked player.  Players
+        with the same rank are returned in shuffled order.  If the pool was
+        not ranked, the players are returned in shuffled order.
+        """
+        order = self.order if self.order is not None \
+            else np.arange(self._num_players())
+        if self.ranks is not None:
+            order = order[np.argsort(-self.ranks[order], kind='stable')]
+        for row in order:
+            yield self._player(row)
+
+    def _num_players(self):
+        if self.plyrs is not None:
+            return len(self.plyrs)
+        return len(self.ppool.index)
+
+    def _player(self, row):
+        """Return a Player for a row of the pool
+
+        The Player is only created when the row is selected.
         """
-        df = self.ppool.sort_values(by=['rank'], ascending=False)
-        for plyr_tuple in df.iterrows():
-            yield plyr_tuple[1]
+        if self.plyrs is not None:
+            return copy.copy(self.plyrs[row])
+        if self.pool is None:
+            self.pool = PlayerPool(self.ppool)
+        return self.pool.player(row)
 
     def _is_stat_ascending(self, stat):
         if stat in self.rank_stats_descending:
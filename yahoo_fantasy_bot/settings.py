@@ -0,0 +1,166 @@
+#!/usr/bin/python
+
+import dataclasses
+import math
+
+
+def _option(key, default):
+    """Declare a setting that is read from the config option named key"""
+    return dataclasses.field(default=default, metadata={'key': key})
+
+
+def _parse_section(cls, cfg, section):
+    """Build a settings object from a section of the config file
+
+    Options that are missing from the config file take the default in cls.
+
+    :param cls: Dataclass to build.  Each field records the name of its
+        option in the metadata.
+    :param cfg: Config file
+    :type cfg: configparser.RawConfigParser
+    :param section: Name of the section to read
+    :type section: str
+    :return: The settings with values converted to the type of each field
+    """
+    vals = {}
+    if section in cfg:
+        sect = cfg[section]
+        for fld in dataclasses.fields(cls):
+            key = fld.metadata['key']
+            if key not in sect or sect[key] == '' and fld.type is not str:
+                continue
+            try:
+                if fld.type is bool:
+                    vals[fld.name] = sect.getboolean(key)
+                elif fld.type is int:
+                    vals[fld.name] = int(sect[key])
+                else:
+                    vals[fld.name] = sect[key]
+            except ValueError:
+                raise RuntimeError(
+                    "Invalid value for {} in section [{}]: {}".format(
+                        key, section, sect[key]))
+    settings = cls(**vals)
+    settings.validate()
+    return settings
+
+
+def _check(cond, section, key, msg):
+    if not cond:
+        raise RuntimeError(
+            "Invalid value for {} in section [{}]: {}".format(key, section,
+                                                              msg))
+
+
+@dataclasses.dataclass
+class LineupOptimizerSettings:
+    """Settings from the [LineupOptimizer] section"""
+    generations: int = _option('generations', 100)
+    initial_population_size: int = _option('initialPopulationSize', 10)
+    tournament_participants: int = _option('tournamentParticipants', 4)
+    num_offspring: int = _option('numOffspring', 6)
+    mutation_pct: int = _option('mutationPct', 5)
+    record_file: str = _option('recordFile', '')
+    min_pct_owned: int = _option('minPctOwned', 0)
+    lock_players_above_pct_own: int = _option('lockPlayersAbovePctOwn', 101)
+    lock_player_file: str = _option('lockPlayerFile', '')
+    exclude_player_file: str = _option('excludePlayerFile', '')
+    bench_selection: str = _option('benchSelection', 'pctOwned')
+    memoize: bool = _option('memoize', True)
+
+    def validate(self):
+        s = 'LineupOptimizer'
+        _check(self.generations >= 0, s, 'generations',
+               "must not be negative")
+        _check(self.initial_population_size > 0, s, 'initialPopulationSize',
+               "must be positive")
+        _check(self.tournament_participants >= 2 and
+               math.log(self.tournament_participants, 2).is_integer(),
+               s, 'tournamentParticipants', "must be a power of 2")
+        _check(self.num_offspring >= 0, s, 'numOffspring',
+               "must not be negative")
+        _check(0 <= self.mutation_pct <= 100, s, 'mutationPct',
+               "must be between 0 and 100")
+        _check(self.bench_selection in ['pctOwned', 'avoidChurn'], s,
+               'benchSelection', "must be pctOwned or avoidChurn")
+
+
+@dataclasses.dataclass
+class ScorerSettings:
+    """Settings from the [Scorer] section"""
+    stdev_cap: int = _option('stdevCap', 3)
+    use_weekly_schedule: bool = _option('useWeeklySchedule', False)
+
+    def validate(self):
+        _check(self.stdev_cap > 0, 'Scorer', 'stdevCap', "must be positive")
+
+
+@dataclasses.dataclass
+class CacheSettings:
+    """Settings from the [Cache] section"""
+    dir: str = _option('dir', '.cache/')
+    free_agent_expiry: int = _option('freeAgentExpiry', 60)
+    prediction_builder_expiry: int = _option('predictionBuilderExpiry', 1440)
+    probable_starters_expiry: int = _option('probableStartersExpiry', 60)
+    week_metadata_expiry: int = _option('weekMetadataExpiry', 60)
+
+    def validate(self):
+        _check(self.free_agent_expiry >= 0, 'Cache', 'freeAgentExpiry',
+               "must not be negative")
+        _check(self.prediction_builder_expiry >= 0, 'Cache',
+               'predictionBuilderExpiry', "must not be negative")
+        _check(self.probable_starters_expiry >= 0, 'Cache',
+               'probableStartersExpiry', "must not be negative")
+        _check(self.week_metadata_expiry >= 0, 'Cache', 'weekMetadataExpiry',
+               "must not be negative")
+
+
+@dataclasses.dataclass
+class PredictionSettings:
+    """Settings from the [Prediction] section"""
+    preflight: str = _option('preflight', 'abort')
+
+    def validate(self):
+        _check(self.preflight in ['abort', 'skip', 'off'], 'Prediction',
+               'preflight', "must be abort, skip or off")
+
+
+class Settings:
+    """Typed settings parsed once from the config file
+
+    Sections can still be looked up by name, as with the config file itself,
+    so this can be handed to the plugins that read their own options.
+
+    :param cfg: Config file
+    :type cfg: configparser.RawConfigParser
+    """
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.lineup_optimizer = _parse_section(LineupOptimizerSettings, cfg,
+                                               'LineupOptimizer')
+        self.scorer = _parse_section(ScorerSettings, cfg, 'Scorer')
+        self.cache = _parse_section(CacheSettings, cfg, 'Cache')
+        self.prediction = _parse_section(PredictionSettings, cfg,
+                                         'Prediction')
+
+    def __getitem__(self, section):
+        return self.cfg[section]
+
+    def __contains__(self, section):
+        return section in self.cfg
+
+    def sections(self):
+        return self.cfg.sections()
+
+
+def load(cfg):
+    """Return the typed settings for a config file
+
+    :param cfg: Config file or settings that were already loaded
+    :type cfg: configparser.RawConfigParser or Settings
+    :return: The settings
+    :rtype: Settings
+    """
+    if isinstance(cfg, Settings):
+        return cfg
+    return Settings(cfg)
@@ -1,12 +1,28 @@
 #!/usr/bin/python
 
 import datetime
+import hashlib
+import json
 import logging
+import numpy as np
+import os
 import pandas as pd
+import shutil
 import tempfile
+from yahoo_fantasy_bot import settings
+try:
+    import resource
+except ImportError:     # Not available on Windows
+    resource = None
 
 logger = logging.getLogger()
 
+# Descriptive columns of the projections that are kept when they are
+# compacted.  Their values repeat across players, so they are stored as
+# categoricals.
+CATEGORY_COLUMNS = ['Team', 'team', 'mlb_team', 'Pos', 'position',
+                    'position_type', 'status']
+
 
 class Yahoo:
     """
@@ -129,8 +145,30 @@ class CSV:
         return details
 
 
-def read_csv(csv_detail):
-    '''Helper to read a csv file based on config settings'''
+def read_csv(csv_detail, store=None, columns=None):
+    '''Helper to read a csv file based on config settings
+
+    :param csv_detail: Details about the csv file as returned by
+        fetch_csv_details
+    :type csv_detail: dict
+    :param store: Optional store to read the csv through.  See
+        projection_store.
+    :type store: ProjectionStore
+    :param columns: Optional list of the columns to return.  Columns that
+        are not in the file are ignored.  The index is always returned.
+    :type columns: list(str)
+    :return: Contents of the csv file
+    :rtype: DataFrame
+    '''
+    if store is not None:
+        return store.read_csv(csv_detail, columns)
+    df = _parse_csv(csv_detail)
+    if columns is None:
+        return df
+    return df[[c for c in df.columns if c in columns]]
+
+
+def _parse_csv(csv_detail):
     if 'header' in csv_detail:
         header = int(csv_detail['header'])
     else:
@@ -146,3 +184,248 @@ def read_csv(csv_detail):
                            index_col=csv_detail['index_col'],
                            header=header,
                            na_values='-')
+
+
+def projection_store(cfg):
+    """Return the store to read the projection csv files through
+
+    Only projections from csv files named in the config are stored.  The
+    ones scraped from Yahoo! are written to a new temporary file each time.
+
+    :param cfg: Config details
+    :type cfg: configparser
+    :return: The store or None if the projections shouldn't be stored
+    :rtype: ProjectionStore or None
+    """
+    if cfg['Prediction']['source'] != 'csv':
+        return None
+    return ProjectionStore(os.path.join(settings.load(cfg).cache.dir,
+                                        'projections'))
+
+
+class ProjectionStore:
+    """Columnar copy of the projection csv files kept in the cache directory
+
+    Each csv file is parsed once and saved with one .npy file per column.
+    The copy is keyed by a hash of the file contents and its mtime, so an
+    edited file is parsed again.  Numeric columns are memory-mapped when
+    they are loaded.  Only the pages of the columns that are used get read
+    and the page cache is shared between processes on the same host.
+
+    :param store_dir: Directory to keep the columns in
+    :type store_dir: str
+    """
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+
+    def read_csv(self, csv_detail, columns=None):
+        """Read a csv file, parsing it only if it isn't in the store
+
+        :param csv_detail: Details about the csv file as returned by
+            fetch_csv_details
+        :type csv_detail: dict
+        :param columns: Optional list of the columns to load.  The other
+            columns are never read from disk.  The index is always loaded.
+        :type columns: list(str)
+        :return: Contents of the csv file
+        :rtype: DataFrame
+        """
+        entry_dir = self._entry_dir(csv_detail)
+        if not os.path.exists(os.path.join(entry_dir, 'meta.json')):
+            logger.info("Adding {} to the projection store".format(
+                csv_detail['file_name']))
+            self._save(entry_dir, _parse_csv(csv_detail))
+        return self._load(entry_dir, columns)
+
+    def _entry_dir(self, csv_detail):
+        fn = os.path.abspath(csv_detail['file_name'])
+        h = hashlib.sha1()
+        with open(fn, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        h.update(repr((os.stat(fn).st_mtime_ns, csv_detail['index_col'],
+                       csv_detail.get('header'),
+                       csv_detail.get('column_names'))).encode())
+        file_dir = hashlib.sha1(fn.encode()).hexdigest()
+        return os.path.join(self.store_dir, file_dir, h.hexdigest())
+
+    def _save(self, entry_dir, df):
+        """Save the columns of df to entry_dir
+
+        The columns are written to a temporary directory that is then
+        renamed.  This way another process never sees a partial copy.  Older
+        copies of the same file are removed.
+        """
+        file_dir = os.path.dirname(entry_dir)
+        os.makedirs(file_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=file_dir)
+        index = [n for n in df.index.names if n is not None]
+        if len(index) > 0:
+            df = df.reset_index()
+        meta = {'columns': [], 'index': index}
+        for i, col in enumerate(df.columns):
+            fn = os.path.join(tmp_dir, "col_{}.npy".format(i))
+            if pd.api.types.is_numeric_dtype(df[col]):
+                np.save(fn, df[col].to_numpy())
+                meta['columns'].append({'name': col, 'kind': 'numeric'})
+            else:
+                # Strings are saved as codes into a list of unique values
+                codes, uniques = pd.factorize(df[col])
+                np.save(fn, codes.astype(np.int32))
+                meta['columns'].append({'name': col, 'kind': 'codes',
+                                        'values': list(uniques.tolist())})
+        with open(os.path.join(tmp_dir, 'meta.json'), "w") as f:
+            json.dump(meta, f)
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # Another process saved the same file first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        for old in os.listdir(file_dir):
+            old_dir = os.path.join(file_dir, old)
+            if old_dir != entry_dir and not old.startswith('tmp'):
+                shutil.rmtree(old_dir, ignore_errors=True)
+
+    def _load(self, entry_dir, columns):
+        with open(os.path.join(entry_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        data = {}
+        for i, col in enumerate(meta['columns']):
+            if columns is not None and col['name'] not in columns and \
+                    col['name'] not in meta['index']:
+                continue
+            vals = np.load(os.path.join(entry_dir, "col_{}.npy".format(i)),
+                           mmap_mode='r')
+            if col['kind'] == 'codes':
+                # The last slot is for the missing values, which have code -1
+                uniques = np.empty(len(col['values']) + 1, dtype=object)
+                uniques[:-1] = col['values']
+                uniques[-1] = np.nan
+                vals = uniques[vals]
+            data[col['name']] = vals
+        df = pd.DataFrame(data, columns=list(data.keys()), copy=False)
+        if len(meta['index']) > 0:
+            df = df.set_index(meta['index'])
+        return df
+
+
+def projection_columns(join_cols, stat_cols):
+    """Return the columns that compact_projections keeps
+
+    Pass these to read_csv so that each file is narrowed before the
+    projections are put together.
+
+    :param join_cols: Columns used to match the projections with players
+    :type join_cols: list(str)
+    :param stat_cols: Stats that the builder uses
+    :type stat_cols: list(str)
+    :rtype: list(str)
+    """
+    cols = []
+    for col in join_cols + stat_cols + CATEGORY_COLUMNS:
+        if col not in cols:
+            cols.append(col)
+    return cols
+
+
+def compact_projections(df, join_cols, stat_cols, descr):
+    """Shrink the projections down to what the prediction builder needs
+
+    Only the join columns, stat columns and CATEGORY_COLUMNS are kept.  The
+    stats are stored as float32 when that doesn't change any value.  The
+    memory used by the frame is logged before and after.
+
+    :param df: Projections as read from the csv files
+    :type df: DataFrame
+    :param join_cols: Columns used to match the projections with players.
+        Columns that are not in df are ignored.
+    :type join_cols: list(str)
+    :param stat_cols: Stats that the builder uses.  Columns that are not in
+        df are ignored.
+    :type stat_cols: list(str)
+    :param descr: Description of the projections for the log
+    :type descr: str
+    :return: Compacted projections
+    :rtype: DataFrame
+    """
+    log_footprint = logger.isEnabledFor(logging.INFO)
+    if log_footprint:
+        before = int(df.memory_usage(deep=True).sum())
+        num_cols = len(df.columns)
+    cols = [col for col in projection_columns(join_cols, stat_cols)
+            if col in df.columns]
+    if set(cols) == set(df.columns):
+        # The files were already narrowed by read_csv.  Columns are only
+        # ever replaced below, so the data doesn't need to be copied.
+        cols = list(df.columns)
+        df = df.copy(deep=False)
+    else:
+        df = df[cols].copy()
+    for col in cols:
+        if col in CATEGORY_COLUMNS and \
+                pd.api.types.is_string_dtype(df[col].dtype):
+            df[col] = df[col].astype('category')
+        elif col in stat_cols and pd.api.types.is_numeric_dtype(df[col]) \
+                and not pd.api.types.is_bool_dtype(df[col]):
+            df[col] = _downcast(df[col])
+    if log_footprint:
+        logger.info(
+            "Compacted {} projections from {} to {} columns.  Memory {} -> {} "
+            "bytes".format(descr, num_cols, len(cols), before,
+                           int(df.memory_usage(deep=True).sum())))
+        if resource is not None:
+            logger.info("Peak RSS after loading {} projections: {} KB".format(
+                descr, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+    return df
+
+
+def _downcast(col):
+    """Convert a numeric column to float32 if every value survives that"""
+    vals = col.to_numpy(dtype=np.float64)
+    small = vals.astype(np.float32)
+    with np.errstate(invalid='ignore'):
+        exact = (small.astype(np.float64) == vals) | np.isnan(vals)
+    if exact.all():
+        return col.astype(np.float32)
+    return col
+
+
+def index_projections(df, cols):
+    """Build hash indexes to find rows in the projections by ID
+
+    :param df: Projections
+    :type df: DataFrame
+    :param cols: ID columns to index.  Columns that are not in df are ignored.
+    :type cols: list(str)
+    :return: Map of column name to its index.  Each index maps an ID to the
+        position in df of the first row with that ID.
+    :rtype: dict(str, Series)
+    """
+    indexes = {}
+    for col in cols:
+        if col not in df.columns or col in indexes:
+            continue
+        ids = df[col].to_numpy(dtype=object)
+        first = ~pd.isnull(ids) & ~pd.Series(ids).duplicated().to_numpy()
+        indexes[col] = pd.Series(np.flatnonzero(first),
+                                 index=pd.Index(ids[first], dtype=object))
+    return indexes
+
+
+def lookup_projections(indexes, col, ids):
+    """Find the rows of the projections for a list of IDs
+
+    :param indexes: Indexes built by index_projections()
+    :type indexes: dict(str, Series)
+    :param col: ID column to search
+    :type col: str
+    :param ids: IDs to find
+    :type ids: list
+    :return: Position of the first row with each ID, or -1 if there isn't one
+    :rtype: numpy.ndarray
+    """
+    index = indexes[col]
+    if len(index) == 0:
+        return np.full(len(ids), -1, dtype=np.intp)
+    pos = index.index.get_indexer(pd.Index(ids, dtype=object))
+    return np.where(pos >= 0, index.to_numpy()[pos], -1)
@@ -0,0 +1,184 @@
+#!/usr/bin/python
+
+import configparser
+import logging
+import numpy as np
+import pandas as pd
+import pytest
+from yahoo_fantasy_bot import bot, lineup_optimizer, points, roster, \
+    settings, utils
+
+
+def _manager_bot(tmp_path, lg_lineups):
+    cfg = configparser.RawConfigParser()
+    cfg.read_dict({
+        'Cache': {'dir': str(tmp_path)},
+        'League': {'id': '1.l.1'},
+        'Prediction': {'player_id_column_name': 'player_id'},
+        'Scorer': {'pointWeights': 'B:HR=4,B:R=1', 'stdevCap': '3'},
+        'ScoreAccumulator': {'package': 'yahoo_fantasy_bot',
+                             'module': '.points',
+                             'class': 'StatAccumulator'},
+        'LineupOptimizer': {'memoize': 'true'},
+    })
+    mbot = bot.ManagerBot.__new__(bot.ManagerBot)
+    mbot.logger = logging.getLogger()
+    mbot.cfg = settings.load(cfg)
+    mbot.tm_cache = utils.TeamCache(mbot.cfg, '1.l.1.t.1')
+    mbot.my_team_bldr = roster.Builder(["1B", "SS"])
+    scorer = points.Scorer(mbot.cfg)
+    mbot.score_comparer = bot.ScoreComparer(mbot.cfg, scorer, lg_lineups)
+    mbot.score_comparer.set_opponent(pd.Series({'PTS': 100.0}))
+    mbot.calls = 0
+    mbot.preflight_skipped = set()
+    mbot.team_rosters = {}
+
+    def optimizer(*args):
+        mbot.calls += 1
+        return lineup_optimizer.optimize_with_assignment(*args)
+    mbot._get_lineup_optimizer_function = lambda: optimizer
+    return mbot
+
+
+def test_optimizer_memoization(tmp_path):
+    pool = pd.DataFrame(
+        [[1, "McGriff", ["1B"], "B", 35, 91],
+         [2, "Olerud", ["1B"], "B", 14, 64],
+         [3, "Gruber", ["3B", "SS"], "B", 31, 92]],
+        columns=["player_id", "name", "eligible_positions", "position_type",
+                 "HR", "R"])
+    mbot = _manager_bot(tmp_path, [pool.iloc[:2], pool.iloc[1:]])
+    first = mbot._optimize(pool, [])
+    second = mbot._optimize(pool, [])
+    assert(mbot.calls == 1)
+    assert([(p['player_id'], p['selected_position'])
+            for p in first.get_roster()] ==
+           [(p['player_id'], p['selected_position'])
+            for p in second.get_roster()])
+    assert(second.get_roster()[0]['name'] == first.get_roster()[0]['name'])
+
+    # A change to the projections runs the optimizer again
+    pool.loc[1, 'HR'] = 60
+    third = mbot._optimize(pool, [])
+    assert(mbot.calls == 2)
+    assert("Olerud" in [p['name'] for p in third.get_roster()])
+
+    # So does a change of opponent
+    mbot.score_comparer.set_opponent(pd.Series({'PTS': np.float64(200.0)}))
+    mbot._optimize(pool, [])
+    assert(mbot.calls == 3)
+
+
+def test_optimizer_memoization_empty_pool(tmp_path):
+    locked = pd.DataFrame(
+        [[1, "McGriff", ["1B"], "B", 35, 91, "1B"],
+         [3, "Gruber", ["3B", "SS"], "B", 31, 92, "SS"]],
+        columns=["player_id", "name", "eligible_positions", "position_type",
+                 "HR", "R", "selected_position"])
+    mbot = _manager_bot(tmp_path, [locked, locked])
+    # Every player is locked, so there is no pool to rebuild the lineup from
+    pool = locked.drop(columns=["selected_position"]).iloc[0:0]
+    locked = [p for _, p in locked.iterrows()]
+    for _ in range(2):
+        lineup = mbot._optimize(pool, locked)
+        assert(sorted(p['name'] for p in lineup.get_roster()) ==
+               ["Gruber", "McGriff"])
+    assert(mbot.calls == 2)
+    # A pool without any columns is a cache miss too
+    assert(mbot._lineup_from_cache({'lineup': [(1, "1B")]}, pd.DataFrame(),
+                                   locked) is None)
+
+
+def test_filter_free_agents(tmp_path):
+    lineup = pd.DataFrame([[1, "McGriff", ["1B"], "B", 35, 91]],
+                          columns=["player_id", "name", "eligible_positions",
+                                   "position_type", "HR", "R"])
+    mbot = _manager_bot(tmp_path, [lineup, lineup])
+    mbot.cfg['LineupOptimizer']['minPctOwned'] = '10'
+    mbot.cfg['LineupOptimizer']['excludePlayerFile'] = \
+        str(tmp_path / "exclude.txt")
+    (tmp_path / "exclude.txt").write_text("Joe Carter\n")
+    mbot.cfg['LineupOptimizer']['lockPlayerFile'] = \
+        str(tmp_path / "lock.txt")
+    (tmp_path / "lock.txt").write_text("Rance Mulliniks\n")
+    mbot.cfg = settings.load(mbot.cfg.cfg)
+    fa = [{'name': "John Olerud", 'percent_owned': 50, 'status': ''},
+          {'name': "Kelly Gruber", 'percent_owned': 5, 'status': ''},
+          {'name': "Tony Fernandez", 'percent_owned': 30, 'status': 'IL10'},
+          {'name': "Manny Lee", 'percent_owned': 5, 'status': 'DTD'},
+          {'name': "Joe Carter", 'percent_owned': 90, 'status': ''},
+          {'name': "Rance Mulliniks", 'percent_owned': 1, 'status': 'DTD'},
+          {'name': "Pat Borders"}]
+    assert([p['name'] for p in mbot._filter_free_agents(fa)] ==
+           ["John Olerud", "Tony Fernandez", "Rance Mulliniks",
+            "Pat Borders"])
+
+
+def test_preflight(tmp_path):
+    class FakeTeam:
+        def __init__(self, plyrs):
+            self.plyrs = plyrs
+            self.calls = 0
+
+        def roster(self, week=None, day=None):
+            self.calls += 1
+            return self.plyrs
+
+    class FakeLeague:
+        teams_ = {'t.1': FakeTeam([{'player_id': 1, 'name': "Olerud",
+                                    'selected_position': '1B'},
+                                   {'player_id': 4, 'name': "Borders",
+                                    'selected_position': 'BN'}]),
+                  't.2': FakeTeam([{'player_id': 2, 'name': "Carter",
+                                    'selected_position': 'RF'},
+                                   {'player_id': 3, 'name': "Gruber",
+                                    'selected_position': '3B'}])}
+
+        def team_key(self):
+            return 't.1'
+
+        def teams(self):
+            return self.teams_
+
+        def to_team(self, key):
+            return self.teams_[key]
+
+        def current_week(self):
+            return 1
+
+        def end_week(self):
+            return 20
+
+        def edit_date(self):
+            return None
+
+    class FakeBuilder:
+        def preflight(self, plyrs):
+            self.checked = [p['name'] for p in plyrs]
+            return [{'player': p, 'reason': "Not found", 'tried': ['name']}
+                    for p in plyrs if p['player_id'] == 2]
+
+    lineup = pd.DataFrame([[1, "McGriff", ["1B"], "B", 35, 91]],
+                          columns=["player_id", "name", "eligible_positions",
+                                   "position_type", "HR", "R"])
+    mbot = _manager_bot(tmp_path, [lineup, lineup])
+    mbot.lg = FakeLeague()
+    mbot.pred_bldr = FakeBuilder()
+    with pytest.raises(RuntimeError, match=r"Carter \(id: 2, team: t.2\)"):
+        mbot.preflight()
+    # Our bench is checked too
+    assert(mbot.pred_bldr.checked == ["Olerud", "Borders", "Carter", "Gruber"])
+
+    mbot.cfg['Prediction']['preflight'] = 'skip'
+    mbot.cfg = settings.load(mbot.cfg.cfg)
+    mbot.preflight()
+    assert([p['name'] for p in mbot._get_roster_for_team('t.2')] ==
+           ["Gruber"])
+    # Each roster is only fetched once per run, including our own
+    assert(len(mbot._get_orig_roster()) == 2)
+    assert(FakeLeague.teams_['t.1'].calls == 1)
+    assert(FakeLeague.teams_['t.2'].calls == 1)
+    # Changes to the roster we are given don't reach the cached one
+    mbot._get_orig_roster()[1]['selected_position'] = np.nan
+    assert([p['name'] for p in mbot._get_roster_for_team('t.1')] ==
+           ["Olerud"])
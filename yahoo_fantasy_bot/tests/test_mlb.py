@@ -0,0 +1,534 @@
+#!/usr/bin/env python
+
+import configparser
+import os
+import datetime
+import pandas as pd
+import numpy as np
+import pytest
+import random
+from types import SimpleNamespace
+from yahoo_fantasy_bot import mlb, points, roster, lineup_optimizer
+
+MLB_COLS = ["name", "position_type", "G", "AB", "H", "BB", "HR", "R", "IP",
+            "ER", "W", "SO", "WK_GS", "WK_G", "SEASON_G"]
+
+
+def _cfg(weekly):
+    cfg = configparser.RawConfigParser()
+    cfg['League'] = {
+        'predictedStatCategories': 'HR,R,AVG,OBP,W,SO,ERA,WHIP'}
+    cfg['Scorer'] = {'useWeeklySchedule': 'true' if weekly else 'false'}
+    return cfg
+
+
+@pytest.fixture
+def mlb_pool():
+    yield pd.DataFrame(
+        [["Olerud", "B", 150, 500, 180, 90, 20, 80, np.nan, np.nan, np.nan,
+          np.nan, 0, 6, 100],
+         ["Alomar", "B", 155, 600, 190, 80, 10, 100, np.nan, np.nan, np.nan,
+          np.nan, 0, 7, 0],
+         ["Carter", "B", 160, 620, 160, 40, 35, np.nan, np.nan, np.nan,
+          np.nan, np.nan, 0, 6, 120],
+         ["Guzman", "P", 30, np.nan, 190, 60, np.nan, np.nan, 200, 80, 14,
+          180, 2, 6, 120],
+         ["Key", "P", 32, np.nan, 200, 50, np.nan, np.nan, 210, 70, 16, 150,
+          0, 6, 120]], columns=MLB_COLS)
+
+
+def _reference_summary(scorer, df):
+    res = {}
+    hit_df = df[df['position_type'] == 'B']
+    pit_df = df[df['position_type'] == 'P']
+
+    def tot(d, stat):
+        return sum([scorer.sum_stat_for_player(p, stat)
+                    for _, p in d.iterrows()])
+    for stat in ['HR', 'R']:
+        res[stat] = tot(hit_df, stat)
+    h, ab, bb = tot(hit_df, 'H'), tot(hit_df, 'AB'), tot(hit_df, 'BB')
+    res['AVG'] = h / ab if ab > 0 else 0
+    res['OBP'] = (h + bb) / (ab + bb) if ab + bb > 0 else 0
+    for stat in ['W', 'SO']:
+        res[stat] = tot(pit_df, stat)
+    h, bb, ip, er = tot(pit_df, 'H'), tot(pit_df, 'BB'), tot(pit_df, 'IP'), \
+        tot(pit_df, 'ER')
+    res['ERA'] = er * 9 / ip if ip > 0 else 0
+    res['WHIP'] = (bb + h) / ip if ip > 0 else 0
+    return res
+
+
+@pytest.mark.parametrize("weekly", [False, True])
+def test_summarize_matches_per_player(mlb_pool, weekly):
+    scorer = mlb.Scorer(_cfg(weekly))
+    df = mlb_pool.drop([2])   # Carter has a missing stat
+    summary = scorer.summarize(df)
+    expected = _reference_summary(scorer, df)
+    assert(sorted(summary.index) == sorted(scorer.all_cats))
+    for stat, v in expected.items():
+        assert(summary[stat] == pytest.approx(v))
+
+
+def test_summarize_missing_stat(mlb_pool):
+    summary = mlb.Scorer(_cfg(False)).summarize(mlb_pool)
+    assert(summary['R'] == pytest.approx(180))
+    summary = mlb.Scorer(_cfg(True)).summarize(mlb_pool)
+    assert(np.isnan(summary['R']))
+
+
+@pytest.mark.parametrize("weekly", [False, True])
+def test_summarize_batch(mlb_pool, weekly):
+    scorer = mlb.Scorer(_cfg(weekly))
+    membership = np.array([[1, 1, 0, 1, 0],
+                           [0, 1, 1, 0, 1],
+                           [0, 0, 0, 0, 0]])
+    res = scorer.summarize_batch(mlb_pool, membership)
+    assert(len(res.index) == 3)
+    for i, row in enumerate(membership):
+        exp = scorer.summarize(mlb_pool[row == 1])
+        for stat in scorer.all_cats:
+            if np.isnan(exp[stat]):
+                assert(np.isnan(res.iloc[i][stat]))
+            else:
+                assert(res.iloc[i][stat] == pytest.approx(exp[stat]))
+    assert((res.iloc[2] == 0).all())
+
+
+@pytest.mark.parametrize("weekly", [False, True])
+def test_materialized_weekly_stats(mlb_pool, weekly):
+    cfg = _cfg(weekly)
+    bldr = mlb.Builder.__new__(mlb.Builder)
+    bldr.scorer = mlb.Scorer(cfg)
+    bldr.point_stats = []
+    df = bldr._materialize_weekly_stats(mlb_pool.drop([2]))
+    assert('H_wk' in df.columns)
+    raw = bldr.scorer.summarize(mlb_pool.drop([2]))
+    materialized = bldr.scorer.summarize(df)
+    for stat in bldr.scorer.all_cats:
+        assert(materialized[stat] == pytest.approx(raw[stat]))
+    # The accumulator must agree with the scorer
+    df['R_wk'] = -1.0
+    accum = mlb.StatAccumulator(cfg)
+    for _, plyr in df.iterrows():
+        accum.add_player(plyr)
+    assert(accum.get_summary([])['R'] == -2.0)
+    assert(bldr.scorer.summarize(df)['R'] == -2.0)
+
+
+def test_materialized_point_stats(mlb_pool):
+    # SB isn't a category but it is worth points
+    cfg = _cfg(True)
+    cfg['Scorer']['pointWeights'] = 'B:HR=4,B:SB=2,P:SO=1'
+    bldr = mlb.Builder.__new__(mlb.Builder)
+    bldr.scorer = mlb.Scorer(cfg)
+    bldr.point_stats = points.weighted_stats(cfg)
+    assert(bldr.point_stats == ['HR', 'SB', 'SO'])
+    df = bldr._materialize_weekly_stats(
+        mlb_pool.drop([2]).assign(SB=[10, 30, np.nan, np.nan]))
+    assert('SB_wk' in df.columns)
+    vals = points.Scorer(cfg).player_values(df)
+    assert(vals[0] == pytest.approx((4 * 20 + 2 * 10) / 100 * 6))
+    assert(vals[1] == 0)
+    assert(vals[2] == pytest.approx(180 / 30 * 2))
+    assert(vals[3] == pytest.approx(150 / 120 * 6))
+
+
+@pytest.mark.parametrize("weekly", [False, True])
+def test_summarize_predicted_and_selected(mlb_pool, weekly):
+    # Players from select_players don't have the weekly columns.  They are
+    # concatenated with predicted players when the lineup is optimized.
+    cfg = _cfg(weekly)
+    bldr = mlb.Builder.__new__(mlb.Builder)
+    bldr.scorer = mlb.Scorer(cfg)
+    bldr.point_stats = []
+    predicted = bldr._materialize_weekly_stats(mlb_pool.iloc[[0, 3]])
+    selected = mlb_pool.iloc[[1, 4]]
+    df = pd.concat([predicted, selected])
+    expected = bldr.scorer.summarize(mlb_pool.iloc[[0, 3, 1, 4]])
+    summary = bldr.scorer.summarize(df)
+    batch = bldr.scorer.summarize_batch(df, np.ones((1, 4))).iloc[0]
+    accum = mlb.StatAccumulator(cfg)
+    for _, plyr in df.iterrows():
+        accum.add_player(plyr)
+    accum_summary = accum.get_summary([])
+    for stat in bldr.scorer.all_cats:
+        assert(not np.isnan(summary[stat]))
+        assert(summary[stat] == pytest.approx(expected[stat]))
+        assert(batch[stat] == pytest.approx(expected[stat]))
+        assert(accum_summary[stat] == pytest.approx(expected[stat]))
+    if not weekly:
+        assert(summary['HR'] == 30)
+
+
+@pytest.mark.parametrize("weekly", [False, True])
+def test_init_population_locked(mlb_pool, weekly):
+    # The locked players come from select_players and have no weekly columns.
+    # The seeds must score the same as the stat accumulator.
+    cfg = _cfg(weekly)
+    cfg.read_dict({
+        'Prediction': {'player_id_column_name': 'player_id'},
+        'ScoreAccumulator': {'package': 'yahoo_fantasy_bot',
+                             'module': '.mlb',
+                             'class': 'StatAccumulator'},
+        'LineupOptimizer': {'initialPopulationSize': '4'}})
+    df = mlb_pool.assign(
+        player_id=[1, 2, 3, 4, 5], percent_owned=[90, 80, 70, 60, 50],
+        eligible_positions=[["1B"], ["2B", "1B"], ["1B"], ["SP"], ["SP"]],
+        R=[80, 100, 70, np.nan, np.nan])
+    bldr = mlb.Builder.__new__(mlb.Builder)
+    bldr.scorer = mlb.Scorer(cfg)
+    bldr.point_stats = []
+    pool = bldr._materialize_weekly_stats(df.drop([4]))
+    locked = [df.iloc[4].copy()]
+    locked[0]['selected_position'] = "SP"
+    comparer = SimpleNamespace(scorer=bldr.scorer,
+                               compute_score=lambda s: float(s.sum()))
+    algo = lineup_optimizer.GeneticAlgorithm(
+        cfg, comparer, roster.Builder(["1B", "2B", "SP", "SP"]), pool, locked)
+    random.seed(0)
+    algo._init_population()
+    assert(len(algo.population) > 0)
+    for lineup in algo.population:
+        assert(not np.isnan(lineup['score']))
+        assert(lineup['score'] == pytest.approx(comparer.compute_score(
+            lineup['players'].compute_stat_summary())))
+
+
+@pytest.fixture
+def id_lookup(tmp_path):
+    from baseball_id.lookup import Cache
+    df = pd.DataFrame(
+        [["John Olerud", np.nan, "11"],
+         ["Roberto Alomar", np.nan, "12"],
+         ["Jose Canseco", np.nan, np.nan],
+         ["Joe Carter", "Joe Carter", "14"],
+         ["Joe Carter", "Joseph Carter", "15"]],
+        columns=["mlb_name", "fg_name", "yahoo_id"])
+    df = df.reindex(columns=mlb.LOOKUP_NAME_COLUMNS + ["yahoo_id"])
+    fn = tmp_path / "ids.csv"
+    df.to_csv(fn, index=False)
+    yield Cache(str(fn))
+
+
+def _plyr(plyr_id, name, **kwargs):
+    plyr = {'player_id': plyr_id, 'name': name, 'position_type': 'B',
+            'eligible_positions': ['1B'], 'status': ''}
+    plyr.update(kwargs)
+    return plyr
+
+
+def test_find_roster(id_lookup):
+    bldr = mlb.Builder.__new__(mlb.Builder)
+    bldr.set_id_lookup(id_lookup)
+    roster = [_plyr(11, "John Olerud", percent_owned=80),
+              _plyr(99, "Roberto Alomar"),
+              _plyr(98, "José Canseco", status='DTD'),
+              _plyr(12, "Roberto Alomar", selected_position='BN'),
+              _plyr(97, "Joe Carter"),
+              _plyr(13, "Kelly Gruber", position_type='P')]
+    lk = bldr._find_roster('B', roster, fail_on_missing=False)
+    # Alomar and Canseco are found by name.  Carter has two matches.
+    assert(list(lk['player_id']) == [11, 99, 98])
+    assert(list(lk['mlb_name']) ==
+           ["John Olerud", "Roberto Alomar", "Jose Canseco"])
+    assert(list(lk['status']) == ['', '', 'DTD'])
+    assert(lk['percent_owned'].iloc[0] == 80)
+    assert(np.isnan(lk['percent_owned'].iloc[1]))
+
+    # The first player that fails is the one reported
+    with pytest.raises(ValueError, match="didn't have a Yahoo ID"):
+        bldr._find_roster('B', roster, fail_on_missing=True)
+    with pytest.raises(ValueError, match="Was not able to lookup player"):
+        bldr._find_roster('B', roster[3:], fail_on_missing=True)
+    assert(len(bldr._find_roster('B', roster[:2], True).index) == 2)
+
+
+def test_find_roster_crosswalk(id_lookup, tmp_path):
+    from yahoo_fantasy_bot import crosswalk
+    fn = str(tmp_path / "crosswalk.pkl")
+    bldr = mlb.Builder.__new__(mlb.Builder)
+    bldr.set_id_lookup(id_lookup)
+    bldr.crosswalk = crosswalk.Crosswalk(fn, '1.0')
+    roster = [_plyr(11, "John Olerud"), _plyr(99, "Roberto Alomar"),
+              _plyr(97, "Joe Carter"), _plyr(13, "Kelly Gruber")]
+    expected = bldr._find_roster('B', roster, fail_on_missing=False)
+    # Gruber isn't in the database so he isn't saved
+    assert(len(bldr.crosswalk) == 3)
+    assert(bldr.crosswalk.get(99, "Roberto Alomar")['method'] == 'name')
+    assert(bldr.crosswalk.get(99, "Robbie Alomar") is None)
+
+    # A new process resolves everyone from the crosswalk on disk
+    bldr.crosswalk = crosswalk.Crosswalk(fn, '1.0')
+    from_names = id_lookup.from_names
+    id_lookup.from_names = None
+    lk = bldr._find_roster('B', roster[:3], fail_on_missing=False)
+    assert(list(lk['player_id']) == list(expected['player_id']))
+    assert(list(lk['mlb_name']) == list(expected['mlb_name']))
+    assert(list(bldr.crosswalk.find_by_name("Joe Carter")) == ['97'])
+
+    # Another Yahoo! player with a name that was resolved by name is found
+    # without a name lookup
+    lk = bldr._find_roster('B', [_plyr(96, "Roberto Alomar")], False)
+    assert(list(lk['mlb_name']) == ["Roberto Alomar"])
+    assert(bldr.crosswalk.get(96, "Roberto Alomar")['method'] == 'name')
+    id_lookup.from_names = from_names
+
+    # The crosswalk is dropped when baseball_id is upgraded
+    assert(len(crosswalk.Crosswalk(fn, '1.1')) == 0)
+
+    # A change to the database drops the entries before they are used, even
+    # when every player is found in the crosswalk
+    df = pd.read_csv(id_lookup.source)
+    df[df['mlb_name'] != "John Olerud"].to_csv(id_lookup.source, index=False)
+    bldr.crosswalk = crosswalk.Crosswalk(fn, '1.0')
+    bldr.set_id_lookup(type(id_lookup)(id_lookup.source))
+    assert(bldr.crosswalk.get(11, "John Olerud") is not None)
+    lk = bldr._find_roster('B', roster[:1], False)
+    assert(lk is None)
+    assert(len(bldr.crosswalk) == 0)
+
+
+class FakeTeamScraper:
+    scraped = []
+
+    def set_date_range(self, start_date, end_date):
+        self.start_date = pd.Timestamp(start_date)
+        self.end_date = pd.Timestamp(end_date)
+
+    def scrape(self, team):
+        FakeTeamScraper.scraped.append(team)
+        # TOR plays every day, SEA every other day
+        step = 1 if team == 'TOR' else 2
+        dates = pd.date_range('2021-04-01', '2021-09-30', freq=f'{step}D')
+        dates = dates[(dates >= self.start_date) & (dates <= self.end_date)]
+        return pd.DataFrame({'Date': dates})
+
+
+def test_team_schedule(tmp_path):
+    import datetime
+    FakeTeamScraper.scraped = []
+    fn = str(tmp_path / "team_schedule.pkl")
+    start = datetime.date(2021, 5, 3)
+    end = datetime.date(2021, 12, 31)
+    sched = mlb.TeamSchedule(start, end, FakeTeamScraper, fn)
+    wk_end = datetime.date(2021, 5, 9)
+    assert(list(sched.games(['TOR', None, 'SEA', 'TOR'], start, wk_end)) ==
+           [7, 0, 4, 7])
+    assert(list(sched.games(['SEA', 'TOR'], start, end)) == [76, 151])
+    assert(sorted(FakeTeamScraper.scraped) == ['SEA', 'TOR'])
+
+    # The matrix is reused from disk for the rest of the day
+    sched = mlb.TeamSchedule(start, end, FakeTeamScraper, fn)
+    assert(list(sched.games(['TOR'], start, wk_end)) == [7])
+    assert(len(FakeTeamScraper.scraped) == 2)
+
+
+class FakeLeague:
+    def __init__(self, current_week):
+        self.week = current_week
+        self.calls = 0
+
+    def settings(self):
+        self.calls += 1
+        return {'weekly_deadline': '1'}
+
+    def current_week(self):
+        return self.week
+
+    def edit_date(self):
+        return datetime.date(2021, 5, 3)
+
+    def week_date_range(self, week):
+        start = datetime.date(2021, 4, 5) + datetime.timedelta(weeks=week-1)
+        return (start, start + datetime.timedelta(days=6))
+
+
+def test_builder_components(tmp_path):
+    cfg = _cfg(True)
+    cfg['Cache'] = {'dir': str(tmp_path), 'probableStartersExpiry': '60'}
+    cfg['League']['id'] = '1.l.2'
+    cfg['Prediction'] = {'source': 'csv', 'join_column_csv': 'playerid',
+                         'join_column_id_lookup': 'fg_id'}
+    loads = []
+
+    def csv_details():
+        loads.append(1)
+        fn = tmp_path / "hitters.csv"
+        pd.DataFrame({'playerid': [1, 2], 'Name': ['A', 'B'],
+                      'HR': [10, 20], 'G': [100, 110]}).to_csv(fn, index=False)
+        detail = {'file_name': str(fn), 'index_col': 'Name', 'header': 0}
+        return {'hitters': detail, 'pitchers': detail}
+
+    lg = FakeLeague(5)
+    bldr = mlb.Builder(lg, cfg, csv_details, None, None, None)
+    assert(lg.calls == 0 and len(loads) == 0)
+    assert(bldr.wk_start_date == datetime.date(2021, 5, 3))
+    assert(bldr.season_end_date == datetime.date(2021, 12, 31))
+    assert(bldr._week()['starters_start_date'] == datetime.date(2021, 5, 10))
+    assert(len(bldr.ppool.index) == 4)
+
+    # A new builder reuses the cached components
+    bldr = mlb.Builder(lg, cfg, csv_details, None, None, None)
+    assert(bldr.wk_end_date == datetime.date(2021, 5, 9))
+    assert(len(bldr.ppool.index) == 4)
+    assert(lg.calls == 1 and len(loads) == 1)
+
+
+def test_builder_keeps_point_stats(tmp_path):
+    # SB isn't a category but it is worth points, so it survives compaction
+    cfg = _cfg(False)
+    cfg['Scorer']['pointWeights'] = 'B:HR=4,B:SB=2'
+    cfg['Cache'] = {'dir': str(tmp_path)}
+    cfg['League']['id'] = '1.l.2'
+    cfg['Prediction'] = {'source': 'csv', 'join_column_csv': 'playerid',
+                         'join_column_id_lookup': 'fg_id'}
+    fn = tmp_path / "hitters.csv"
+    pd.DataFrame({'playerid': [1, 2], 'Name': ['A', 'B'], 'HR': [10, 20],
+                  'SB': [30, 5], 'CS': [3, 1]}).to_csv(fn, index=False)
+    detail = {'file_name': str(fn), 'index_col': 'Name', 'header': 0}
+    bldr = mlb.Builder(FakeLeague(5), cfg,
+                       {'hitters': detail, 'pitchers': detail}, None, None,
+                       None)
+    assert('SB' in bldr.ppool.columns)
+    assert('CS' not in bldr.ppool.columns)
+    assert(list(bldr.ppool['SB']) == [30, 5, 30, 5])
+
+
+class FakeStartersScraper:
+    scrapes = 0
+
+    def __init__(self, start_date, end_date):
+        self.start_date = start_date
+        self.end_date = end_date
+
+    def scrape(self):
+        FakeStartersScraper.scrapes += 1
+        return pd.DataFrame({'espn_id': [101, 102, 101, 103]})
+
+
+def test_num_gs():
+    from yahoo_fantasy_bot import settings
+    FakeStartersScraper.scrapes = 0
+    bldr = mlb.Builder.__new__(mlb.Builder)
+    bldr.cfg = settings.load(_cfg(True))
+    bldr.es = FakeStartersScraper(None, None)
+    bldr.starts = None
+    assert(list(bldr._num_gs([101, np.nan, 103, 104])) == [2, 0, 1, 0])
+    assert(list(bldr._num_gs([102])) == [1])
+    assert(FakeStartersScraper.scrapes == 1)
+
+
+def test_select_players(id_lookup):
+    bldr = mlb.Builder.__new__(mlb.Builder)
+    bldr.set_id_lookup(id_lookup)
+    bldr.source = 'csv'
+    bldr.join_col_csv = 'playerid'
+    bldr.join_col_id_lookup = 'yahoo_id'
+    bldr.ppool = pd.DataFrame({'playerid': [12, 11, 11, 14],
+                               'name': ['Alomar', 'Olerud', 'Olerud2',
+                                        'Carter'],
+                               'HR': [10.0, 20.0, 30.0, 40.0]})
+    bldr._index_ppool()
+    roster = [_plyr(11, "John Olerud", selected_position='1B'),
+              _plyr(12, "Roberto Alomar", selected_position='2B')]
+    df = bldr.select_players(roster)
+    assert(list(df['name']) == ["John Olerud", "Roberto Alomar"])
+    assert(list(df['HR']) == [20.0, 10.0])
+    assert(list(df['mlb_name']) == ["John Olerud", "Roberto Alomar"])
+    assert(list(df['selected_position']) == ['1B', '2B'])
+
+    bldr.ppool = bldr.ppool.iloc[1:]
+    bldr._index_ppool()
+    with pytest.raises(ValueError, match="Could not find any prediction"):
+        bldr.select_players(roster)
+
+    bldr.source = 'yahoo'
+    bldr.ppool = bldr.ppool.assign(player_id=bldr.ppool['playerid'])
+    bldr._index_ppool()
+    assert(list(bldr.select_players(roster[:1])['HR']) == [20.0])
+
+
+def test_predict_memo():
+    from yahoo_fantasy_bot import utils
+    predicted = []
+
+    def fake_predict(plyrs, fail_on_missing, team_has):
+        predicted.extend(p['player_id'] for p in plyrs)
+        found = [p for p in plyrs if p['player_id'] != 13]
+        return pd.DataFrame({'player_id': [p['player_id'] for p in found],
+                             'name': [p['name'] for p in found],
+                             'status': [p['status'] for p in found],
+                             'HR': [float(p['player_id']) for p in found]})
+
+    bldr = mlb.Builder.__new__(mlb.Builder)
+    bldr.memo = utils.PredictionMemo()
+    bldr._predict = fake_predict
+    pool = [_plyr(11, "John Olerud"), _plyr(12, "Roberto Alomar"),
+            _plyr(13, "Kelly Gruber")]
+    df = bldr.predict(pool, fail_on_missing=False)
+    assert(list(df['player_id']) == [11, 12])
+
+    # Only new players are predicted.  The Yahoo! fields are current.
+    lineup = [_plyr(14, "Joe Carter", position_type='P'),
+              _plyr(12, "Roberto Alomar", status='DTD', percent_owned=90),
+              _plyr(15, "Pat Borders", selected_position='BN')]
+    df = bldr.predict(lineup, fail_on_missing=True)
+    assert(list(df['player_id']) == [12, 14])
+    assert(list(df['HR']) == [12.0, 14.0])
+    assert(list(df['status']) == ['DTD', ''])
+    assert(list(df['percent_owned'].fillna(-1)) == [90, -1])
+    assert(predicted == [11, 12, 13, 14])
+
+    # Players that weren't found are predicted again if they must be found
+    bldr.predict(pool, fail_on_missing=False)
+    assert(predicted == [11, 12, 13, 14])
+    bldr.predict(pool, fail_on_missing=True)
+    assert(predicted == [11, 12, 13, 14, 13])
+
+
+def test_generic_csv_scraper(tmp_path):
+    from baseball_scraper import fangraphs
+    lines = ["Projections,,,,",
+             "MLBAM ID,Firstname,Lastname,Tm,HR",
+             "11,John,Olerud,TOR,20",
+             "12,Roberto,Alomar,TOR,15",
+             "14,Joe,Carter,TOR,30",
+             "Generated on 2021-04-01,,,,", ""]
+    fn = tmp_path / "batters.csv"
+    fn.write_text("\n".join(lines))
+    expected = pd.read_csv(fn, encoding='iso-8859-1', header=1, skipfooter=1,
+                           engine='python')
+    cache_dir = str(tmp_path / "cache")
+    for _ in range(2):
+        scraper = mlb.GenericCsvScraper(str(fn), str(fn), cache_dir)
+        pd.testing.assert_frame_equal(scraper.batter_cache, expected)
+    df = scraper.scrape([14, 11, 99], fangraphs.ScrapeType.HITTER)
+    assert(list(df['Name']) == ["John Olerud", "Joe Carter"])
+    assert(list(df['Team']) == ['TOR', 'TOR'])
+
+    # A modified file is parsed again
+    fn.write_text("\n".join(lines[:3] + lines[5:]))
+    os.utime(fn, ns=(0, 0))
+    scraper = mlb.GenericCsvScraper(str(fn), str(fn), cache_dir)
+    assert(len(scraper.batter_cache.index) == 1)
+
+
+def test_preflight(id_lookup):
+    bldr = mlb.Builder.__new__(mlb.Builder)
+    bldr.set_id_lookup(id_lookup)
+    bldr.source = 'csv'
+    bldr.join_col_csv = 'playerid'
+    bldr.join_col_id_lookup = 'yahoo_id'
+    bldr.ppool = pd.DataFrame({'playerid': [11, 14], 'HR': [20.0, 30.0]})
+    plyrs = [_plyr(11, "John Olerud"), _plyr(12, "Roberto Alomar"),
+             _plyr(98, "José Canseco"), _plyr(97, "Kelly Gruber"),
+             _plyr(14, "Joe Carter", position_type='P')]
+    unresolved = bldr.preflight(plyrs)
+    # Carter has two matches by name
+    assert([e['player']['player_id'] for e in unresolved] ==
+           [12, 98, 97, 14])
+    assert(unresolved[0]['reason'].startswith("Could not find any prediction"))
+    assert("didn't have a Yahoo ID" in unresolved[1]['reason'])
+    assert(unresolved[2]['reason'].startswith("Was not able to lookup"))
+    assert(all(e['tried'] == mlb.RESOLVE_STRATEGIES for e in unresolved))
@@ -0,0 +1,35 @@
+#!/usr/bin/python
+
+import configparser
+import pytest
+from types import SimpleNamespace
+from yahoo_fantasy_bot import plugins, points, lineup_optimizer
+
+
+def test_resolve_from_module():
+    cfg = configparser.RawConfigParser()
+    cfg.read_dict({'Scorer': {'package': 'yahoo_fantasy_bot',
+                              'module': '.points', 'class': 'Scorer'},
+                   'LineupOptimizer': {'package': 'yahoo_fantasy_bot',
+                                       'module': '.lineup_optimizer',
+                                       'function':
+                                       'optimize_with_assignment'}})
+    assert(plugins.resolve(cfg, 'Scorer') is points.Scorer)
+    assert(plugins.resolve(cfg, 'Scorer') is points.Scorer)
+    assert(plugins.resolve(cfg, 'LineupOptimizer', attr_key='function') is
+           lineup_optimizer.optimize_with_assignment)
+
+
+def test_unknown_entry_point():
+    cfg = configparser.RawConfigParser()
+    cfg.read_dict({'Scorer': {'entryPoint': 'no_such_scorer'}})
+    with pytest.raises(RuntimeError, match="Available: "):
+        plugins.resolve(cfg, 'Scorer')
+
+
+def test_entry_points_dict(monkeypatch):
+    # Python 3.8 and 3.9 return the entry points as a dict keyed by group
+    ep = SimpleNamespace(name='pts', load=lambda: points.Scorer)
+    monkeypatch.setattr(plugins.importlib_metadata, 'entry_points',
+                        lambda: {'yahoo_fantasy_bot.scorers': [ep]})
+    assert(plugins.load_entry_point('Scorer', 'pts') is points.Scorer)
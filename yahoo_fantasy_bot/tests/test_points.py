@@ -0,0 +1,118 @@
+#!/usr/bin/python
+
+import configparser
+import pytest
+import random
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+from yahoo_fantasy_bot import points, roster, lineup_optimizer
+
+PTS_COLS = ["player_id", "name", "eligible_positions", "position_type",
+            "percent_owned", "HR", "R", "W", "SO"]
+
+
+def _cfg():
+    cfg = configparser.RawConfigParser()
+    cfg.read_dict({
+        'Prediction': {'player_id_column_name': 'player_id'},
+        'Scorer': {'pointWeights': 'B:HR=4,B:R=1,P:W=5,P:SO=1'},
+        'ScoreAccumulator': {'package': 'yahoo_fantasy_bot',
+                             'module': '.points',
+                             'class': 'StatAccumulator'},
+    })
+    return cfg
+
+
+@pytest.fixture
+def pts_pool():
+    yield pd.DataFrame(
+        [[1, "McGriff", ["1B"], "B", 90, 35, 91, np.nan, np.nan],
+         [2, "Olerud", ["1B"], "B", 60, 14, 64, np.nan, np.nan],
+         [3, "Gruber", ["3B", "SS"], "B", 70, 31, 92, np.nan, np.nan],
+         [4, "Fernandez", ["SS"], "B", 80, 4, 84, np.nan, np.nan],
+         [5, "Steib", ["SP"], "P", 85, np.nan, np.nan, 18, 125],
+         [6, "Key", ["SP"], "P", 75, np.nan, np.nan, 13, np.nan]],
+        columns=PTS_COLS)
+
+
+def test_parse_stat_weights():
+    w = points.parse_stat_weights("B:HR=4, B:R=1,P:W=5")
+    assert(w == {'B': {'HR': 4.0, 'R': 1.0}, 'P': {'W': 5.0}})
+    w2 = points.parse_stat_weights(points.format_stat_weights(
+        {('B', 'HR'): 4.0, ('B', 'R'): 1.0, ('P', 'W'): 5.0}))
+    assert(w == w2)
+    with pytest.raises(RuntimeError):
+        points.parse_stat_weights("HR=4")
+
+
+def test_player_values(pts_pool):
+    scorer = points.Scorer(_cfg())
+    vals = scorer.player_values(pts_pool)
+    assert(list(vals) == [231.0, 120.0, 216.0, 100.0, 215.0, 65.0])
+    for i, (_, plyr) in enumerate(pts_pool.iterrows()):
+        assert(scorer.player_value(plyr) == vals[i])
+    assert(scorer.summarize(pts_pool)['PTS'] == vals.sum())
+
+
+def test_player_values_weekly(pts_pool):
+    scorer = points.Scorer(_cfg())
+    # Weekly values are only used if every weighted stat has one
+    df = pts_pool.assign(HR_wk=pts_pool['HR'] / 2)
+    assert(list(scorer.player_values(df)) ==
+           [231.0, 120.0, 216.0, 100.0, 215.0, 65.0])
+    # A row without any weekly values uses its projections
+    df = df.assign(R_wk=df['R'] / 2, W_wk=df['W'] / 2, SO_wk=df['SO'] / 2)
+    df.loc[1, ['HR_wk', 'R_wk']] = np.nan
+    vals = scorer.player_values(df)
+    assert(list(vals) == [115.5, 120.0, 108.0, 50.0, 107.5, 32.5])
+    for i, (_, plyr) in enumerate(df.iterrows()):
+        assert(scorer.player_value(plyr) == vals[i])
+
+
+def test_optimize_with_assignment(pts_pool):
+    cfg = _cfg()
+    comparer = SimpleNamespace(scorer=points.Scorer(cfg))
+    bldr = roster.Builder(["1B", "SS", "SP"])
+    lineup = lineup_optimizer.optimize_with_assignment(
+        cfg, comparer, bldr, pts_pool, [])
+    got = {p['selected_position']: p['name'] for p in lineup.get_roster()}
+    assert(got == {"1B": "McGriff", "SS": "Gruber", "SP": "Steib"})
+    assert(lineup.stat_accumulator.get_summary(None)['PTS'] == 662.0)
+
+    # A locked player always makes the lineup
+    locked = [pts_pool.iloc[1].copy()]
+    lineup = lineup_optimizer.optimize_with_assignment(
+        cfg, comparer, bldr, pts_pool, locked)
+    got = {p['selected_position']: p['name'] for p in lineup.get_roster()}
+    assert(got == {"1B": "Olerud", "SS": "Gruber", "SP": "Steib"})
+
+
+def test_init_population(pts_pool):
+    cfg = _cfg()
+    cfg['LineupOptimizer'] = {'initialPopulationSize': '4'}
+    scorer = points.Scorer(cfg)
+    comparer = SimpleNamespace(
+        scorer=scorer, compute_score=lambda s: s['PTS'])
+    bldr = roster.Builder(["1B", "SS", "SP"])
+    locked = [pts_pool.iloc[5].copy()]
+    locked[0]['selected_position'] = "SP"
+    algo = lineup_optimizer.GeneticAlgorithm(cfg, comparer, bldr, pts_pool,
+                                             locked)
+    random.seed(0)
+    algo._init_population()
+    # There are only 4 distinct lineups, so some draws may be duplicates
+    assert(2 <= len(algo.population) <= 4)
+    assert(len(set(tuple(lineup['sids']) for lineup in algo.population)) ==
+           len(algo.population))
+    for lineup in algo.population:
+        plyrs = lineup['players'].get_roster()
+        assert(sorted(p['selected_position'] for p in plyrs) ==
+               ["1B", "SP", "SS"])
+        assert(6 in [p['player_id'] for p in plyrs])
+        assert(lineup['score'] ==
+               lineup['players'].compute_stat_summary()['PTS'])
+    # The first lineup takes the highest owned players
+    first = algo.population[0]['players'].get_roster()
+    assert(sorted(p['name'] for p in first) ==
+           ["Fernandez", "Key", "McGriff"])
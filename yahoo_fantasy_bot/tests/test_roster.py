@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 
+import copy
 import pandas as pd
 import numpy as np
 import pytest
@@ -375,3 +376,93 @@ def test_roster_del_player(empty_roster):
     rc.del_player(0)
     assert(rc.get_num_players_at_pos('1B') == 0)
     assert(rc.get_player_by_pos('1B', 0) is None)
+
+
+def test_player_shares_pool():
+    df = pd.DataFrame([[1, "Cecil", ['1B'], np.nan],
+                       [2, "Fred", ['1B', 'LF'], np.nan]],
+                      columns=RBLDR_COLS, index=[10, 20])
+    pool = roster.PlayerPool(df)
+    plyrs = pool.players()
+    assert(plyrs[1]['name'] == 'Fred')
+    assert(plyrs[1].eligible_positions == ['1B', 'LF'])
+    assert('name' in plyrs[0] and 'HR' not in plyrs[0])
+    clone = copy.deepcopy(plyrs[0])
+    assert(clone.pool is pool)
+    clone['selected_position'] = '1B'
+    clone['percent_owned'] = 85
+    assert(pd.isnull(plyrs[0]['selected_position']))
+    assert('percent_owned' not in plyrs[0])
+    df = roster.players_to_frame([clone, plyrs[1]])
+    assert(list(df['name']) == ['Cecil', 'Fred'])
+    assert(df['selected_position'][0] == '1B')
+    assert(df['percent_owned'][0] == 85)
+
+
+def test_selector_yields_players(fake_player_selector):
+    fake_player_selector.rank(['HR', 'OBP'])
+    plyr = next(fake_player_selector.select())
+    assert(isinstance(plyr, roster.Player))
+    assert(plyr['name'] == 'McGriff')
+
+
+def test_selector_leaves_pool_alone(fake_player_selector):
+    pool = roster.PlayerPool(fake_player_selector.ppool)
+    selector = roster.PlayerSelector(pool)
+    selector.rank(['HR', 'OBP'])
+    assert('rank' not in pool.frame.columns)
+    assert(next(selector.select())['name'] == 'McGriff')
+
+
+def test_fork_shares_until_modified(bldr, empty_roster):
+    r = bldr.fit_if_space(empty_roster, pd.Series(
+        [1, "Cecil", ['1B', 'LF'], np.nan], index=RBLDR_COLS))
+    child = r.fork()
+    assert(child.get_roster() is r.get_roster())
+    child = bldr.fit_if_space(child, pd.Series(
+        [2, "Fred", ['1B'], np.nan], index=RBLDR_COLS))
+    assert(child.get_roster() is not r.get_roster())
+    # Cecil moved to LF in the child only
+    assert(child.get_player_by_pos('LF', 0)['name'] == 'Cecil')
+    assert(child.get_player_by_pos('1B', 0)['name'] == 'Fred')
+    assert(len(r.get_roster()) == 1)
+    assert(r.get_roster()[0]['selected_position'] == '1B')
+    assert(r.get_player_by_pos('1B', 0)['name'] == 'Cecil')
+    assert(r.get_num_players_at_pos('LF') == 0)
+
+
+def test_fork_del_player(bldr, empty_roster):
+    r = bldr.fit_if_space(empty_roster, pd.Series(
+        [1, "Cecil", ['1B'], np.nan], index=RBLDR_COLS))
+    r = bldr.fit_if_space(r, pd.Series(
+        [2, "George", ['LF'], np.nan], index=RBLDR_COLS))
+    child = r.fork()
+    child.del_player(0)
+    assert(child.get_num_players_at_pos('1B') == 0)
+    assert(r.get_num_players_at_pos('1B') == 1)
+    assert([p['name'] for p in r.get_roster()] == ['Cecil', 'George'])
+    assert([p['name'] for p in child.get_roster()] == ['George'])
+
+
+def test_selector_shuffle(fake_player_selector):
+    ppool = fake_player_selector.ppool.copy()
+    fake_player_selector.shuffle()
+    names = [p['name'] for p in fake_player_selector.select()]
+    assert(sorted(names) == sorted(ppool['name']))
+    # The pool itself is never reordered
+    assert(fake_player_selector.ppool.equals(ppool))
+
+
+def test_player_index():
+    df = pd.DataFrame([[1, "José Bautista", ['RF', '3B'], np.nan],
+                       [2, "Edwin Encarnación", ['1B'], np.nan],
+                       [3, "Josh Donaldson", ['3B'], np.nan]],
+                      columns=RBLDR_COLS)
+    idx = roster.PlayerIndex(roster.PlayerPool(df))
+    assert(idx.get_by_id(2)['name'] == "Edwin Encarnación")
+    assert(idx.get_by_id(4) is None)
+    assert(idx.get_by_name("Jose Bautista")['player_id'] == 1)
+    assert(idx.get_by_name("Edwin Encarnación")['player_id'] == 2)
+    assert(idx.get_by_name("Roberto Alomar") is None)
+    assert([p['player_id'] for p in idx.get_by_position('3B')] == [1, 3])
+    assert(idx.get_by_position('C') == [])
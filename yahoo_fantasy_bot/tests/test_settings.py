@@ -0,0 +1,36 @@
+#!/usr/bin/python
+
+import configparser
+import pytest
+from yahoo_fantasy_bot import settings
+
+
+def _cfg(opts):
+    cfg = configparser.RawConfigParser()
+    cfg.read_dict({'LineupOptimizer': opts,
+                   'Scorer': {'stdevCap': '2', 'useWeeklySchedule': 'true'}})
+    return cfg
+
+
+def test_load_settings():
+    s = settings.load(_cfg({'generations': '250', 'mutationPct': '10',
+                            'recordFile': ''}))
+    assert(s.lineup_optimizer.generations == 250)
+    assert(s.lineup_optimizer.mutation_pct == 10)
+    assert(s.lineup_optimizer.tournament_participants == 4)
+    assert(s.lineup_optimizer.record_file == '')
+    assert(s.scorer.stdev_cap == 2)
+    assert(s.scorer.use_weekly_schedule is True)
+    assert(s.cache.free_agent_expiry == 60)
+    assert(s['Scorer']['stdevCap'] == '2')
+    assert('Scorer' in s and 'Cache' not in s)
+    assert(settings.load(s) is s)
+
+
+def test_bad_settings():
+    with pytest.raises(RuntimeError):
+        settings.load(_cfg({'generations': 'many'}))
+    with pytest.raises(RuntimeError):
+        settings.load(_cfg({'tournamentParticipants': '6'}))
+    with pytest.raises(RuntimeError):
+        settings.load(_cfg({'benchSelection': 'random'}))
@@ -0,0 +1,70 @@
+#!/usr/bin/python
+
+import numpy as np
+import pandas as pd
+from yahoo_fantasy_bot import source
+
+
+def test_compact_projections():
+    df = pd.DataFrame({'playerid': [11, 12, 13],
+                       'Team': ['TOR', 'TOR', 'NYY'],
+                       'HR': [35, 14, np.nan],
+                       'AVG': [0.287, 0.301, np.nan],
+                       'wOBA': [0.390, 0.370, 0.300],
+                       'Notes': ['a', 'b', 'c']},
+                      index=pd.Index(['McGriff', 'Olerud', 'Mattingly'],
+                                     name='Name'))
+    cdf = source.compact_projections(df, ['playerid', 'fg_id'],
+                                     ['HR', 'AVG', 'R'], 'test')
+    assert(list(cdf.columns) == ['playerid', 'HR', 'AVG', 'Team'])
+    assert(list(cdf.index) == list(df.index))
+    assert(cdf['playerid'].dtype == np.int64)
+    assert(cdf['HR'].dtype == np.float32)
+    # AVG can't be represented exactly as a float32
+    assert(cdf['AVG'].dtype == np.float64)
+    assert(cdf['Team'].dtype == 'category')
+    assert(cdf['HR'].astype(np.float64).equals(df['HR']))
+
+
+def test_compact_narrowed_projections():
+    df = pd.DataFrame({'playerid': [11, 12], 'Team': ['TOR', 'TOR'],
+                       'HR': [35, 14]})
+    cdf = source.compact_projections(df, ['playerid'], ['HR'], 'test')
+    # Nothing is copied when the columns were narrowed by read_csv
+    assert(np.shares_memory(cdf['playerid'].to_numpy(),
+                            df['playerid'].to_numpy()))
+    assert(cdf['Team'].dtype == 'category')
+    assert(df['Team'].dtype != 'category')
+
+
+def test_projection_store(tmp_path):
+    fn = tmp_path / "hitters.csv"
+    fn.write_text("Name,Team,playerid,HR,AVG\n"
+                  "McGriff,TOR,sa11,35,0.287\n"
+                  "Olerud,TOR,sa12,-,0.301\n"
+                  "Bell,,sa13,20,\n")
+    detail = {'file_name': str(fn), 'index_col': 'Name', 'header': 0}
+    store = source.ProjectionStore(str(tmp_path / "store"))
+    expected = source.read_csv(detail)
+    for _ in range(2):
+        df = source.read_csv(detail, store)
+        assert(list(df.columns) == list(expected.columns))
+        assert(list(df.index) == list(expected.index))
+        assert(df['HR'].equals(expected['HR']))
+        assert(df['AVG'].equals(expected['AVG']))
+        assert(list(df['playerid']) == list(expected['playerid']))
+        assert(df['Team'].iloc[0] == 'TOR' and pd.isnull(df['Team'].iloc[2]))
+
+    # Only the columns asked for are loaded
+    df = source.read_csv(detail, store, ['HR', 'Notes'])
+    assert(list(df.columns) == ['HR'])
+    assert(list(df.index) == list(expected.index))
+    df = source.read_csv(detail, None, ['HR', 'Notes'])
+    assert(list(df.columns) == ['HR'])
+
+    # Editing the file replaces the stored copy
+    entry_dir = store._entry_dir(detail)
+    fn.write_text("Name,Team,playerid,HR,AVG\nMcGriff,TOR,sa11,36,0.290\n")
+    df = source.read_csv(detail, store)
+    assert(list(df['HR']) == [36])
+    assert(not (tmp_path / "store" / entry_dir).exists())
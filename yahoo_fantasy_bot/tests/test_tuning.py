@@ -0,0 +1,28 @@
+#!/usr/bin/python
+
+import pandas as pd
+from yahoo_fantasy_bot import tuning
+
+
+def _summary():
+    rows = []
+    for gens, score, secs in [(100, 1.0, 1.0), (250, 1.5, 2.0),
+                              (500, 1.4, 3.0), (750, 1.6, 4.0)]:
+        rows.append({'generations': gens, 'initialPopulationSize': 10,
+                     'tournamentParticipants': 4, 'numOffspring': 6,
+                     'mutationPct': 5, 'score': score, 'score_std': 0.0,
+                     'evaluations': gens * 6, 'seconds': secs})
+    return pd.DataFrame(rows)
+
+
+def test_pareto_front():
+    front = tuning.pareto_front(_summary())
+    assert(list(front['generations']) == [100, 250, 750])
+
+
+def test_config_snippet():
+    front = tuning.pareto_front(_summary())
+    snippet = tuning.config_snippet(front, 0, 300, 19)
+    assert("\ngenerations=750\n" in snippet)
+    snippet = tuning.config_snippet(front, 10, 300, 19)
+    assert("\ngenerations=250\n" in snippet)
@@ -0,0 +1,253 @@
+#!/usr/bin/python
+
+import collections
+import configparser
+import copy
+import itertools
+import multiprocessing
+import random
+import time
+import numpy as np
+import pandas as pd
+from yahoo_fantasy_bot import lineup_optimizer
+
+
+# The LineupOptimizer parameters of the genetic algorithm that we tune and the
+# values that are searched by default.
+DEFAULT_SEARCH_SPACE = collections.OrderedDict([
+    ('generations', [100, 250, 500, 750]),
+    ('initialPopulationSize', [5, 10, 20]),
+    ('tournamentParticipants', [2, 4, 8]),
+    ('numOffspring', [2, 4, 6, 8]),
+    ('mutationPct', [1, 5, 10, 20]),
+])
+
+# Optimizer inputs loaded by the current process, keyed by file name
+_inputs_cache = {}
+
+
+def read_search_space(fn):
+    """Read the search space from a config file
+
+    The file must have a [Search] section.  Each parameter in it is a comma
+    separated list of values to try.  Parameters that are not in the file use
+    the values from DEFAULT_SEARCH_SPACE.
+
+    :param fn: Name of the file to read
+    :type fn: str
+    :return: Map of parameter name to the list of values to try
+    :rtype: collections.OrderedDict
+    """
+    cfg = configparser.ConfigParser()
+    cfg.optionxform = str
+    if len(cfg.read(fn)) == 0:
+        raise RuntimeError("Search space file does not exist: " + fn)
+    space = copy.deepcopy(DEFAULT_SEARCH_SPACE)
+    for param, vals in cfg['Search'].items():
+        if param not in space:
+            raise RuntimeError("Not a tunable parameter: " + param)
+        space[param] = [int(v) for v in vals.split(',')]
+    return space
+
+
+def grid_search_space(space):
+    """Return every combination of parameters in the search space
+
+    :param space: Map of parameter name to the list of values to try
+    :type space: collections.OrderedDict
+    :return: List of parameter settings
+    :rtype: list(dict)
+    """
+    return [dict(zip(space.keys(), vals))
+            for vals in itertools.product(*space.values())]
+
+
+def random_search_space(space, num, seed):
+    """Return a random sample of parameter settings from the search space
+
+    :param space: Map of parameter name to the list of values to try
+    :type space: collections.OrderedDict
+    :param num: Number of unique settings to return.  This is capped at the
+        size of the full grid.
+    :type num: int
+    :param seed: Seed for the random number generator
+    :type seed: int
+    :return: List of parameter settings
+    :rtype: list(dict)
+    """
+    grid = grid_search_space(space)
+    return random.Random(seed).sample(grid, k=min(num, len(grid)))
+
+
+class EvaluationCounter:
+    """Wraps a ScoreComparer to count the number of lineups scored"""
+    def __init__(self, score_comparer):
+        self.score_comparer = score_comparer
+        self.evaluations = 0
+
+    def compute_score(self, score_sum):
+        self.evaluations += 1
+        return self.score_comparer.compute_score(score_sum)
+
+    def __getattr__(self, name):
+        return getattr(self.score_comparer, name)
+
+
+def run_trial(inputs_file, params, seed):
+    """Run the genetic algorithm once on saved inputs
+
+    :param inputs_file: File saved with lineup_optimizer.save_optimizer_inputs
+    :type inputs_file: str
+    :param params: LineupOptimizer parameters to run with
+    :type params: dict
+    :param seed: Seed for the random number generators
+    :type seed: int
+    :return: The params and seed along with the final score, the number of
+        evaluations, the wall-clock seconds and the trajectory of the best
+        score after each generation
+    :rtype: dict
+    """
+    if inputs_file not in _inputs_cache:
+        _inputs_cache[inputs_file] = \
+            lineup_optimizer.load_optimizer_inputs(inputs_file)
+    (cfg, score_comparer, roster_bldr, avail_plyrs, locked_plyrs) = \
+        _inputs_cache[inputs_file]
+    for param, val in params.items():
+        cfg['LineupOptimizer'][param] = str(val)
+    counter = EvaluationCounter(score_comparer)
+    random.seed(seed)
+    np.random.seed(seed)
+
+    trajectory = []
+    start = time.perf_counter()
+
+    def on_generation(generation, population):
+        trajectory.append({
+            'generation': generation,
+            'evaluations': counter.evaluations,
+            'seconds': time.perf_counter() - start,
+            'score': max(lineup['score'] for lineup in population)})
+
+    algo = lineup_optimizer.GeneticAlgorithm(cfg, counter, roster_bldr,
+                                             avail_plyrs,
+                                             copy.deepcopy(locked_plyrs))
+    algo.run(params['generations'], show_progress=False,
+             on_generation=on_generation)
+    return {'params': params,
+            'seed': seed,
+            'score': trajectory[-1]['score'] if trajectory else np.nan,
+            'evaluations': counter.evaluations,
+            'seconds': time.perf_counter() - start,
+            'trajectory': trajectory}
+
+
+def run_search(inputs_file, candidates, seeds, processes=None):
+    """Run the genetic algorithm for each candidate setting and seed
+
+    The trials are spread across a pool of processes.
+
+    :param inputs_file: File saved with lineup_optimizer.save_optimizer_inputs
+    :type inputs_file: str
+    :param candidates: Parameter settings to try
+    :type candidates: list(dict)
+    :param seeds: Seeds to run each candidate with
+    :type seeds: list(int)
+    :param processes: Number of processes to use.  Defaults to the number of
+        CPUs.
+    :type processes: int
+    :return: Result of each trial as returned by run_trial
+    :rtype: list(dict)
+    """
+    trials = [(inputs_file, params, seed)
+              for params in candidates for seed in seeds]
+    with multiprocessing.Pool(processes) as pool:
+        return pool.starmap(run_trial, trials)
+
+
+def summarize_trials(trials):
+    """Aggregate the trials of each parameter setting across the seeds
+
+    :param trials: Trial results as returned by run_trial
+    :type trials: list(dict)
+    :return: One row per parameter setting with the mean and standard
+        deviation of the score, and the mean evaluations and seconds
+    :rtype: DataFrame
+    """
+    df = pd.DataFrame([dict(t['params'], score=t['score'],
+                            evaluations=t['evaluations'],
+                            seconds=t['seconds']) for t in trials])
+    params = list(trials[0]['params'].keys())
+    summary = df.groupby(params).agg(
+        score=('score', 'mean'), score_std=('score', 'std'),
+        evaluations=('evaluations', 'mean'), seconds=('seconds', 'mean'))
+    return summary.reset_index().sort_values(
+        'score', ascending=False, ignore_index=True)
+
+
+def trajectory_frame(trials):
+    """Flatten the per-generation trajectory of each trial
+
+    :param trials: Trial results as returned by run_trial
+    :type trials: list(dict)
+    :return: One row per generation of each trial
+    :rtype: DataFrame
+    """
+    return pd.DataFrame([dict(t['params'], seed=t['seed'], **e)
+                         for t in trials for e in t['trajectory']])
+
+
+def pareto_front(summary):
+    """Find the settings that are not beaten in both score and wall-clock
+
+    :param summary: Summary as returned by summarize_trials
+    :type summary: DataFrame
+    :return: The Pareto-optimal rows, fastest first
+    :rtype: DataFrame
+    """
+    df = summary.dropna(subset=['score']).sort_values(
+        ['seconds', 'score'], ascending=[True, False])
+    best = -np.inf
+    keep = []
+    for i, score in df['score'].items():
+        if score > best:
+            keep.append(i)
+            best = score
+    return df.loc[keep].reset_index(drop=True)
+
+
+def config_snippet(front, tolerance, num_plyrs, num_positions):
+    """Build a LineupOptimizer config snippet from the Pareto front
+
+    The settings that are enabled are the fastest ones whose score is within
+    the tolerance of the best score.  The rest of the Pareto front is listed
+    in comments.
+
+    :param front: Pareto front as returned by pareto_front
+    :type front: DataFrame
+    :param tolerance: Percent of the best score we are willing to give up
+        for a faster setting
+    :type tolerance: float
+    :param num_plyrs: Number of players in the pool that was tuned on
+    :type num_plyrs: int
+    :param num_positions: Number of positions in the lineup
+    :type num_positions: int
+    :return: The config snippet
+    :rtype: str
+    """
+    params = list(DEFAULT_SEARCH_SPACE.keys())
+    best = front['score'].max()
+    threshold = best - abs(best) * tolerance / 100
+    chosen = front[front['score'] >= threshold].iloc[0]
+    lines = ["[LineupOptimizer]",
+             "# Tuned by ybot_tune with a pool of {} players and a lineup of "
+             "{} positions.".format(num_plyrs, num_positions),
+             "# Pareto-optimal settings, fastest first:"]
+    for _, row in front.iterrows():
+        lines.append("#   {} -> score {:.3f} in {:.2f}s ({:.0f} "
+                     "evaluations)".format(
+                         " ".join(["{}={}".format(p, int(row[p]))
+                                   for p in params]),
+                         row['score'], row['seconds'], row['evaluations']))
+    for p in params:
+        lines.append("{}={}".format(p, int(chosen[p])))
+    return "\n".join(lines) + "\n"
@@ -1,10 +1,16 @@
 #!/usr/bin/python
 
 import unicodedata
+import collections
 import os
 import logging
 import pickle
 import datetime
+import numpy as np
+import pandas as pd
+
+# Number of optimizer results that TeamCache keeps
+MAX_OPTIMIZED_LINEUPS = 50
 
 
 def normalized(name):
@@ -19,6 +25,116 @@ def normalized(name):
         'ascii', 'ignore').decode('utf-8')
 
 
+def weekly_stat_column(stat):
+    """Name of the column that has the weekly-effective value of a stat
+
+    The prediction builders fill in these columns so that the value a player
+    contributes to a stat category is only computed once.
+
+    :param stat: Stat category name (e.g. HR)
+    :type stat: str
+    :return: Column name
+    :rtype: str
+    """
+    return "{}_wk".format(stat)
+
+
+def weekly_stat_values(df, stats, stat_values):
+    """Return the weekly-effective value of stats for each player
+
+    The weekly_stat_column() values are used where they are present.  Rows
+    without them, such as the players that come from a prediction builder's
+    select_players, are computed from their projections.
+
+    :param df: Player predictions
+    :type df: DataFrame
+    :param stats: Stats to return values for
+    :type stats: list(str)
+    :param stat_values: Function that computes the values from the
+        projections.  It is called with the rows of df and the stats.
+    :return: Matrix with a row for each player and a column for each stat
+    :rtype: numpy.ndarray
+    """
+    wk_cols = [weekly_stat_column(stat) for stat in stats]
+    if not all([c in df.columns for c in wk_cols]):
+        return stat_values(df, stats)
+    vals = df[wk_cols].to_numpy(dtype=np.float64, copy=True)
+    missing = np.isnan(vals)
+    rows = missing.any(axis=1)
+    if rows.any():
+        computed = stat_values(df.loc[rows], stats)
+        vals[rows] = np.where(missing[rows], computed, vals[rows])
+    return vals
+
+
+class PredictionMemo:
+    """Predictions that a prediction builder has made during this run
+
+    The bot asks for predictions of overlapping sets of players (the player
+    pool, each league lineup and the opponent).  The memo keeps the
+    prediction rows by Yahoo! player_id so that each player is only predicted
+    once.  It is not meant to be pickled with the builder.
+    """
+    def __init__(self):
+        self.df = None
+        self.not_found = set()
+
+    def unseen(self, plyrs, fail_on_missing):
+        """Return the players that still need to be predicted
+
+        Players that weren't found before are skipped unless fail_on_missing
+        is set, in which case they are predicted again so that the builder
+        reports them.
+
+        :param plyrs: Players to predict
+        :type plyrs: list(dict)
+        :param fail_on_missing: The option passed to predict()
+        :type fail_on_missing: bool
+        :rtype: list(dict)
+        """
+        seen = set() if self.df is None else set(self.df.index)
+        return [p for p in plyrs if p['player_id'] not in seen and
+                (fail_on_missing or p['player_id'] not in self.not_found)]
+
+    def add(self, plyrs, df, fail_on_missing):
+        """Save the predictions for newly predicted players
+
+        :param plyrs: Players that were predicted
+        :type plyrs: list(dict)
+        :param df: The predictions for plyrs.  Players may have no row, or
+            more than one.
+        :type df: DataFrame
+        :param fail_on_missing: The option passed to predict()
+        :type fail_on_missing: bool
+        """
+        found = set(df['player_id']) if 'player_id' in df.columns else set()
+        if not fail_on_missing:
+            self.not_found.update(p['player_id'] for p in plyrs
+                                  if p['player_id'] not in found)
+        if len(found) == 0:
+            return
+        df = df.set_index(df['player_id'].rename(None))
+        self.df = df if self.df is None else pd.concat([self.df, df],
+                                                       sort=False)
+
+    def lookup(self, plyrs):
+        """Return the saved predictions for players
+
+        :param plyrs: Players to return
+        :type plyrs: list(dict)
+        :return: Prediction rows in the order of plyrs.  Players that weren't
+            found are left out.  None if none of the players were found.
+        :rtype: DataFrame
+        """
+        if self.df is None:
+            return None
+        ids = [p['player_id'] for p in plyrs if p['player_id'] in
+               self.df.index]
+        if len(ids) == 0:
+            return None
+        return self.df.loc[ids].reset_index(drop=True)
+
+
 class CacheBase(object):
     def __init__(self, cfg, cache_dir):
         self.logger = logging.getLogger()
@@ -82,13 +198,77 @@ class TeamCache(CacheBase):
     def load_free_agents(self, expiry, loader):
         return self.run_loader(self.free_agents_cache_file(), expiry, loader)
 
+    def optimized_lineup_file(self):
+        return "{}/optimized_lineups.pkl".format(self.cache_dir)
+
+    def load_optimized_lineup(self, fingerprint):
+        """Return the lineup saved for an optimizer input fingerprint
+
+        :param fingerprint: Fingerprint of the optimizer inputs
+        :type fingerprint: str
+        :return: The saved result or None if nothing was saved for it
+        :rtype: dict or None
+        """
+        return self._load_optimized_lineups().get(fingerprint)
+
+    def save_optimized_lineup(self, fingerprint, result):
+        """Save the lineup found for an optimizer input fingerprint
+
+        Only the most recent MAX_OPTIMIZED_LINEUPS results are kept.
+
+        :param fingerprint: Fingerprint of the optimizer inputs
+        :type fingerprint: str
+        :param result: The result to save
+        :type result: dict
+        """
+        lineups = self._load_optimized_lineups()
+        lineups.pop(fingerprint, None)
+        lineups[fingerprint] = result
+        while len(lineups) > MAX_OPTIMIZED_LINEUPS:
+            lineups.popitem(last=False)
+        with open(self.optimized_lineup_file(), "wb") as f:
+            pickle.dump(lineups, f)
+
+    def _load_optimized_lineups(self):
+        fn = self.optimized_lineup_file()
+        if os.path.exists(fn):
+            with open(fn, "rb") as f:
+                return pickle.load(f)
+        return collections.OrderedDict()
+
     def remove(self):
         for fn in [self.prediction_builder_file(),
-                   self.league_lineup_file(), self.free_agents_cache_file()]:
+                   self.league_lineup_file(), self.free_agents_cache_file(),
+                   self.optimized_lineup_file()]:
             if os.path.exists(fn):
                 os.remove(fn)
 
 
+class ComponentCache(CacheBase):
+    """Cache for the parts of an object that each expire on their own
+
+    :param cfg: Config file
+    :param name: Name of the directory, within the league's cache directory,
+        that the components are saved in
+    :type name: str
+    """
+    def __init__(self, cfg, name):
+        super(ComponentCache, self).__init__(
+            cfg, "{}/{}/{}".format(cfg['Cache']['dir'], cfg['League']['id'],
+                                   name))
+
+    def component_file(self, component):
+        return "{}/{}.pkl".format(self.cache_dir, component)
+
+    def load(self, component, expiry, loader):
+        return self.run_loader(self.component_file(component), expiry, loader)
+
+    def remove(self):
+        for fn in os.listdir(self.cache_dir):
+            if fn.endswith(".pkl"):
+                os.remove(os.path.join(self.cache_dir, fn))
+
+
 class LeagueCache(CacheBase):
     def __init__(self, cfg):
         super(LeagueCache, self).__init__(